@@ -1 +1,92 @@
-from AutoConfig.autoconfig import *
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# The public names are imported from their submodules on first access (PEP 562), so
+# "import AutoConfig" (and the autoconfig command) only pays for the modules it uses.
+# dict_print is imported eagerly, as its function shadows the submodule of the same name
+import importlib
+
+from AutoConfig.dict_print import dict_print, emit_text, format_value, render_dict
+
+_EXPORTS = {
+    "arrays": (
+        "ARRAY_BACKENDS",
+        "ARRAY_MIN_LENGTH",
+        "ARRAY_TYPES",
+        "HAS_NUMPY",
+        "NPY_TAG",
+        "NpyRef",
+        "construct_npy",
+        "is_array",
+        "save_npy",
+        "sidecar_dir",
+        "to_array",
+    ),
+    "cache": ("cache_info", "clear_cache", "configure_cache"),
+    "loader": ("compose_config", "get_dumper", "read_config"),
+    "autoconfig": (
+        "ConfigDiff",
+        "args_from_YAML",
+        "compare_args",
+        "compare_yaml",
+        "diff_args",
+        "dumps_args",
+        "get_nested_attribute",
+        "loads_args",
+        "reassign",
+    ),
+    "sweep": (
+        "ConfigTable",
+        "LogUniform",
+        "MISSING",
+        "Uniform",
+        "compare_sweep",
+        "flatten_args",
+        "sweep_configs",
+    ),
+    "watch": ("ConfigWatcher",),
+    "frozen": ("FrozenConfig",),
+    "share": ("SharedConfig",),
+    "stats": (
+        "ConfigStats",
+        "STATS_PHASES",
+        "add_stats_hook",
+        "disable_stats",
+        "enable_stats",
+        "remove_stats_hook",
+        "stats_enabled",
+    ),
+    "schema": (
+        "BoundConfig",
+        "CompiledSchema",
+        "SCHEMA_IGNORED_KEYS",
+        "SchemaError",
+        "bind_config",
+        "compile_schema",
+    ),
+    "bulk": ("aload", "aload_many", "load_many"),
+}
+
+# public name -> submodule defining it
+_NAMES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = ["dict_print", "emit_text", "format_value", "render_dict"] + list(_NAMES)
+
+
+def __getattr__(name):
+    module = _NAMES.get(name)
+    if module is None:
+        if name in _EXPORTS or name == "cli":
+            # A submodule, e.g. AutoConfig.loader
+            return importlib.import_module(f"{__name__}.{name}")
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_NAMES))
@@ -0,0 +1,11 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import sys
+
+from AutoConfig.cli import main
+
+sys.exit(main())
@@ -0,0 +1,156 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import importlib.util
+import os
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+
+
+def _find_numpy():
+    try:
+        return importlib.util.find_spec("numpy") is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# NumPy is optional, without it arrays are stored as array.array and sidecars are unavailable.
+# It is only imported when first needed, as importing it takes longer than loading most configs
+HAS_NUMPY = _find_numpy()
+
+ARRAY_BACKENDS = ("auto", "numpy", "array")
+
+# Lists shorter than this are kept as lists by coerce="arrays"
+ARRAY_MIN_LENGTH = 64
+
+# YAML tag referencing a .npy file, relative to the YAML file: "weights: !npy weights.npy"
+NPY_TAG = "!npy"
+
+# The directory sidecar paths are relative to, set per thread while a file is parsed
+_LOCAL = threading.local()
+
+
+def _numpy():
+    """Import numpy on first use"""
+    import numpy
+
+    return numpy
+
+
+def __getattr__(name):
+    # Module attributes that need numpy, computed on first access (PEP 562)
+    if name == "ARRAY_TYPES":
+        return (array, _numpy().ndarray) if HAS_NUMPY else (array,)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def is_array(val):
+    """Check if a value is a compact array (array.array or numpy.ndarray)"""
+    if isinstance(val, array):
+        return True
+    # ndarrays can only exist once numpy has been imported
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(val, np.ndarray)
+
+
+def to_array(values, backend="auto"):
+    """Convert a homogeneous numeric list to a compact array, or return None if it isn't one
+
+    Parameters
+    ----------
+    values : list
+        The parsed list
+    backend : str
+        "auto" uses numpy if installed, otherwise array.array
+        "numpy" returns a numpy.ndarray (nested lists of equal length give 2D+ arrays)
+        "array" returns a 1D array.array of int64 ("q") or float64 ("d")
+    """
+    if backend == "auto":
+        backend = "numpy" if HAS_NUMPY else "array"
+    if backend == "numpy":
+        if not HAS_NUMPY:
+            raise ImportError(
+                'AutoConfig array backend "numpy" requires numpy, use backend="auto" to fall back'
+            )
+        try:
+            out = _numpy().array(values)
+        except (ValueError, OverflowError):
+            # Ragged nested lists or out of range integers
+            return None
+        # Leave lists of strings, booleans, mixed types, etc. unchanged
+        return out if out.dtype.kind in "iuf" and out.size else None
+    elif backend == "array":
+        types = set(map(type, values))
+        if types == {int}:
+            typecode = "q"
+        elif types == {float} or types == {int, float}:
+            typecode = "d"
+        else:
+            return None
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            return None
+    raise ValueError(
+        f'Unknown array backend "{backend}", expected one of {ARRAY_BACKENDS}'
+    )
+
+
+class NpyRef:
+    """A reference to a .npy sidecar file, as read from (or written to) a "!npy" YAML tag"""
+
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            The .npy file path
+        """
+        self.path = path
+
+    def load(self):
+        """Return the array memory-mapped read-only, so it isn't read until accessed"""
+        if not HAS_NUMPY:
+            raise ImportError(
+                f'AutoConfig "{NPY_TAG}" sidecar arrays require numpy ({self.path})'
+            )
+        return _numpy().load(self.path, mmap_mode="r")
+
+    def __eq__(self, other):
+        return isinstance(other, NpyRef) and other.path == self.path
+
+    def __hash__(self):
+        return hash((NpyRef, self.path))
+
+    def __repr__(self):
+        return f"NpyRef({self.path!r})"
+
+
+def save_npy(file, value):
+    """Write an array to an open binary file in the .npy format"""
+    _numpy().save(file, value, allow_pickle=False)
+
+
+@contextmanager
+def sidecar_dir(path):
+    """Resolve the relative sidecar paths of the YAML parsed within this context against path"""
+    prev = getattr(_LOCAL, "dir", None)
+    _LOCAL.dir = path
+    try:
+        yield
+    finally:
+        _LOCAL.dir = prev
+
+
+def construct_npy(loader, node):
+    """YAML constructor for the "!npy" tag"""
+    path = os.path.expanduser(loader.construct_scalar(node))
+    base = getattr(_LOCAL, "dir", None)
+    return NpyRef(path if base is None else os.path.join(base, path))
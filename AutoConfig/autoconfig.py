@@ -1,42 +1,210 @@
+import copy
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import re
+import stat
+import time
+from fnmatch import fnmatchcase
+
 import yaml
-from .dict_print import dict_print
+from .dict_print import dict_print, emit_text, format_value, render_dict
+from .arrays import (
+    ARRAY_MIN_LENGTH,
+    HAS_NUMPY,
+    NPY_TAG,
+    NpyRef,
+    is_array,
+    save_npy,
+    to_array,
+)
+from .cache import _copy_tree, cache_info, clear_cache, configure_cache
+from .loader import compose_config, get_dumper, read_config
+from .stats import _STATS, _collect, _phase
+
+
+class _AsLoaded:
+    """Default of options taken from how the parser was loaded, see args_from_YAML.watch"""
+
+    def __repr__(self):
+        return "<as loaded>"
+
+
+_AS_LOADED = _AsLoaded()
+
+
+# Characters that can't start a plain YAML scalar, or can't appear in one within a flow collection
+_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`")
+_FLOW_INDICATORS = frozenset(",[]{}")
+_STR_TAG = "tag:yaml.org,2002:str"
+_RESOLVER = yaml.resolver.Resolver()
+# Characters replaced in sidecar file names
+_SIDECAR_UNSAFE = re.compile(r"[^\w.\-]")
+
+
+def _format_scalar(val, flow=False):
+    """Format a single value for writing to YAML
 
+    Strings are written as-is (plain) unless reading them back would give a different value,
+    in which case they are quoted
+    """
+    if val is None:
+        return "null"
+    elif isinstance(val, str):
+        if (
+            not val
+            or val[0] in _INDICATORS
+            or val[0].isspace()
+            or val[-1].isspace()
+            or ": " in val
+            or " #" in val
+            or val.endswith(":")
+            or not val.isprintable()
+            or (flow and not _FLOW_INDICATORS.isdisjoint(val))
+            or _RESOLVER.resolve(yaml.ScalarNode, val, (True, False)) != _STR_TAG
+        ):
+            # Quote strings that wouldn't be read back unchanged (JSON strings are valid YAML)
+            return json.dumps(val, ensure_ascii=False)
+        return val
+    elif isinstance(val, float):
+        if val != val:
+            return ".nan"
+        elif val in (float("inf"), float("-inf")):
+            return ".inf" if val > 0 else "-.inf"
+        out = repr(val)
+        if "." not in out and "e" in out:
+            # YAML needs a "." to read exponent notation as a float, e.g. 1.0e-05
+            out = out.replace("e", ".0e", 1)
+        return out
+    elif isinstance(val, (list, tuple, set, dict)):
+        return _format_flow(val)
+    return str(val)
 
-def _type_conv(val):
-    """Convert None to 'null'"""
-    return "null" if val is None else val
+
+def _format_flow(val):
+    """Format a (possibly nested) list or dict as a single-line YAML flow collection"""
+    if isinstance(val, dict):
+        items = ", ".join(
+            f"{_format_scalar(k, True)}: {_format_scalar(v, True)}"
+            for k, v in val.items()
+        )
+        return "{" + items + "}"
+    return "[" + ", ".join(_format_scalar(v, True) for v in val) + "]"
 
 
-def _write_dict(data, file, tab="    ", _first=True):
-    """Given an open file, write the args to it in dictionary format
+def _write_node(obj, write, exclude=("subset",), tab="", sidecars=None, _prefix=""):
+    """Write a parser (or dict) to a file in block style, walking the tree without copying it
 
     Parameters
     ----------
-    data : dict
-        The data dictionary to be read from
-    file : file
-        The open file to be written to
+    obj : args_from_YAML | dict
+        The data to be written
+    write : callable
+        The write method of an open (buffered) file
+    exclude : list
+        The names of attributes to exclude
     tab : str
-        Formatting for indenting args
-    _first : bool
-        Internal use for recursion tracking
+        The current indentation
+    sidecars : _SidecarWriter | None
+        Writes arrays to .npy files, referenced with the "!npy" tag. If None, arrays
+        are written as lists
     """
-
-    if _first:
-        tab = ""
-    for key in data.keys():
-        if isinstance(data[key], dict):
-            # Use recursion if a dict is encountered
-            file.write(f"{tab}{key}:\n")
-            _write_dict(data[key], file, tab=tab + "    ", _first=False)
-        elif isinstance(data[key], list):
-            # Convert list to new lines
-            file.write(f"{tab}{key}:\n")
-            for d in data[key]:
-                file.write(f"{tab}  - {_type_conv(d)}\n")
+    items = obj.items() if isinstance(obj, dict) else _node_items(obj)
+    for name, v in items:
+        if name in exclude:
+            continue
+        key = _format_scalar(name)
+        if isinstance(v, (args_from_YAML, dict)):
+            keys = v if isinstance(v, dict) else v.__dict__
+            if all(k in exclude for k in keys):
+                # e.g. "j: {}", which loads as a section holding only "subset"
+                write(f"{tab}{key}: {{}}\n")
+                continue
+            # Use recursion if a section is encountered
+            write(f"{tab}{key}:\n")
+            _write_node(v, write, exclude, tab + "    ", sidecars, f"{_prefix}{name}.")
+            continue
+        if is_array(v):
+            if sidecars is not None:
+                ref = sidecars.save(f"{_prefix}{name}", v)
+                write(f"{tab}{key}: {NPY_TAG} {_format_scalar(ref.path)}\n")
+                continue
+            v = v.tolist()
+        if isinstance(v, list) and len(v) > 0:
+            # Convert list to new lines, nested collections are written in flow style
+            write(f"{tab}{key}:\n")
+            for d in v:
+                write(f"{tab}  - {_format_scalar(d)}\n")
         else:
             # Write normally
-            file.write(f"{tab}{key}: {_type_conv(data[key])}\n")
+            write(f"{tab}{key}: {_format_scalar(v)}\n")
+
+
+def _atomic_write(path, write_func, mode="w", buffering=2**20):
+    """Write to path using write_func(file), replacing the target in one step
+
+    The data is written to a temporary file in the same directory, which is then renamed
+    over the target, so an interrupted write never leaves a truncated file behind.
+    Symlinks are followed and an existing file keeps its permissions, as with
+    open(path, "w"). Append modes write to the target directly.
+    """
+    if "a" in mode:
+        with open(path, mode, buffering=buffering) as file:
+            write_func(file)
+        return
+
+    # Replace the file a symlink points to, not the link
+    path = os.path.realpath(path)
+    fd, tmp = _create_temp(os.path.dirname(path))
+    try:
+        with os.fdopen(fd, mode, buffering=buffering) as file:
+            write_func(file)
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            # A new file, created with the umask applied like open() does
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _create_temp(directory):
+    """Create a uniquely named temporary file, returning (file descriptor, path)
+
+    Unlike tempfile.mkstemp (mode 0o600), the file is created with mode 0o666 minus the
+    process umask, the permissions open(path, "w") gives a new file
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(100):
+        tmp = os.path.join(directory, f".tmp_{os.urandom(8).hex()}.yaml")
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No usable temporary file name found in {directory}")
+
+
+class _SidecarWriter:
+    """Saves array values to .npy files next to a YAML file, named after their dotted keys"""
+
+    def __init__(self, path):
+        self.dir = os.path.dirname(os.path.abspath(path))
+        self.stem = os.path.splitext(os.path.basename(path))[0]
+
+    def save(self, key, value):
+        """Write the array atomically and return a reference relative to the YAML file"""
+        name = f"{self.stem}.{_SIDECAR_UNSAFE.sub('_', key)}.npy"
+        # The previous file may still be memory-mapped, so it's replaced rather than overwritten
+        target = os.path.join(self.dir, name)
+        _atomic_write(target, lambda file: save_npy(file, value), "wb")
+        stats = _STATS.current()
+        if stats is not None:
+            stats.add("bytes_written", os.path.getsize(target))
+        return NpyRef(name)
 
 
 def _get_dict_exclude(obj, exclude=["subset"]):
@@ -51,7 +219,7 @@ def _get_dict_exclude(obj, exclude=["subset"]):
     """
 
     temp = {}
-    for k, v in obj.__dict__.items():
+    for k, v in _node_items(obj):
         if not k in exclude:
             if not isinstance(v, args_from_YAML):
                 temp[k] = v
@@ -61,8 +229,41 @@ def _get_dict_exclude(obj, exclude=["subset"]):
     return temp
 
 
-def compare_args(argsA, argsB, _top_level=True, _post=""):
-    """Compare two args_from_YAML instances, printing the differences
+class ConfigDiff:
+    """The differences between two configs, keyed by dotted attribute path
+
+    Attributes
+    ----------
+    added : dict
+        {path: value} for attributes only in B
+    removed : dict
+        {path: value} for attributes only in A
+    changed : dict
+        {path: (value in A, value in B)} for attributes in both with different values
+    """
+
+    def __init__(self):
+        self.added = {}
+        self.removed = {}
+        self.changed = {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __repr__(self):
+        return f"ConfigDiff(added={self.added}, removed={self.removed}, changed={self.changed})"
+
+
+def diff_args(argsA, argsB, exclude=("subset",)):
+    """Return the differences between two args_from_YAML instances as a ConfigDiff
+
+    Sections with equal content digests are skipped without being walked. The digests are
+    cached per section until it (or a section below it) is modified, so repeated diffs of
+    large configs only cost as much as the sections that differ. In-place changes to list
+    values are not tracked, so re-assign a modified list (e.g. via .set()) before diffing.
 
     Parameters
     ----------
@@ -70,56 +271,190 @@ def compare_args(argsA, argsB, _top_level=True, _post=""):
         The base instance to compare against
     argsB : args_from_YAML
         The other instance to compare
+    exclude : list
+        The names of attributes to ignore
     """
-    dA = argsA.get_kwargs()
-    dB = argsB.get_kwargs()
+    diff = ConfigDiff()
+    _diff_nodes(argsA, argsB, "", diff, exclude)
+    return diff
 
-    keyA = set(dA.keys())
-    keyB = set(dB.keys())
 
-    uniques = keyA.union(keyB)
-    b_missing = keyA - keyB
-    b_only = keyB - keyA
+def _diff_nodes(a, b, prefix, diff, exclude):
+    """Recursively add the differences between two parsers to diff"""
+    if a is b:
+        return
+    digest = _subtree_hash(a, exclude)
+    if digest is not None and digest == _subtree_hash(b, exclude):
+        return
+    itemsB = {k: v for k, v in _node_items(b) if k not in exclude}
+    for k, vA in _node_items(a):
+        if k in exclude:
+            continue
+        path = f"{prefix}{k}"
+        if k not in itemsB:
+            diff.removed[path] = vA
+            continue
+        vB = itemsB.pop(k)
+        if isinstance(vA, args_from_YAML) and isinstance(vB, args_from_YAML):
+            _diff_nodes(vA, vB, path + ".", diff, exclude)
+        elif isinstance(vA, args_from_YAML) or isinstance(vB, args_from_YAML):
+            diff.changed[path] = (vA, vB)
+        elif vA is not vB and _values_differ(vA, vB):
+            diff.changed[path] = (vA, vB)
+    for k, vB in itemsB.items():
+        diff.added[f"{prefix}{k}"] = vB
 
-    B_only = {k: argsB[k] for k in b_only}
-    B_missing = {k: argsA[k] for k in b_missing}
 
-    both_have_diff = {}
-    for u in uniques:
-        try:
-            if argsA[u] != argsB[u]:
-                if isinstance(argsA[u], args_from_YAML):
-                    tmp = compare_args(argsA[u], argsB[u], False, _post + "." + u)
-                    both_have_diff.update(tmp)
-                else:
-                    both_have_diff[u + _post] = f"{argsA[u]} | {argsB[u]}"
-        except AttributeError:
+def _freeze(val):
+    """Convert lists, dicts, sets and arrays into hashable equivalents"""
+    if isinstance(val, (list, tuple)):
+        return tuple(_freeze(v) for v in val)
+    elif isinstance(val, dict):
+        return frozenset((k, _freeze(v)) for k, v in val.items())
+    elif isinstance(val, (set, frozenset)):
+        return frozenset(_freeze(v) for v in val)
+    elif is_array(val):
+        return _freeze(val.tolist())
+    return val
+
+
+def _values_differ(a, b):
+    """Compare two leaf values, comparing their frozen forms when == doesn't give a bool"""
+    try:
+        return bool(a != b)
+    except (TypeError, ValueError):
+        return _freeze(a) != _freeze(b)
+
+
+# Leaf types whose repr identifies the value exactly, so equal encodings mean equal values
+_DIGEST_SCALARS = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+
+def _leaf_encoding(val):
+    """Return an unambiguous encoding of a leaf value, or None if it can't be encoded
+
+    Values of other types (e.g. custom objects) have no encoding, so the sections holding
+    them are always walked instead of being skipped on matching digests
+    """
+    t = type(val)
+    if t in _DIGEST_SCALARS:
+        return (t.__name__, val)
+    elif t is list or t is tuple:
+        out = [_leaf_encoding(v) for v in val]
+        return None if None in out else (t.__name__, tuple(out))
+    elif t is dict:
+        out = [(_leaf_encoding(k), _leaf_encoding(v)) for k, v in val.items()]
+        if any(None in kv for kv in out):
+            return None
+        return ("dict", tuple(sorted(out, key=repr)))
+    elif t is set or t is frozenset:
+        out = [_leaf_encoding(v) for v in val]
+        return None if None in out else (t.__name__, tuple(sorted(map(repr, out))))
+    elif is_array(val):
+        # The full buffer, as the repr of large arrays is abbreviated
+        data = val.tobytes()
+        dtype = getattr(val, "dtype", None)
+        return (
+            t.__name__,
+            str(dtype) if dtype is not None else val.typecode,
+            getattr(val, "shape", None),
+            hashlib.blake2b(data, digest_size=16).digest(),
+        )
+    return None
+
+
+def _subtree_hash(obj, exclude=("subset",)):
+    """Return the content digest of a parser, cached until it or a section below it is modified
+
+    The digest is a blake2b hash of an exact encoding of the keys and values, so (unlike
+    hash()) equal digests can be trusted to mean equal content. Returns None if a value
+    can't be encoded
+    """
+    cached = obj._hash
+    if cached is not None and cached[0] == exclude:
+        return cached[1]
+    parts = []
+    for k, v in _node_items(obj):
+        if k in exclude:
             continue
+        if isinstance(v, args_from_YAML):
+            enc = _subtree_hash(v, exclude)
+        else:
+            enc = _leaf_encoding(v)
+        if enc is None:
+            parts = None
+            break
+        parts.append((k, enc))
+    h = (
+        None
+        if parts is None
+        else hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+    )
+    # Bypass __setattr__, since caching the digest isn't a modification
+    object.__setattr__(obj, "_hash", (exclude, h))
+    return h
 
-    if not _top_level:
-        return both_have_diff
 
-    any_diff = False
-    if len(B_missing) > 0:
-        print("===== Missing from B =====")
-        dict_print(B_missing)
-        any_diff = True
+def compare_args(
+    argsA, argsB, write=None, max_items=None, max_width=None, exclude=("subset",)
+):
+    """Compare two args_from_YAML instances, printing the differences
+
+    Parameters
+    ----------
+    argsA : args_from_YAML
+        The base instance to compare against
+    argsB : args_from_YAML
+        The other instance to compare
+    write : callable | logging.Logger | None
+        Where to send the report instead of stdout, see render_dict
+    max_items : int | None
+        Show at most this many items of list values
+    max_width : int | None
+        Cut lines longer than this
+    exclude : list
+        The names of attributes to ignore, e.g. "config_path" to compare files by content
 
-    if len(B_only) > 0:
-        print("===== Only in B =====")
-        dict_print(B_only)
-        any_diff = True
+    Returns
+    -------
+    ConfigDiff
+        The differences, see diff_args
+    """
+    with _collect("compare_args") as stats:
+        with _phase(stats, "diff"):
+            diff = diff_args(argsA, argsB, exclude)
+        if stats is not None:
+            stats.add("differences", len(diff))
 
-    if len(both_have_diff) > 0:
-        print("===== Different <A | B> =====")
-        dict_print(both_have_diff)
-        any_diff = True
+        # Build the whole report, then print it at once
+        with _phase(stats, "render"):
+            parts = []
+            sections = (
+                ("===== Missing from B =====", diff.removed),
+                ("===== Only in B =====", diff.added),
+                (
+                    "===== Different <A | B> =====",
+                    {
+                        k: f"{format_value(a, max_items)} | {format_value(b, max_items)}"
+                        for k, (a, b) in diff.changed.items()
+                    },
+                ),
+            )
+            for title, values in sections:
+                if len(values) > 0:
+                    parts.append(f"{title}\n")
+                    parts.append(
+                        render_dict(values, max_items=max_items, max_width=max_width)
+                        + "\n\n"
+                    )
 
-    if not any_diff:
-        print("No differences found.")
+            if not diff:
+                parts.append("No differences found.\n")
+            emit_text("".join(parts), write)
+    return diff
 
 
-def compare_yaml(fileA, fileB):
+def compare_yaml(fileA, fileB, loader="auto", cache=False, cache_dir=None):
     """Compare two YAML files, printing the differences
 
     Parameters
@@ -128,78 +463,404 @@ def compare_yaml(fileA, fileB):
         The filepath to a YAML file to compare
     fileB : str
         The filepath to another YAML file to compare
+    loader : str
+        The YAML loader backend, see args_from_YAML
+    cache : bool
+        Whether to use the process-wide parsed-config cache, see args_from_YAML
+    cache_dir : str | bool | None
+        The on-disk cache directory, see args_from_YAML
+
+    Returns
+    -------
+    ConfigDiff
+        The differences, see diff_args
     """
-    compare_args(args_from_YAML(fileA), args_from_YAML(fileB))
+    return compare_args(
+        args_from_YAML(fileA, loader=loader, cache=cache, cache_dir=cache_dir),
+        args_from_YAML(fileB, loader=loader, cache=cache, cache_dir=cache_dir),
+    )
 
 
 class args_from_YAML:
     """Parse a given YAML file and generate a class with those attributes"""
 
+    # Internal state is kept in slots so it never shows up as a config attribute
+    __slots__ = (
+        "__dict__",
+        "__weakref__",
+        "_reuse",
+        "_hash",
+        "_parents",
+        "_paths",
+        "_stats",
+        "_options",
+    )
+
     def __init__(
         self,
         config_path,
         subset=None,
         verbose=False,
+        loader="auto",
+        cache=False,
+        cache_dir=None,
+        lazy=False,
+        coerce="numeric",
         _local_subsets=False,
         _info=None,
+        _prefix="",
     ):
         """
         Parameters
         ----------
-        config_path : str
-            The path the .yaml file
+        config_path : str | list
+            The path the .yaml file, or a list of paths deep-merged in order (later files
+            take precedence). A file can also name the file(s) it extends with a top-level
+            "_base_" key, see compose_config
         subset : str | None
             If only a subset of the file is needed, then specify
             the attribute name representing that subset
         verbose : bool
             Whether additional info will be printed
+        loader : str
+            The YAML loader backend: "auto" (libyaml if available), "c" or "python"
+        cache : bool
+            Whether to use the process-wide parsed-config cache. Reloading an unchanged
+            file then copies the cached parse instead of re-parsing (see configure_cache)
+        cache_dir : str | bool | None
+            If given, the parsed config is also stored in this directory (True for a
+            ".autoconfig_cache" directory next to the YAML file) and later loads of the
+            unchanged file, including from other processes, skip the YAML parse
+        lazy : bool
+            If True, nested sections are kept as parsed data and only converted into
+            args_from_YAML instances when first accessed
+        coerce : str | callable | None
+            How string values are converted: "numeric" turns numeric strings (e.g. "1e-05")
+            into int/float, "arrays" also stores homogeneous numeric lists of
+            ARRAY_MIN_LENGTH or more items as numpy arrays (array.array without numpy),
+            None or "off" keeps values as parsed, or a callable (key, value) -> value for
+            custom per-key conversion, where key is the dotted path of the value from the
+            top-level config (e.g. "model.lr"), so equal keys in different sections can be
+            told apart
         """
+        # Cached content digest, and the parsers containing this one (to invalidate their digests)
+        object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, "_parents", None)
+        object.__setattr__(self, "_reuse", None)
+        # Dotted path index, built on the first dotted lookup (see _PathIndex)
+        object.__setattr__(self, "_paths", None)
+        # Stats of the load and later operations, if enabled (see enable_stats)
+        object.__setattr__(self, "_stats", None)
+        # The subset, loader and coerce options of the load, reused by watch()
+        object.__setattr__(self, "_options", None)
         if _info is None:
             # _top-level
-            self.config_path = config_path
+            self.__dict__["config_path"] = config_path
         else:
-            self.subset = subset
+            self.__dict__["subset"] = subset
         self.reset(
-            subset=subset, _info=_info, verbose=verbose, _local_subsets=_local_subsets
+            subset=subset,
+            _info=_info,
+            verbose=verbose,
+            loader=loader,
+            cache=cache,
+            cache_dir=cache_dir,
+            lazy=lazy,
+            coerce=coerce,
+            _local_subsets=_local_subsets,
+            _prefix=_prefix,
         )
 
-    def save_to_yaml(self, path, mode="w", exclude=["subset"]):
-        """Write the current state of the class instance to a yaml file"""
-        with open(path, mode) as file:
-            _write_dict(_get_dict_exclude(self, exclude), file)
+    def save_to_yaml(
+        self, path, mode="w", exclude=["subset"], dumper=None, sidecars=True
+    ):
+        """Write the current state of the class instance to a yaml file
+
+        The file is written to a temporary file first and then renamed over the target,
+        so an interrupted save never leaves a truncated file (append mode writes directly)
+
+        Parameters
+        ----------
+        path : str
+            The output file path
+        mode : str
+            The file mode, "w" to overwrite or "a" to append
+        exclude : list
+            The names of attributes to exclude
+        dumper : str | None
+            None uses AutoConfig's own block-style writer. "auto", "c" or "python" emit
+            the file with PyYAML instead, where "auto" uses libyaml (yaml.CSafeDumper) if available
+        sidecars : bool
+            Whether arrays (numpy or array.array) are saved to .npy files next to the
+            YAML file, named "<file name>.<dotted key>.npy" and referenced with the
+            "!npy" tag, instead of being written as lists. Requires numpy
+        """
+        sidecars = _SidecarWriter(path) if sidecars and HAS_NUMPY else None
+
+        with _collect("save_to_yaml", path, self) as stats:
+
+            def write_func(file):
+                # Append mode starts at the end of the file
+                start = file.tell() if stats is not None else 0
+                if dumper is None:
+                    _write_node(self, file.write, exclude, sidecars=sidecars)
+                else:
+                    _dump_yaml(self, file, exclude, dumper, sidecars)
+                if stats is not None:
+                    stats.add("bytes_written", file.tell() - start)
+
+            with _phase(stats, "write"):
+                _atomic_write(path, write_func, mode)
 
-    def reset(self, subset="main", verbose=False, _info=None, _local_subsets=False):
+    def reset(
+        self,
+        subset="main",
+        verbose=False,
+        loader="auto",
+        cache=False,
+        cache_dir=None,
+        lazy=False,
+        coerce="numeric",
+        _info=None,
+        _local_subsets=False,
+        _prefix="",
+    ):
         """Recreate class instance with the provided kwargs"""
+        object.__setattr__(self, "_reuse", None)
+        _invalidate_hash(self)
+        _invalidate_paths(self)
         path = None
         if hasattr(self, "config_path"):
             path = self.config_path
-        _configure(
-            self,
-            path,
-            _info=_info,
-            subset=subset,
-            verbose=verbose,
-            _local_subsets=_local_subsets,
-        )
+        if _info is None:
+            # A new load, whose stats replace those of earlier operations
+            object.__setattr__(self, "_stats", None)
+            object.__setattr__(
+                self,
+                "_options",
+                {"subset": subset, "loader": loader, "coerce": coerce},
+            )
+        # Sections built during a load are counted in its stats
+        with _collect("load", path, self):
+            _configure(
+                self,
+                path,
+                _info=_info,
+                subset=subset,
+                verbose=verbose,
+                loader=loader,
+                cache=cache,
+                cache_dir=cache_dir,
+                lazy=lazy,
+                coerce=coerce,
+                _local_subsets=_local_subsets,
+                _prefix=_prefix,
+            )
 
-    def update_reuse(self, st_str="${", en_str="}", verbose=True):
+    def update_reuse(
+        self, st_str="${", en_str="}", ignore="???", verbose=True, rescan=False
+    ):
         """
         Subsets may have copies of higher-level parameters
         By default, any config items with the format "${name}" will be filled using a higher-level instance of "name"
         For example; if "seed: 0" and "subconfig.seed: ${seed}" exist, then it becomes "subconfig.seed: 0" after
         running <self.update_reuse()>
+
+        Placeholders may also be part of a longer string, e.g. "${save_path}/logs". They are
+        indexed on the first call and resolved in dependency order, so calling this again after
+        changing a source value only re-resolves the placeholders that depend on it.
+        Placeholders assigned later (via .set(), attributes or items) are indexed
+        automatically, use rescan=True to re-index after other changes (e.g. editing
+        __dict__ directly). Circular references raise a ValueError.
         """
-        _process_reuse(self, self, st_str=st_str, en_str=en_str, verbose=verbose)
+        with _collect("update_reuse", self.__dict__.get("config_path"), self) as stats:
+            with _phase(stats, "reuse"):
+                index = self._reuse
+                if (
+                    rescan
+                    or index is None
+                    or index.st_str != st_str
+                    or index.en_str != en_str
+                ):
+                    index = self._reuse = _ReuseIndex(
+                        self, st_str=st_str, en_str=en_str
+                    )
+                rendered = index.rendered
+                index.resolve(self, ignore=ignore, verbose=verbose)
+            if stats is not None:
+                stats.add("placeholders", len(index.refs))
+                stats.add("resolved", index.rendered - rendered)
+
+    def get_stats(self):
+        """Return the ConfigStats of loading this config, plus any later update_reuse and
+        save_to_yaml calls on it, or None if stats weren't enabled (see enable_stats)"""
+        return self._stats
+
+    def watch(
+        self,
+        callback=None,
+        interval=1.0,
+        backend="poll",
+        path=None,
+        subset=_AS_LOADED,
+        loader=_AS_LOADED,
+        coerce=_AS_LOADED,
+        start=True,
+    ):
+        """Reload changes to the YAML file in place while the program runs
+
+        The file is re-parsed once per change and only the attributes whose values changed
+        are replaced, so values changed with .set() and resolved "${}" placeholders are kept.
+        See ConfigWatcher for the parameters, subset, loader and coerce default to those
+        the parser was loaded with. Use start=False to only check for changes manually via
+        <watcher.check()>
+
+        Returns
+        -------
+        ConfigWatcher
+            The watcher, stop it with <watcher.stop()> or use it as a context manager
+        """
+        from .watch import ConfigWatcher
+
+        watcher = ConfigWatcher(
+            self,
+            path=path,
+            callback=callback,
+            interval=interval,
+            backend=backend,
+            subset=subset,
+            loader=loader,
+            coerce=coerce,
+        )
+        return watcher.start() if start else watcher
+
+    def freeze(self, exclude=("subset",)):
+        """Return an immutable, compact and hashable snapshot of the parser (see FrozenConfig)"""
+        from .frozen import FrozenConfig
+
+        return FrozenConfig(self, exclude)
+
+    def bind(self, schema, strict=False):
+        """Validate the config against a schema (a dataclass or annotated class) and return
+        it as an immutable object with typed, slotted fields (see bind_config)"""
+        from .schema import bind_config
+
+        return bind_config(self, schema, strict)
+
+    def share(self, exclude=("subset",)):
+        """Copy the config into shared memory and return a read-only SharedConfig view of it
+
+        Pickling the view (e.g. passing it to pool workers) only sends the block's name
+        """
+        from .share import SharedConfig
+
+        return SharedConfig(self, exclude)
+
+    def sweep(
+        self,
+        spec,
+        mode="grid",
+        n=None,
+        seed=0,
+        shard=0,
+        num_shards=1,
+        save_to=None,
+        exclude=["subset"],
+    ):
+        """Return a generator of variants of the config for a grid or random sweep
+
+        Example: cfg.sweep({"DAAC_cfg.lr": [1e-4, 1e-3], "seed": range(3)}) yields 6 variants
+        Unchanged sections are shared with this config, so writing to them through a
+        variant changes this config too, see sweep_configs for details
+        """
+        from .sweep import sweep_configs
+
+        return sweep_configs(
+            self, spec, mode, n, seed, shard, num_shards, save_to, exclude
+        )
 
     def pop(self, key, default=None):
         """Try to return the attribute and remove it from the parser"""
-        return self.__dict__.pop(key, default)
+        value = self.__dict__.pop(key, default)
+        _invalidate_hash(self)
+        _invalidate_paths(self)
+        if type(value) is _LazySection:
+            value = value.build()
+            _update_lazy_class(self)
+        return value
 
     def __iter__(self):
         """Return the _top-level attribute names via 'for key in class_inst'"""
         for key in self.__dict__.keys():
             yield key
 
+    def __reduce__(self):
+        return (_new_args, (), self.__getstate__())
+
+    def __getstate__(self):
+        # The whole tree is stored in the compact format of dumps_args. Parent links, cached
+        # hashes and indexes are rebuilt rather than copied, so pickling a section doesn't
+        # pull in the parsers containing it
+        return dumps_args(self)
+
+    def __setstate__(self, state):
+        if isinstance(state, bytes):
+            _restore_node(self, _decode_compact(state))
+            return
+        # Pickles from earlier versions store the plain __dict__, sections are restored
+        # (with their own __setstate__) before the parsers containing them
+        _init_slots(self)
+        self.__dict__.update(state)
+        for v in state.values():
+            if isinstance(v, args_from_YAML):
+                _add_parent(v, self)
+
+    def __copy__(self):
+        # A shallow copy shares the values and sections, as before __reduce__ was defined
+        # Same class, so pending lazy sections are still built on access
+        new = object.__new__(type(self))
+        _init_slots(new)
+        object.__setattr__(new, "_options", self._options)
+        new.__dict__.update(self.__dict__)
+        return new
+
+    def __deepcopy__(self, memo):
+        # Walk the tree rather than going through __getstate__, so values that can't be
+        # pickled (e.g. lambdas) are still copied. As with pickling, parent links and
+        # cached hashes and indexes aren't copied, the load options are shared
+        new = object.__new__(type(self))
+        _init_slots(new)
+        object.__setattr__(new, "_options", self._options)
+        memo[id(self)] = new
+        data = new.__dict__
+        for k, v in self.__dict__.items():
+            data[k] = copy.deepcopy(v, memo)
+            if isinstance(v, args_from_YAML):
+                _add_parent(data[k], new)
+        return new
+
+    def __setattr__(self, name, value):
+        data = self.__dict__
+        # A new key or a replaced section changes the dotted paths
+        structural = name not in data or isinstance(
+            data[name], (args_from_YAML, _LazySection)
+        )
+        object.__setattr__(self, name, value)
+        if isinstance(value, args_from_YAML):
+            _add_parent(value, self)
+            structural = True
+        if structural:
+            _invalidate_paths(self)
+        if self._hash is not None:
+            _invalidate_hash(self)
+        if isinstance(value, (str, args_from_YAML)):
+            _queue_reuse(self, name, value)
+
+    def __delattr__(self, name):
+        object.__delattr__(self, name)
+        _invalidate_hash(self)
+        _invalidate_paths(self)
+
     def __setitem__(self, key, value):
         """Support setting values via 'class_inst["key"] = value'"""
         setattr(self, key, value)
@@ -211,47 +872,571 @@ class args_from_YAML:
     def get(self, key):
         """Given an attribute name, or a list of nested attribute names return a single attribute value
 
-        Example: use key ["A", "B", "C", "D"] to retrieve attribute A.B.C.D
+        Example: use key ["A", "B", "C", "D"] or "A.B.C.D" to retrieve attribute A.B.C.D
+        Dotted keys are looked up in an index of every path, built on first use
         """
+        if type(key) is str and "." in key:
+            entry = (self._paths or _get_path_index(self)).nodes.get(key)
+            if entry is None:
+                raise AttributeError(f"AutoConfig has no attribute {key}")
+            return entry[1][entry[2]]
         return get_nested_attribute(self, key)  # self.__dict__.get(key, default)
 
     def set(self, key, value):
         """Given an attribute name or a list of nested attribute names, and a value, set the attribute to that value
 
-        Example: use key ["A", "B", "C", "D"] to set attribute A.B.C.D
+        Example: use key ["A", "B", "C", "D"] or "A.B.C.D" to set attribute A.B.C.D
         """
-        _nested_set(self, key, value)
+        if type(key) is str and "." in key:
+            entry = (self._paths or _get_path_index(self)).nodes.get(key)
+            key = key.split(".")
+            if entry is not None:
+                setattr(entry[0], entry[2], value)
+            else:
+                _nested_set(self, key, value)
+        else:
+            _nested_set(self, key, value)
+        if self._reuse is not None:
+            self._reuse.track(self, _key_path(key))
+
+    def find(self, pattern, exclude=("subset",)):
+        """Return {dotted path: value} for every path matching a glob pattern
+
+        Each "*" or "?" matches within one level, e.g. "*.seed" or "DAAC_cfg.*", and "**"
+        matches any number of levels, e.g. "**.seed". Only the matching branches of the
+        dotted path index are visited
+
+        Parameters
+        ----------
+        pattern : str
+            The dotted glob pattern
+        exclude : list
+            The names of attributes to leave out
+        """
+        return _get_path_index(self).find(pattern, exclude)
 
     def get_kwargs(self):
         """Return the attributes and values of the parser as a dictionary"""
         return _get_dict_exclude(self)
 
-    def print(self):
-        """For pretty printing of the parser's attributes and values"""
-        dict_print(_get_dict_exclude(self))
-        print()
+    def print(
+        self, max_depth=None, max_items=None, max_width=None, max_chars=None, write=None
+    ):
+        """For pretty printing of the parser's attributes and values
+
+        The sections are walked directly, without copying them into dictionaries
+
+        Parameters
+        ----------
+        max_depth : int | None
+            Sections nested deeper than this are shown as "{...}"
+        max_items : int | None
+            Lists are shown with at most this many items
+        max_width : int | None
+            Lines longer than this are cut
+        max_chars : int | None
+            Stop once the text reaches this many characters
+        write : callable | logging.Logger | None
+            Where to send the text instead of stdout, e.g. file.write or a Logger
+        """
+        kwargs = dict(
+            max_depth=max_depth,
+            max_items=max_items,
+            max_width=max_width,
+            max_chars=max_chars,
+            _items=_render_items,
+        )
+        if write is None:
+            dict_print(self, **kwargs)
+            print()
+        else:
+            render_dict(self, write, **kwargs)
+
+    def render(self, max_depth=None, max_items=None, max_width=None, max_chars=None):
+        """Return the text of .print() as a string, see print for the parameters"""
+        return render_dict(
+            self,
+            max_depth=max_depth,
+            max_items=max_items,
+            max_width=max_width,
+            max_chars=max_chars,
+            _items=_render_items,
+        )
 
     def __str__(self) -> str:
-        return f"{_get_dict_exclude(self)}"
+        return _node_repr(self)
+
+
+def _new_args():
+    """Create an empty parser, used when unpickling"""
+    obj = object.__new__(args_from_YAML)
+    _init_slots(obj)
+    return obj
+
+
+def _init_slots(obj):
+    for name in ("_reuse", "_hash", "_parents", "_paths", "_stats", "_options"):
+        object.__setattr__(obj, name, None)
+
+
+# Flag set in the memo of _compact_node (whose other keys are tuples)
+_HAS_ARRAYS = "arrays"
+
+
+def _compact_node(obj, memo):
+    """Return a parser as nested (keys, values, section indices) tuples
+
+    Equal key tuples (e.g. repeated sections) are shared through memo, so marshal
+    writes them once
+    """
+    data = obj.__dict__ if type(obj) is args_from_YAML else dict(_node_items(obj))
+    values = list(data.values())
+    sections = tuple(i for i, v in enumerate(values) if isinstance(v, args_from_YAML))
+    for i in sections:
+        values[i] = _compact_node(values[i], memo)
+    if any(map(is_array, values)):
+        # marshal would silently store arrays as bytes
+        memo[_HAS_ARRAYS] = True
+    keys = tuple(data)
+    return memo.setdefault(keys, keys), tuple(values), sections
+
+
+def _restore_node(obj, node):
+    """Fill an empty parser from the tuples of _compact_node"""
+    keys, values, sections = node
+    _init_slots(obj)
+    data = obj.__dict__
+    data.update(zip(keys, values))
+    for i in sections:
+        child = object.__new__(args_from_YAML)
+        _restore_node(child, values[i])
+        data[keys[i]] = child
+        _add_parent(child, obj)
+
+
+def dumps_args(obj):
+    """Serialize a parser to compact bytes, restored with loads_args
+
+    The tree is stored as nested tuples of keys and values, written with marshal (or
+    pickle if any value isn't supported by marshal), which is several times smaller and
+    faster than pickling the parser objects. Lazy sections are built first, and the
+    update_reuse index isn't stored (resolved values are kept)
+    """
+    memo = {}
+    node = _compact_node(obj, memo)
+    if _HAS_ARRAYS not in memo:
+        try:
+            return b"M" + marshal.dumps(node)
+        except ValueError:
+            pass
+    return b"P" + pickle.dumps(node, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_compact(data):
+    if data[:1] == b"M":
+        return marshal.loads(memoryview(data)[1:])
+    elif data[:1] == b"P":
+        return pickle.loads(memoryview(data)[1:])
+    raise ValueError("Not an AutoConfig compact state")
+
+
+def loads_args(data):
+    """Restore a parser from the bytes of dumps_args"""
+    obj = object.__new__(args_from_YAML)
+    _restore_node(obj, _decode_compact(data))
+    return obj
+
+
+def _add_parent(child, parent):
+    """Record that child is a section of parent, so modifying child invalidates parent's hash"""
+    parents = getattr(child, "_parents", None)
+    if parents is None:
+        object.__setattr__(child, "_parents", [parent])
+    elif not any(p is parent for p in parents):
+        parents.append(parent)
+
+
+def _queue_reuse(obj, name, value):
+    """Queue an assigned placeholder or section for the update_reuse indexes of obj and the
+    parsers containing it, which index it on their next pass"""
+    stack = [obj]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        index = node._reuse
+        if index is not None and (
+            isinstance(value, args_from_YAML) or index.st_str in value
+        ):
+            index.pending.append((obj, name))
+        stack.extend(node._parents or ())
+
+
+def _paths_to(root, node):
+    """Return the key paths under which node is reachable from root, via the parent links"""
+    if node is root:
+        return [()]
+    out = []
+    for parent in node._parents or ():
+        for k, v in parent.__dict__.items():
+            # Stale links (e.g. a replaced section) don't match
+            if v is node:
+                out.extend(p + (k,) for p in _paths_to(root, parent))
+    return out
 
 
-def _try_float(obj):
-    """Try to convert attribute values to float or int in-place"""
+def _invalidate_hash(obj):
+    """Clear the cached content digest of a parser and every parser containing it"""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        # A parent's hash is never cached without its sections' hashes, so stop at cleared ones
+        if node._hash is not None:
+            object.__setattr__(node, "_hash", None)
+            stack.extend(node._parents or ())
+
+
+class _LazySection:
+    """Parsed data of a nested section that hasn't been accessed yet (see lazy=True)"""
+
+    __slots__ = ("info", "path", "subset", "coerce", "prefix")
+
+    def __init__(self, info, path, subset, coerce="numeric", prefix=""):
+        self.info = info
+        self.path = path
+        self.subset = subset
+        self.coerce = coerce
+        self.prefix = prefix
+
+    def build(self):
+        """Create the args_from_YAML instance for this section"""
+        return args_from_YAML(
+            self.path,
+            _info=self.info,
+            subset=self.subset,
+            lazy=True,
+            coerce=self.coerce,
+            _prefix=self.prefix,
+        )
+
+
+class _lazy_args_from_YAML(args_from_YAML):
+    """args_from_YAML with un-accessed sections, which are built on first attribute access
+
+    Instances revert to args_from_YAML once every section is built, so the extra
+    attribute lookup cost only applies while sections are pending
+    """
+
+    __slots__ = ()
+
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+        if type(value) is _LazySection:
+            value = value.build()
+            self.__dict__[name] = value
+            _add_parent(value, self)
+            _update_lazy_class(self)
+        return value
+
+
+def _update_lazy_class(obj):
+    """Switch between the lazy and regular class depending on whether any sections are pending"""
+    if _LazySection in map(type, obj.__dict__.values()):
+        obj.__class__ = _lazy_args_from_YAML
+    elif type(obj) is _lazy_args_from_YAML:
+        obj.__class__ = args_from_YAML
+
+
+def _node_items(obj):
+    """Yield the (key, value) attribute pairs of a parser, building any lazy sections"""
     for k, v in obj.__dict__.items():
-        # If the value is not already converted to a number
-        if isinstance(v, str):
-            try:
-                tmp = float(v)
-                if int(tmp) - tmp == 0:
-                    # If equivalent to integer then, assume int
-                    tmp = int(tmp)
-                obj[k] = tmp
-            except ValueError:
-                # Can't convert to float, so ignore it
+        if type(v) is _LazySection:
+            v = getattr(obj, k)
+        yield k, v
+
+
+def _render_items(data, exclude=("subset",)):
+    """Return the (key, value) pairs of a parser or dict for render_dict, None for values"""
+    if isinstance(data, args_from_YAML):
+        return [(k, v) for k, v in _node_items(data) if k not in exclude]
+    return data.items() if isinstance(data, dict) else None
+
+
+def _node_repr(obj, exclude=("subset",)):
+    """Return the repr of a parser as nested dicts (as str(args)), without copying it"""
+    items = obj.__dict__.items() if type(obj) is args_from_YAML else _node_items(obj)
+    return (
+        "{"
+        + ", ".join(
+            f"{k!r}: {_node_repr(v, exclude) if isinstance(v, args_from_YAML) else repr(v)}"
+            for k, v in items
+            if k not in exclude
+        )
+        + "}"
+    )
+
+
+def _iter_leaves(obj, exclude=("subset",), _prefix=()):
+    """Yield (key path tuple, value) for every non-section value below a parser
+
+    Lazy sections are read from their parsed data without building them
+    """
+    for k, v in obj.__dict__.items():
+        if k in exclude:
+            continue
+        if isinstance(v, args_from_YAML):
+            yield from _iter_leaves(v, exclude, _prefix + (k,))
+        elif type(v) is _LazySection:
+            yield from _iter_info_leaves(v.info, _prefix + (k,))
+        else:
+            yield _prefix + (k,), v
+
+
+def _iter_info_leaves(info, prefix, _local_subsets=False):
+    """Yield (key path tuple, value) for parsed section data, mirroring how _configure nests it"""
+    for k, v in info.items():
+        if k == "_local_":
+            _local_subsets = v
+        if isinstance(v, dict):
+            if _local_subsets:
+                yield from _iter_info_leaves(v, prefix, _local_subsets)
+            else:
+                yield from _iter_info_leaves(v, prefix + (k,))
+        else:
+            yield prefix + (k,), v
+
+
+def _key_path(key):
+    """Return a key or list of nested keys as a tuple"""
+    return tuple(key) if isinstance(key, (list, tuple)) else (key,)
+
+
+def _has_magic(part):
+    return "*" in part or "?" in part or "[" in part
+
+
+def _match_parts(parts, pattern):
+    """Whether the key path parts match the pattern segments ("**" matches any number)"""
+    if not pattern:
+        return not parts
+    head = pattern[0]
+    if head == "**":
+        return any(_match_parts(parts[i:], pattern[1:]) for i in range(len(parts) + 1))
+    return (
+        bool(parts)
+        and fnmatchcase(parts[0], head)
+        and _match_parts(parts[1:], pattern[1:])
+    )
+
+
+class _PathIndex:
+    """Index of every dotted path below a parser, used by get, set and find
+
+    Each path maps to the parser holding it and its key there, so values changed in place
+    are always current. Adding or removing keys, or replacing a section, clears the index
+    of that parser and every parser containing it (see _invalidate_paths)
+    """
+
+    __slots__ = ("nodes", "children", "names")
+
+    def __init__(self, root):
+        # dotted path -> (parser, parser.__dict__, key)
+        self.nodes = {}
+        # dotted section path ("" for the root) -> [(key, dotted path), ...]
+        self.children = {}
+        # key -> [dotted path, ...]
+        self.names = {}
+        self._add(root, "")
+
+    def _add(self, node, prefix):
+        children = self.children[prefix] = []
+        for k, v in _node_items(node):
+            name = str(k)
+            path = prefix + "." + name if prefix else name
+            self.nodes[path] = (node, node.__dict__, k)
+            children.append((name, path))
+            self.names.setdefault(name, []).append(path)
+            if isinstance(v, args_from_YAML):
+                self._add(v, path)
+
+    def find(self, pattern, exclude=("subset",)):
+        parts = pattern.split(".")
+        if "**" in parts and not _has_magic(parts[-1]):
+            # Only the paths ending in that key can match
+            paths = [
+                p
+                for p in self.names.get(parts[-1], ())
+                if _match_parts(p.split("."), parts)
+            ]
+        else:
+            paths = []
+            self._walk("", parts, paths)
+        out = {}
+        for p in paths:
+            _, data, k = self.nodes[p]
+            if k not in exclude:
+                out[p] = data[k]
+        return out
+
+    def _walk(self, prefix, parts, out):
+        """Collect the paths below prefix matching the pattern segments, level by level"""
+        head, rest = parts[0], parts[1:]
+        if head == "**":
+            if rest:
+                self._walk(prefix, rest, out)
+            for _, path in self.children.get(prefix, ()):
+                if not rest:
+                    out.append(path)
+                self._walk(path, parts, out)
+            return
+        if _has_magic(head):
+            matches = [
+                p for k, p in self.children.get(prefix, ()) if fnmatchcase(k, head)
+            ]
+        else:
+            path = prefix + "." + head if prefix else head
+            matches = [path] if path in self.nodes else []
+        for path in matches:
+            if rest:
+                self._walk(path, rest, out)
+            else:
+                out.append(path)
+
+
+def _get_path_index(obj):
+    index = obj._paths
+    if index is None:
+        index = _PathIndex(obj)
+        object.__setattr__(obj, "_paths", index)
+    return index
+
+
+def _invalidate_paths(obj):
+    """Clear the dotted path index of a parser and every parser containing it"""
+    stack = [obj]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen.add(id(node))
+            object.__setattr__(node, "_paths", None)
+            stack.extend(node._parents or ())
+
+
+def _dump_yaml(obj, file, exclude=("subset",), dumper="auto", sidecars=None):
+    """Emit a parser to an open file with PyYAML, representing sections without copying them"""
+
+    class _Dumper(get_dumper(dumper)):
+        pass
+
+    # The dotted key prefix of each section, for naming sidecar files
+    prefixes = {id(obj): ""}
+
+    def _represent(representer, node):
+        prefix = prefixes.get(id(node), "")
+        items = []
+        for k, v in _node_items(node):
+            if k in exclude:
                 continue
-        elif isinstance(v, args_from_YAML):
-            # Recursion
-            _try_float(v)
+            if isinstance(v, args_from_YAML):
+                prefixes[id(v)] = f"{prefix}{k}."
+            elif is_array(v):
+                v = v.tolist() if sidecars is None else sidecars.save(f"{prefix}{k}", v)
+            items.append((k, v))
+        return representer.represent_mapping("tag:yaml.org,2002:map", items)
+
+    def _represent_ref(representer, ref):
+        return representer.represent_scalar(NPY_TAG, ref.path)
+
+    _Dumper.add_multi_representer(args_from_YAML, _represent)
+    _Dumper.add_representer(NpyRef, _represent_ref)
+    yaml.dump(obj, file, Dumper=_Dumper, sort_keys=False, default_flow_style=False)
+
+
+# A string can only be parsed by float() if it starts with one of these (or whitespace)
+_NUMERIC_START = frozenset("0123456789+-.iInN")
+
+
+def _coerce_numeric(value):
+    """Convert a numeric string to int (if integral) or float, otherwise return it unchanged"""
+    if not isinstance(value, str) or not value:
+        return value
+    c = value[0]
+    # Quickly reject strings that clearly aren't numbers, without raising an exception
+    if c not in _NUMERIC_START and not c.isdigit() and not c.isspace():
+        return value
+    try:
+        tmp = float(value)
+    except ValueError:
+        # Can't convert to float, so ignore it
+        return value
+    if tmp.is_integer():
+        # If equivalent to integer then, assume int
+        return int(tmp)
+    if tmp != tmp:
+        # Leave "nan" as a string
+        return value
+    return tmp
+
+
+def _get_coercer(coerce):
+    """Return a function (key, value) -> value implementing the given coercion policy
+
+    Parameters
+    ----------
+    coerce : str | callable | None
+        "numeric" converts numeric strings to int/float, "arrays" also stores long
+        numeric lists as arrays, None or "off" leaves values as parsed, or a callable
+        (key, value) -> value for custom conversion
+
+    The returned function is called with the dotted path of each value, e.g. "model.lr"
+    """
+    if coerce == "numeric":
+        return lambda k, v: _coerce_numeric(v)
+    elif coerce == "arrays":
+        return _coerce_arrays
+    elif coerce is None or coerce == "off":
+        return None
+    elif callable(coerce):
+        return coerce
+    raise ValueError(
+        f'Unknown coerce policy "{coerce}", expected "numeric", "arrays", "off", None or a callable'
+    )
+
+
+def _coerce_arrays(key, value):
+    """Numeric coercion that also stores long homogeneous numeric lists as arrays (see to_array)"""
+    if type(value) is list and len(value) >= ARRAY_MIN_LENGTH:
+        out = to_array(value)
+        if out is None:
+            # Items like 1e-05 are parsed as strings
+            out = to_array(list(map(_coerce_numeric, value)))
+        return value if out is None else out
+    return _coerce_numeric(value)
+
+
+def _timed_coercer(coercer, stats):
+    """Wrap a coercer to add its time and the number of changed values to stats"""
+    perf_counter = time.perf_counter
+
+    def coerce(key, value):
+        st = perf_counter()
+        out = coercer(key, value)
+        stats.add_time("coerce", perf_counter() - st)
+        if out is not value:
+            stats.add("coerced")
+        return out
+
+    return coerce
+
+
+def _unshared(value):
+    """Copy a mutable (list or set) leaf value, as the parsed data may be a cached base file
+    shared with other configs. Sections are always built into new parsers"""
+    t = type(value)
+    return _copy_tree(value) if t is list or t is set else value
 
 
 def _configure(
@@ -259,9 +1444,15 @@ def _configure(
     path=None,
     subset=None,
     verbose=False,
+    loader="auto",
+    cache=False,
+    cache_dir=None,
+    lazy=False,
+    coerce="numeric",
     _info=None,
     _local_subsets=False,
     _top=False,
+    _prefix="",
 ):
     """Performs the YAML file parsing recursively
 
@@ -269,19 +1460,51 @@ def _configure(
     ----------
     obj : args_from_YAML
         The parent parser
-    path : str | None
-        The YAML file path
+    path : str | list | None
+        The YAML file path, or a list of paths to deep-merge in order
     subset : str | None
         Retrieve only a subset of the config, specified
         by attribute name
     verbose : bool
         Whether additional info is printed
+    loader : str
+        The YAML loader backend: "auto", "c" or "python"
+    cache : bool
+        Whether to use the process-wide parsed-config cache
+    cache_dir : str | bool | None
+        The on-disk cache directory, if any
+    lazy : bool
+        Whether nested sections are only built when first accessed
+    coerce : str | callable | None
+        The type coercion policy applied once to each value, see _get_coercer
+    _prefix : str
+        The dotted path of obj followed by ".", or "" at the top level, which coercers
+        receive in front of each key
     """
+    coercer = _get_coercer(coerce)
     if _info is None:
         _top = True
-        with open(path, "r") as f:
-            _info = yaml.safe_load(f)
+        _info = compose_config(
+            path,
+            subset=subset,
+            loader=loader,
+            cache=cache,
+            cache_dir=cache_dir,
+            _shared=True,
+        )
+
+    stats = _STATS.current()
+    if stats is not None:
+        stats.add("nodes")
+        stats.add("keys", len(_info))
+        if _top:
+            start = time.perf_counter()
+            coerce_time = stats.times.get("coerce", 0.0)
+        if coercer is not None:
+            coercer = _timed_coercer(coercer, stats)
 
+    # Write attributes directly, reset() already invalidated any cached hash
+    data = obj.__dict__
     for k, v in _info.items():
         if k == "_local_":
             _local_subsets = v
@@ -294,16 +1517,35 @@ def _configure(
                         path=path,
                         _info=v,
                         subset=None,
+                        lazy=lazy,
+                        coerce=coerce,
                         _local_subsets=_local_subsets,
+                        _prefix=_prefix,
                     )
+                elif lazy:
+                    # Defer building the section until it is accessed
+                    data[k] = _LazySection(v, path, k, coerce, f"{_prefix}{k}.")
                 else:
                     # Recursively add subclasses to contain the dictionary values as needed (per the given YAML structure)
                     # Ex: A.B.C.D.value
-                    setattr(obj, k, args_from_YAML(path, _info=v, subset=k))
+                    data[k] = args_from_YAML(
+                        path, _info=v, subset=k, coerce=coerce, _prefix=f"{_prefix}{k}."
+                    )
+                    _add_parent(data[k], obj)
+        elif type(v) is NpyRef:
+            # Memory-map "!npy" sidecar arrays
+            data[k] = v.load()
+        elif coercer is not None:
+            # Each value is converted exactly once, sections convert their own values
+            data[k] = coercer(f"{_prefix}{k}", _unshared(v))
         else:
-            setattr(obj, k, v)
+            data[k] = _unshared(v)
 
-    _try_float(obj)
+    _update_lazy_class(obj)
+    if stats is not None and _top:
+        # Every section has been built, less the time spent coercing values
+        coerce_time = stats.times.get("coerce", 0.0) - coerce_time
+        stats.add_time("build", time.perf_counter() - start - coerce_time)
     if verbose:
         print(f"AutoConfig using: {path}, subset: {subset}")
         # obj.print()
@@ -311,7 +1553,7 @@ def _configure(
 
 def reassign(target, source):
     """All attributes from 'target' class instance are added to 'source' class instance"""
-    for k, v in source.__dict__.items():
+    for k, v in _node_items(source):
         setattr(target, k, v)
 
 
@@ -358,69 +1600,189 @@ def _nested_set(obj, att_list, value):
         setattr(obj, att_list, value)
 
 
-def _process_reuse(
-    data,
-    original_data,
-    st_str="${",
-    en_str="}",
-    ignore="???",
-    max_depth=10,
-    verbose=True,
-):
-    """
-    Subsets may have copies of higher-level parameters
-    By default, any config items with the format "${name}" will be filled using a higher-level instance of "name"
-    For example; if "seed: 0" and "subconfig.seed: ${seed}" exist, then it becomes "subconfig.seed: 0" after
-    running <self.update_reuse()>
+class _Reference:
+    """A value containing reuse placeholders, e.g. "${seed}" or "${save_path}/logs" """
 
-    Parameters
-    ----------
-    data : args_from_YAML
-        The parser to be updated
-    original_data : args_from_YAML
-        Typically, the same parser as "data", but can be a different one
-    st_str : str
-        The beginning characters of the reuse identifier
-    en_str : str
-        The end characters of the reuse identifier
-    ignore : str
-        If only a partial update is desired, then set the high-level attribute's value to this and
-        it will be ignored
-    max_depth : int
-        Maximum recursion depth
-    verbose : bool
-        Whether additional info will be printed
+    __slots__ = ("template", "parts", "deps", "whole", "resolved", "value", "sources")
+
+    def __init__(self, template, st_str, en_str):
+        self.template = template
+        # Literal strings and key path tuples, in order
+        self.parts = []
+        idx = 0
+        while True:
+            st = template.find(st_str, idx)
+            en = template.find(en_str, st + len(st_str)) if st >= 0 else -1
+            if en < 0:
+                break
+            if st > idx:
+                self.parts.append(template[idx:st])
+            self.parts.append(tuple(template[st + len(st_str) : en].split(".")))
+            idx = en + len(en_str)
+        if idx < len(template):
+            self.parts.append(template[idx:])
+
+        self.deps = [p for p in self.parts if isinstance(p, tuple)]
+        # A single placeholder is replaced by the referenced value itself, keeping its type
+        self.whole = len(self.parts) == 1 and len(self.deps) == 1
+        self.resolved = False
+        self.value = None
+        self.sources = None
+
+    def render(self, values):
+        """Return the value with each placeholder filled in using the given source values"""
+        if self.whole:
+            return values[0]
+        it = iter(values)
+        return "".join(str(next(it)) if isinstance(p, tuple) else p for p in self.parts)
+
+
+class _ReuseIndex:
+    """Index of every reuse placeholder below a parser, used by update_reuse
+
+    References are looked up from the parser the index belongs to. Each pass resolves the
+    placeholders in dependency order, and skips any whose source values and target value are
+    unchanged since they were last resolved
     """
 
-    def _check_replace(v):
-        # Check if this value matches the replacement format and if so, remove the identifiers to get the real string
-        if (
-            isinstance(v, str)
-            and v[: len(st_str)] == st_str
-            and v[-len(en_str) :] == en_str
-        ):
-            return [s.replace(st_str, "").replace(en_str, "") for s in v.split(".")]
+    # Number of placeholder values rendered, for the stats
+    rendered = 0
+
+    def __init__(self, root, st_str="${", en_str="}"):
+        self.st_str = st_str
+        self.en_str = en_str
+        # key path tuple -> _Reference
+        self.refs = {}
+        for path, v in _iter_leaves(root):
+            self._add(path, v)
+        self._prefixes = None
+        # (parser, name) of values assigned since the last pass, see _queue_reuse
+        self.pending = []
+
+    def _add(self, path, value):
+        """Index the value at path if it contains a placeholder"""
+        if isinstance(value, str) and self.st_str in value:
+            ref = _Reference(value, self.st_str, self.en_str)
+            if ref.deps:
+                self.refs[path] = ref
+                self._prefixes = None
+
+    def track(self, root, path):
+        """Re-index a path (and anything below it) after its value was set"""
+        n = len(path)
+        for p in [p for p in self.refs if p[:n] == path]:
+            del self.refs[p]
+        self._prefixes = None
+        try:
+            value = get_nested_attribute(root, path)
+        except AttributeError:
+            return
+        if isinstance(value, args_from_YAML):
+            for p, v in _iter_leaves(value, _prefix=path):
+                self._add(p, v)
         else:
-            return None
+            self._add(path, value)
 
-    for k, v in data.__dict__.items():
-        temp = _check_replace(v)
-        if temp is not None:
+    def _dependencies(self, dep):
+        """Return the indexed placeholders that must be resolved before looking up dep"""
+        if self._prefixes is None:
+            # Map every section path to the placeholder paths below it
+            self._prefixes = {}
+            for p in self.refs:
+                for i in range(1, len(p)):
+                    self._prefixes.setdefault(p[:i], []).append(p)
+        # The value itself, any placeholder it is looked up through, or placeholders inside it
+        out = [dep[:i] for i in range(1, len(dep) + 1) if dep[:i] in self.refs]
+        return out + self._prefixes.get(dep, [])
+
+    def _check_targets(self, root):
+        """Drop or re-parse placeholders whose value was changed since the last pass"""
+        for path, ref in list(self.refs.items()):
             try:
-                # Account for nested ${} inside references. Use a for loop to prevent high recursions
-                for _ in range(max_depth):
-                    n_att = get_nested_attribute(original_data, temp)
-                    temp = _check_replace(n_att)
-                    if temp is None:
-                        break
-                # If an ignore value is specified, then do not perform updates with that value
-                # The ignored source value(s) can be updated later and this function re-run
-                if ignore is None or n_att != ignore:
-                    setattr(data, k, n_att)
+                current = get_nested_attribute(root, path)
             except AttributeError:
-                if verbose:
-                    print(
-                        f'WARNING: AutoConfig could not find the following term for reuse: "{".".join(temp)}". Suppress warning with "verbose=False"'
-                    )
-        elif isinstance(v, args_from_YAML):
-            _process_reuse(v, original_data, verbose=verbose)
+                del self.refs[path]
+                self._prefixes = None
+                continue
+            if current is not (ref.value if ref.resolved else ref.template):
+                # Overwritten by the user, so index the new value instead
+                del self.refs[path]
+                self._prefixes = None
+                self._add(path, current)
+
+    def _index_pending(self, root):
+        """Index the placeholders and sections assigned since the last pass"""
+        pending, self.pending = self.pending, []
+        for node, name in pending:
+            for path in _paths_to(root, node):
+                path += (name,)
+                # Indexed values that were overwritten are handled by _check_targets
+                if path not in self.refs or isinstance(
+                    node.__dict__.get(name), args_from_YAML
+                ):
+                    self.track(root, path)
+
+    def resolve(self, root, ignore="???", verbose=True):
+        """Fill in every placeholder that can be resolved"""
+        self._index_pending(root)
+        self._check_targets(root)
+        state = {}
+        for path in list(self.refs):
+            self._resolve(root, path, state, ignore, verbose, [])
+
+    def _resolve(self, root, path, state, ignore, verbose, stack):
+        """Resolve one placeholder after its dependencies, returning whether it is resolved"""
+        done = state.get(path)
+        if done is not None:
+            return done
+        if path in stack:
+            cycle = stack[stack.index(path) :] + [path]
+            raise ValueError(
+                "AutoConfig found circular references: "
+                + " -> ".join(".".join(map(str, p)) for p in cycle)
+            )
+
+        ref = self.refs[path]
+        stack.append(path)
+        ok = True
+        for dep in ref.deps:
+            for p in self._dependencies(dep):
+                if p != path and not self._resolve(
+                    root, p, state, ignore, verbose, stack
+                ):
+                    # Unresolved (ignored or missing) placeholders can't be used as sources
+                    ok = ok and not (p == dep[: len(p)])
+        stack.pop()
+
+        values = []
+        if ok:
+            for dep in ref.deps:
+                try:
+                    values.append(get_nested_attribute(root, dep))
+                except AttributeError:
+                    if verbose:
+                        print(
+                            f'WARNING: AutoConfig could not find the following term for reuse: "{".".join(map(str, dep))}". Suppress warning with "verbose=False"'
+                        )
+                    ok = False
+                    break
+        # If an ignore value is specified, then do not perform updates with that value
+        # The ignored source value(s) can be updated later and this function re-run
+        if ok and ignore is not None:
+            ok = not any(isinstance(v, str) and v == ignore for v in values)
+
+        if ok:
+            sources = tuple(values)
+            if not (
+                ref.resolved
+                and len(sources) == len(ref.sources)
+                and all(a is b for a, b in zip(sources, ref.sources))
+            ):
+                ref.value = ref.render(values)
+                self.rendered += 1
+                ref.sources = sources
+                ref.resolved = True
+                _nested_set(root, list(path), ref.value)
+        # A previously resolved value can still be used if the sources are now unavailable
+        state[path] = ref.resolved
+        return ref.resolved
@@ -0,0 +1,129 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .autoconfig import args_from_YAML
+from .sweep import _map_pool
+
+
+def _load(path, update_reuse, kwargs):
+    """Load one config, resolving its placeholders if requested"""
+    args = args_from_YAML(path, **kwargs)
+    if update_reuse:
+        if update_reuse is True:
+            update_reuse = {"verbose": kwargs.get("verbose", False)}
+        args.update_reuse(**update_reuse)
+    return args
+
+
+def _load_job(job):
+    """Load one config, returning the exception instead of raising it
+
+    Module-level so process pools can pickle it, and errors are returned so one bad file
+    doesn't stop pool.map from returning the others
+    """
+    path, update_reuse, kwargs = job
+    try:
+        return _load(path, update_reuse, kwargs)
+    except Exception as e:
+        return e
+
+
+def load_many(paths, workers=None, executor="thread", update_reuse=False, **kwargs):
+    """Load many configs, optionally on a pool of workers, returning them in input order
+
+    A file that fails to load doesn't stop the others: its exception is returned in its
+    place (as with asyncio.gather(..., return_exceptions=True))
+
+    Parameters
+    ----------
+    paths : iterable
+        The config paths, each a path or a list of paths to merge (see args_from_YAML)
+    workers : int | None
+        The number of parallel loaders, None or 1 loads serially in this thread
+    executor : str | concurrent.futures.Executor
+        "thread" overlaps file reads, "process" also parses in parallel (the configs
+        are pickled back). An existing pool can be passed instead, which is left running
+    update_reuse : bool | dict
+        Whether to call update_reuse() on each config, or the kwargs to call it with
+    **kwargs
+        Passed to args_from_YAML, e.g. subset, verbose, loader or cache_dir
+
+    Returns
+    -------
+    list
+        An args_from_YAML instance or an exception for each path
+    """
+    jobs = [(path, update_reuse, kwargs) for path in paths]
+    return list(_map_pool(_load_job, jobs, workers, executor))
+
+
+async def aload(path, update_reuse=False, executor=None, **kwargs):
+    """Load a config without blocking the event loop
+
+    Parameters
+    ----------
+    path : str | list
+        The config path, or a list of paths to merge
+    update_reuse : bool | dict
+        Whether to call update_reuse() on the config, or the kwargs to call it with
+    executor : concurrent.futures.Executor | None
+        The pool to load on, None uses the event loop's default thread pool
+    **kwargs
+        Passed to args_from_YAML
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(_load, path, update_reuse, kwargs)
+    )
+
+
+async def aload_many(
+    paths, workers=None, executor="thread", update_reuse=False, **kwargs
+):
+    """Load many configs without blocking the event loop, returning them in input order
+
+    Failed files have their exception in place of the config, see load_many
+
+    Parameters
+    ----------
+    paths : iterable
+        The config paths, each a path or a list of paths to merge
+    workers : int | None
+        The size of the pool created for this call. None uses the event loop's default
+        thread pool (or a default sized process pool)
+    executor : str | concurrent.futures.Executor
+        "thread", "process", or an existing pool, which is left running
+    update_reuse : bool | dict
+        Whether to call update_reuse() on each config, or the kwargs to call it with
+    **kwargs
+        Passed to args_from_YAML
+    """
+    loop = asyncio.get_running_loop()
+    pool = None
+    if isinstance(executor, Executor):
+        target = executor
+    elif executor == "thread":
+        target = pool = None if workers is None else ThreadPoolExecutor(workers)
+    elif executor == "process":
+        target = pool = ProcessPoolExecutor(workers)
+    else:
+        raise ValueError(
+            f'Unknown executor "{executor}", expected "thread" or "process"'
+        )
+    try:
+        futures = [
+            loop.run_in_executor(target, _load_job, (path, update_reuse, kwargs))
+            for path in paths
+        ]
+        return await asyncio.gather(*futures)
+    finally:
+        if pool is not None:
+            # Every load is done unless this task was cancelled
+            pool.shutdown(wait=False, cancel_futures=True)
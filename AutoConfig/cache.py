@@ -0,0 +1,236 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ["hits", "misses", "evictions", "entries", "bytes", "max_entries", "max_bytes"],
+)
+
+
+def _copy_tree(data):
+    """Copy the mutable containers of a parsed YAML tree (scalars are immutable and shared)"""
+    if type(data) is dict:
+        return {k: _copy_tree(v) for k, v in data.items()}
+    elif type(data) is list:
+        return [_copy_tree(v) for v in data]
+    elif type(data) is set:
+        return set(data)
+    return data
+
+
+class ConfigCache:
+    """A thread-safe LRU cache of parsed YAML trees with entry and byte limits
+
+    Values are stored as parsed and every hit returns an independent copy, so
+    modifying one loaded config never affects another (unless copy=False)
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 2**20, copy=True):
+        """
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of cached configs
+        max_bytes : int
+            Maximum total size (of the source files) of the cached configs
+        copy : bool
+            Whether values are copied when stored and returned. If False, the values
+            are shared by reference and must never be modified
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.copy = copy
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return a copy of the cached value for key, or None if missing"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return _copy_tree(entry[0]) if self.copy else entry[0]
+
+    def put(self, key, value, nbytes):
+        """Store a copy of value under key, evicting the least recently used entries as needed"""
+        if nbytes > self.max_bytes or self.max_entries < 1:
+            return
+        if self.copy:
+            value = _copy_tree(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, nbytes) = self._data.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def resize(self, max_entries=None, max_bytes=None):
+        """Change the limits, evicting entries if the cache is now too large"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return the current counters and limits as a CacheInfo tuple"""
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                len(self._data),
+                self._bytes,
+                self.max_entries,
+                self.max_bytes,
+            )
+
+
+# Process-wide cache used by args_from_YAML(..., cache=True)
+_CACHE = ConfigCache()
+# Parsed base files of composed configs (see loader.compose_config), shared by every overlay.
+# The sections are built into new parsers, and _configure copies the mutable leaves
+_BASE_CACHE = ConfigCache(max_entries=64, copy=False)
+
+
+def configure_cache(max_entries=None, max_bytes=None):
+    """Set the entry and byte limits of the process-wide parsed-config cache"""
+    _CACHE.resize(max_entries=max_entries, max_bytes=max_bytes)
+
+
+def cache_info():
+    """Return the hit/miss/eviction counters and usage of the process-wide parsed-config cache"""
+    return _CACHE.info()
+
+
+def clear_cache():
+    """Empty the process-wide parsed-config and base file caches and reset their counters"""
+    _CACHE.clear()
+    _BASE_CACHE.clear()
+
+
+# On-disk cache format, bump DISK_FORMAT_VERSION whenever the stored tree changes
+DISK_FORMAT_VERSION = 2
+DISK_CACHE_DIRNAME = ".autoconfig_cache"
+_MAGIC = b"ACFG"
+# magic, format version, python major/minor (marshal is version specific), sha256 of the
+# YAML, blake2b of the payload (so a damaged entry is re-parsed rather than returned)
+_HEADER = struct.Struct("<4sHBB32s16s")
+
+
+def content_hash(data):
+    """Return the digest used to validate on-disk cache entries against the YAML bytes"""
+    return hashlib.sha256(data).digest()
+
+
+def disk_cache_path(cache_dir, path, subset=None):
+    """Return the cache file used for a given YAML path and subset
+
+    Parameters
+    ----------
+    cache_dir : str | bool
+        The cache directory, or True to use a directory next to the YAML file
+    path : str
+        The YAML file path
+    subset : str | None
+        The requested subset
+    """
+    path = os.path.realpath(path)
+    if cache_dir is True:
+        cache_dir = os.path.join(os.path.dirname(path), DISK_CACHE_DIRNAME)
+    name = hashlib.sha256(f"{path}\0{subset}".encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, name + ".acfg")
+
+
+def _payload_hash(payload):
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def disk_cache_load(cache_file, digest):
+    """Return the cached tree if the entry matches the format version and YAML digest, else None
+
+    Missing, stale, corrupt or version-mismatched entries are all treated as a miss
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            data = f.read()
+        magic, version, major, minor, stored, checksum = _HEADER.unpack_from(data)
+        if (
+            magic != _MAGIC
+            or version != DISK_FORMAT_VERSION
+            or (major, minor) != sys.version_info[:2]
+            or stored != digest
+        ):
+            return None
+        payload = memoryview(data)[_HEADER.size :]
+        if _payload_hash(payload) != checksum:
+            return None
+        return marshal.loads(payload)
+    except Exception:
+        return None
+
+
+def disk_cache_store(cache_file, digest, info):
+    """Atomically write a tree to the cache, silently skipping values that can't be stored"""
+    try:
+        payload = marshal.dumps(info)
+    except ValueError:
+        # Contains types marshal can't handle (e.g. timestamps), so don't cache it
+        return
+    header = _HEADER.pack(
+        _MAGIC,
+        DISK_FORMAT_VERSION,
+        *sys.version_info[:2],
+        digest,
+        _payload_hash(payload),
+    )
+
+    tmp = None
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(header + payload)
+        os.replace(tmp, cache_file)
+    except OSError:
+        if tmp is not None and os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
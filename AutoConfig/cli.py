@@ -0,0 +1,371 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Query, edit, compare and print YAML configs from the shell
+
+Usage: autoconfig get FILE KEY [KEY ...]
+       autoconfig set FILE KEY=VALUE [KEY=VALUE ...] [-o OUT]
+       autoconfig diff FILE FILE [FILE ...]
+       autoconfig print FILE [FILE ...]
+       autoconfig resolve FILE [FILE ...] [-o OUT]
+       autoconfig batch FILE < commands
+
+"batch" loads FILE once and runs one command per line from stdin (get, set, print,
+resolve, save, diff, reload), so scripts querying many keys parse the file once
+"""
+
+import argparse
+import sys
+
+# Everything else is imported by the commands, so starting the tool stays cheap
+
+
+class CommandError(Exception):
+    """A failed command, reported as "autoconfig: <message>" """
+
+
+def _load(path, opts, resolve=False):
+    import yaml
+
+    from .autoconfig import args_from_YAML
+
+    try:
+        args = args_from_YAML(
+            path, subset=opts.subset, loader=opts.loader, cache_dir=opts.cache_dir
+        )
+        if resolve:
+            args.update_reuse(verbose=False)
+    except OSError as e:
+        raise CommandError(f"{path}: {e.strerror or e}")
+    except (yaml.YAMLError, ValueError) as e:
+        raise CommandError(f"{path}: {e}")
+    return args
+
+
+def _lookup(args, key):
+    try:
+        return args.get(key)
+    except (AttributeError, KeyError, TypeError):
+        raise CommandError(f'no key "{key}"')
+
+
+def _write_value(value, write, as_json=False):
+    """Write a value (or section) as YAML, or as one line of JSON"""
+    from .autoconfig import (
+        _format_scalar,
+        _get_dict_exclude,
+        _write_node,
+        args_from_YAML,
+    )
+
+    if as_json:
+        import json
+
+        if isinstance(value, args_from_YAML):
+            value = _get_dict_exclude(value)
+        write(json.dumps(value, default=str) + "\n")
+    elif isinstance(value, args_from_YAML):
+        _write_node(value, write)
+    else:
+        write(_format_scalar(value) + "\n")
+
+
+def _parse_value(text):
+    """Read a value given on the command line the way it would be read from the file"""
+    from .autoconfig import _coerce_numeric
+    from .loader import load_yaml
+
+    try:
+        value = load_yaml(text) if text.strip() else text
+    except Exception:
+        # e.g. "a: b: c", kept as a string
+        value = text
+    return _coerce_numeric(value)
+
+
+def _assignments(items):
+    out = []
+    for item in items:
+        key, sep, text = item.partition("=")
+        if not sep or not key:
+            raise CommandError(f'expected KEY=VALUE, got "{item}"')
+        out.append((key, _parse_value(text)))
+    return out
+
+
+def _set(args, items):
+    for key, value in _assignments(items):
+        try:
+            args.set(key, value)
+        except (AttributeError, KeyError, TypeError):
+            raise CommandError(f'no section for "{key}"')
+
+
+def _print(args, write, opts):
+    write(
+        args.render(
+            max_depth=opts.max_depth,
+            max_items=opts.max_items,
+            max_width=opts.max_width,
+        )
+        + "\n"
+    )
+
+
+def cmd_get(opts, write):
+    args = _load(opts.file, opts, opts.resolve)
+    errors = 0
+    for key in opts.keys:
+        try:
+            _write_value(_lookup(args, key), write, opts.json)
+        except CommandError as e:
+            _error(f"{opts.file}: {e}")
+            errors += 1
+    return 1 if errors else 0
+
+
+def cmd_set(opts, write):
+    args = _load(opts.file, opts)
+    _set(args, opts.assignments)
+    args.save_to_yaml(opts.output or opts.file)
+    return 0
+
+
+# Files are compared by content, as compare_sweep does for 3+ files
+_DIFF_EXCLUDE = ("subset", "config_path")
+
+
+def cmd_diff(opts, write):
+    if len(opts.files) == 2:
+        from .autoconfig import compare_args
+
+        a, b = (_load(f, opts, opts.resolve) for f in opts.files)
+        diff = compare_args(
+            a, b, write=write, max_width=opts.max_width, exclude=_DIFF_EXCLUDE
+        )
+        return 1 if diff else 0
+
+    if opts.resolve:
+        raise CommandError("--resolve only applies when comparing two files")
+    from .sweep import compare_sweep
+
+    table = compare_sweep(
+        opts.files, subset=opts.subset, loader=opts.loader, cache_dir=opts.cache_dir
+    )
+    if table.values:
+        from .dict_print import render_dict
+
+        write(
+            render_dict(
+                {k: " | ".join(map(str, v)) for k, v in table.values.items()},
+                max_width=opts.max_width,
+            )
+            + "\n"
+        )
+        return 1
+    write("No differences found.\n")
+    return 0
+
+
+def _header(files, i, write):
+    """Name each file when printing several, like head(1)"""
+    if len(files) > 1:
+        if i:
+            write("\n")
+        write(f"==> {files[i]} <==\n")
+
+
+def cmd_print(opts, write):
+    for i, path in enumerate(opts.files):
+        _header(opts.files, i, write)
+        _print(_load(path, opts, opts.resolve), write, opts)
+    return 0
+
+
+def cmd_resolve(opts, write):
+    if opts.output and len(opts.files) > 1:
+        raise CommandError("-o/--output takes a single FILE")
+    for i, path in enumerate(opts.files):
+        args = _load(path, opts, resolve=True)
+        if opts.output:
+            args.save_to_yaml(opts.output)
+            continue
+        _header(opts.files, i, write)
+        _write_value(args, write)
+    return 0
+
+
+# Batch commands: name -> (usage, minimum number of arguments)
+_BATCH_COMMANDS = {
+    "get": ("get KEY [KEY ...]", 1),
+    "set": ("set KEY=VALUE [KEY=VALUE ...]", 1),
+    "print": ("print [KEY]", 0),
+    "resolve": ("resolve", 0),
+    "save": ("save [PATH]", 0),
+    "diff": ("diff FILE", 1),
+    "reload": ("reload", 0),
+}
+
+
+def _batch_line(args, line, write, opts):
+    """Run one batch command against the loaded config, returning the (new) config"""
+    import shlex
+
+    try:
+        words = shlex.split(line, comments=True)
+    except ValueError as e:
+        raise CommandError(str(e))
+    if not words:
+        return args
+    name, params = words[0], words[1:]
+    spec = _BATCH_COMMANDS.get(name)
+    if spec is None:
+        raise CommandError(
+            f'unknown command "{name}", expected one of {", ".join(_BATCH_COMMANDS)}'
+        )
+    if len(params) < spec[1]:
+        raise CommandError(f"usage: {spec[0]}")
+
+    if name == "get":
+        for key in params:
+            _write_value(_lookup(args, key), write, opts.json)
+    elif name == "set":
+        _set(args, params)
+    elif name == "print":
+        from .autoconfig import args_from_YAML
+
+        value = _lookup(args, params[0]) if params else args
+        if isinstance(value, args_from_YAML):
+            _print(value, write, opts)
+        else:
+            _write_value(value, write, opts.json)
+    elif name == "resolve":
+        args.update_reuse(verbose=False)
+    elif name == "save":
+        args.save_to_yaml(params[0] if params else opts.file)
+    elif name == "diff":
+        from .autoconfig import compare_args
+
+        compare_args(args, _load(params[0], opts), write=write, exclude=_DIFF_EXCLUDE)
+    elif name == "reload":
+        args = _load(opts.file, opts, opts.resolve)
+    return args
+
+
+def cmd_batch(opts, write):
+    args = _load(opts.file, opts, opts.resolve)
+    errors = 0
+    for n, line in enumerate(sys.stdin, 1):
+        try:
+            args = _batch_line(args, line, write, opts)
+        except (CommandError, OSError, ValueError) as e:
+            _error(f"line {n}: {e}")
+            errors += 1
+        # Answer each command before reading the next, e.g. for coprocesses
+        sys.stdout.flush()
+    return 1 if errors else 0
+
+
+def _error(message):
+    sys.stdout.flush()
+    sys.stderr.write(f"autoconfig: {message}\n")
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="autoconfig",
+        description=__doc__.splitlines()[0],
+        epilog="Run 'autoconfig COMMAND -h' for the options of a command",
+    )
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--subset", help="only load this top-level section")
+    common.add_argument(
+        "--loader", default="auto", help='YAML backend: "auto", "c" or "python"'
+    )
+    common.add_argument("--cache-dir", help="on-disk parse cache directory")
+    resolve = argparse.ArgumentParser(add_help=False)
+    resolve.add_argument(
+        "-r", "--resolve", action="store_true", help="fill in ${} placeholders first"
+    )
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--json", action="store_true", help="print values as JSON")
+    limits = argparse.ArgumentParser(add_help=False)
+    limits.add_argument("--max-depth", type=int, help="collapse deeper sections")
+    limits.add_argument("--max-items", type=int, help="shorten longer lists")
+    limits.add_argument("--max-width", type=int, help="cut longer lines")
+
+    p = sub.add_parser(
+        "get",
+        parents=[common, resolve, output],
+        help="print the values of dotted keys, one per line",
+    )
+    p.add_argument("file")
+    p.add_argument("keys", nargs="+", metavar="KEY")
+    p.set_defaults(func=cmd_get)
+
+    p = sub.add_parser(
+        "set", parents=[common], help="change values and save the config"
+    )
+    p.add_argument("file")
+    p.add_argument("assignments", nargs="+", metavar="KEY=VALUE")
+    p.add_argument("-o", "--output", help="save to this file instead of FILE")
+    p.set_defaults(func=cmd_set)
+
+    p = sub.add_parser(
+        "diff",
+        parents=[common, resolve],
+        help="compare two configs, or the keys varying across several",
+    )
+    p.add_argument("files", nargs="+", metavar="FILE")
+    p.add_argument("--max-width", type=int, help="cut longer lines")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser(
+        "print", parents=[common, resolve, limits], help="print configs readably"
+    )
+    p.add_argument("files", nargs="+", metavar="FILE")
+    p.set_defaults(func=cmd_print)
+
+    p = sub.add_parser(
+        "resolve",
+        parents=[common],
+        help="print configs as YAML with their placeholders filled in",
+    )
+    p.add_argument("files", nargs="+", metavar="FILE")
+    p.add_argument("-o", "--output", help="save to this file instead")
+    p.set_defaults(func=cmd_resolve)
+
+    p = sub.add_parser(
+        "batch",
+        parents=[common, resolve, output, limits],
+        help="run commands from stdin, one per line, against one loaded config",
+    )
+    p.add_argument("file")
+    p.set_defaults(func=cmd_batch)
+    return parser
+
+
+def main(argv=None):
+    opts = _parser().parse_args(argv)
+    if opts.command == "diff" and len(opts.files) < 2:
+        _error("diff needs at least two files")
+        return 2
+    write = sys.stdout.write
+    try:
+        return opts.func(opts, write)
+    except CommandError as e:
+        _error(str(e))
+        return 1
+    except BrokenPipeError:
+        # e.g. piped into head
+        sys.stderr.close()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
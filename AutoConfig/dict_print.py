@@ -4,6 +4,8 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import sys
+
 
 def try_format(data, format):
     # If the given number format doesn't work then return the original unformatted data
@@ -38,89 +40,315 @@ def _format(data, func, arg):
         return func(data, arg)
 
 
-def dict_print(
-    data,
-    level_char=">",
-    offset_char=" ",
-    pad_char="_",
-    rounding=None,
-    sort_kwargs=None,
-    compact=False,
-    _offset=0,
-    _first=False,
-    num_format=None,
-    exclude=None,
-):
-    # Fancy printing of dictionaries in a human-readable format
+def _is_logger(obj):
+    # A Logger can only exist once logging has been imported, so don't import it here
+    logging = sys.modules.get("logging")
+    return logging is not None and isinstance(obj, logging.Logger)
 
-    # Recursive function to print each level of the dictionary
-    def _recurr(
-        data,
-        level_char=level_char,
-        offset_char=offset_char,
-        rounding=rounding,
-        sort_kwargs=sort_kwargs,
-        _offset=_offset,
-        _first=_first,
-    ):
-        key_list = [k for k in list(data.keys()) if exclude is None or k not in exclude]
-        if len(key_list) < 1:
-            print(f"<Input dictionary is empty: {data}>", end="")
+
+class _Budget(Exception):
+    """Raised when the rendered text reaches max_chars"""
+
+
+class _Output:
+    """Collects the rendered text in one buffer, applying the width and size limits and
+    streaming it to write in chunks"""
+
+    def __init__(self, write, max_width, max_chars, flush_lines=1024):
+        if _is_logger(write):
+            # One record for the whole rendering
+            self.logger, write = write, None
+        else:
+            self.logger = None
+        self.write = write
+        self.max_width = max_width
+        self.max_chars = max_chars
+        self.flush_lines = flush_lines
+        self.parts = []
+        self.add = self.parts.append
+        # Without limits, lines don't need to be joined one by one
+        self.plain = max_width is None and max_chars is None
+        self.line_start = 0
+        self.count = 0
+        self.size = 0
+
+    def newline(self):
+        """Finish the current line"""
+        parts = self.parts
+        if not self.plain:
+            line = "".join(parts[self.line_start :])
+            del parts[self.line_start :]
+            width = self.max_width
+            if width is not None:
+                line = "\n".join(
+                    seg if len(seg) <= width else seg[: max(width - 3, 0)] + "..."
+                    for seg in line.split("\n")
+                )
+            if self.max_chars is not None and self.size + len(line) > self.max_chars:
+                remaining = self.max_chars - self.size
+                if remaining > 0:
+                    parts.append(line[:remaining] + "\n")
+                parts.append("... (truncated)\n")
+                raise _Budget()
+            self.size += len(line) + 1
+            parts.append(line)
+        parts.append("\n")
+        self.line_start = len(parts)
+        if self.write is not None:
+            self.count += 1
+            if self.count >= self.flush_lines:
+                self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.write("".join(self.parts))
+            self.parts.clear()
+        self.line_start = self.count = 0
+
+    def close(self):
+        """Return the text, or pass any remaining text to write/the logger"""
+        if self.write is not None:
+            self.flush()
             return
+        # Every line ends with a newline
+        text = "".join(self.parts)[:-1]
+        if self.logger is not None:
+            self.logger.info(text)
+        else:
+            return text
+
+
+def emit_text(text, write=None):
+    """Send text to stdout (None), a callable such as file.write, or a Logger (as INFO)"""
+    if write is None:
+        sys.stdout.write(text)
+    elif _is_logger(write):
+        write.info(text.rstrip("\n"))
+    else:
+        write(text)
+
+
+def format_value(v, max_items=None, rounding=None, num_format=None):
+    """Format a value as dict_print does, showing at most max_items items of lists and tuples"""
+    extra = 0
+    if max_items is not None and isinstance(v, (list, tuple)) and len(v) > max_items:
+        extra = len(v) - max_items
+        v = v[:max_items]
+    if rounding is not None:
+        text = f"{try_round(v, rounding)}"
+    elif num_format is not None:
+        text = f"{try_format(v, num_format)}"
+    else:
+        text = f"{v}"
+    if extra:
+        text = f"{text[:-1].rstrip(',')}, ... +{extra} more{text[-1]}"
+    return text
+
+
+def _dict_items(data):
+    """Return the (key, value) pairs of a mapping, or None for other values"""
+    return data.items() if isinstance(data, dict) else None
+
+
+class _Renderer:
+    """Walks nested mappings once, writing the dict_print format to an _Output"""
 
+    def __init__(
+        self,
+        out,
+        level_char,
+        offset_char,
+        pad_char,
+        rounding,
+        sort_kwargs,
+        compact,
+        num_format,
+        exclude,
+        max_depth,
+        max_items,
+        items,
+    ):
+        self.out = out
+        self.level_char = level_char
+        self.offset_char = offset_char
+        self.pad_char = pad_char
+        self.rounding = rounding
+        self.compact = compact
+        self.num_format = num_format
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.items = items
+        self.sort_key = None
         if sort_kwargs is not None:
             if sort_kwargs == "len":
                 sort_kwargs = {"reverse": True, "key": lambda x: len(x)}
-            key_list.sort(**sort_kwargs)
+            sort_kwargs = dict(sort_kwargs)
+            key = sort_kwargs.pop("key", None)
+            # Sort the (key, value) pairs as dict_print sorts the keys
+            self.sort_key = (
+                (lambda p: key(p[0])) if key is not None else (lambda p: p[0])
+            )
+            self.sort_reverse = sort_kwargs.pop("reverse", False)
+
+    def node(self, data, pairs, offset, first, depth):
+        out = self.out
+        exclude = self.exclude
+        if exclude is not None:
+            pairs = [(k, v) for k, v in pairs if k not in exclude]
+        else:
+            pairs = list(pairs)
+        if len(pairs) < 1:
+            out.add(f"<Input dictionary is empty: {data}>")
+            return
 
-        # Need key lengths for padding
-        key_lens = [len(str(k)) for k in key_list]
-        long_key = max(key_lens)
+        if self.sort_key is not None:
+            pairs.sort(key=self.sort_key, reverse=self.sort_reverse)
 
-        for idx in range(len(key_list)):
-            v = data[key_list[idx]]
-            prefix = pad_char * (long_key - key_lens[idx])  # padding
+        # Need key lengths for padding, computed once per level
+        keys = [str(k) for k, _ in pairs]
+        long_key = max(map(len, keys))
+        indent = ""
+        if offset > 0:
+            indent = self.offset_char * (offset - 2) + self.level_char + " "
+        pad_char = self.pad_char
+        add, newline, items = out.add, out.newline, self.items
+        max_depth, max_items = self.max_depth, self.max_items
+        rounding, num_format = self.rounding, self.num_format
+        plain = max_items is None and rounding is None and num_format is None
 
+        for idx, (key, (_, v)) in enumerate(zip(keys, pairs)):
+            prefix = pad_char * (long_key - len(key))  # padding
             if len(prefix) > 0:
                 # Leave a gap before the actual key
                 prefix = prefix[:-1] + " "
 
             # For use with `compact` to set an offset or not
-            if _first:
-                _first = False
+            if first:
+                first = False
             else:
-                if _offset > 0:
-                    prefix = offset_char * (_offset - 2) + level_char + " " + prefix
+                prefix = indent + prefix
                 if idx > 0:
-                    print()
-
-            # Recursive dictionary nesting, or print formatted values
-            if isinstance(v, dict):
-                print(f"{prefix}{key_list[idx]}: ", end="")
-                _recurr(
-                    v,
-                    _offset=_offset + long_key + 2,
-                    _first=compact,
-                    level_char=level_char,
-                )
-            else:
-                if rounding is not None:
-                    print(f"{prefix}{key_list[idx]}: {try_round(v, rounding)}", end="")
-                elif num_format is not None:
-                    print(
-                        f"{prefix}{key_list[idx]}: {try_format(v, num_format)}", end=""
-                    )
+                    newline()
+
+            # Recursive nesting, or formatted values
+            sub = items(v)
+            if sub is None:
+                if plain:
+                    add(f"{prefix}{key}: {v}")
                 else:
-                    print(f"{prefix}{key_list[idx]}: {v}", end="")
+                    add(
+                        f"{prefix}{key}: {format_value(v, max_items, rounding, num_format)}"
+                    )
+            elif max_depth is None or depth < max_depth:
+                add(f"{prefix}{key}: ")
+                self.node(v, sub, offset + long_key + 2, self.compact, depth + 1)
+            else:
+                add(f"{prefix}{key}: {{...}}")
+
+
+def render_dict(
+    data,
+    write=None,
+    level_char=">",
+    offset_char=" ",
+    pad_char="_",
+    rounding=None,
+    sort_kwargs=None,
+    compact=False,
+    num_format=None,
+    exclude=None,
+    max_depth=None,
+    max_items=None,
+    max_width=None,
+    max_chars=None,
+    _offset=0,
+    _first=False,
+    _items=None,
+):
+    """Render nested dictionaries in the human-readable format of dict_print
+
+    The output is built in one pass, and returned as a string or streamed to write
+
+    Parameters
+    ----------
+    data : dict
+        The data to render
+    write : callable | logging.Logger | None
+        None returns the text, a callable (e.g. sys.stdout.write or file.write) is
+        passed the text in chunks, and a Logger logs it as one INFO record
+    level_char, offset_char, pad_char, rounding, sort_kwargs, compact, num_format, exclude
+        See dict_print
+    max_depth : int | None
+        Sections nested deeper than this are shown as "{...}"
+    max_items : int | None
+        Lists and tuples are shown with at most this many items
+    max_width : int | None
+        Lines longer than this are cut, ending with "..."
+    max_chars : int | None
+        Stop once the text reaches this many characters
+    """
+    out = _Output(write, max_width, max_chars)
+    renderer = _Renderer(
+        out,
+        level_char,
+        offset_char,
+        pad_char,
+        rounding,
+        sort_kwargs,
+        compact,
+        num_format,
+        exclude,
+        max_depth,
+        max_items,
+        _dict_items if _items is None else _items,
+    )
+    items = renderer.items(data)
+    try:
+        renderer.node(data, items, _offset, _first, 1)
+        out.newline()
+    except _Budget:
+        pass
+    return out.close()
+
 
-    _recurr(
+def dict_print(
+    data,
+    level_char=">",
+    offset_char=" ",
+    pad_char="_",
+    rounding=None,
+    sort_kwargs=None,
+    compact=False,
+    _offset=0,
+    _first=False,
+    num_format=None,
+    exclude=None,
+    max_depth=None,
+    max_items=None,
+    max_width=None,
+    max_chars=None,
+    _items=None,
+):
+    # Fancy printing of dictionaries in a human-readable format, see render_dict
+    write = sys.stdout.write
+    render_dict(
         data,
+        write,
         level_char=level_char,
         offset_char=offset_char,
+        pad_char=pad_char,
         rounding=rounding,
         sort_kwargs=sort_kwargs,
+        compact=compact,
+        num_format=num_format,
+        exclude=exclude,
+        max_depth=max_depth,
+        max_items=max_items,
+        max_width=max_width,
+        max_chars=max_chars,
         _offset=_offset,
         _first=_first,
+        _items=_items,
     )
-    print()
-    print()
+    write("\n")
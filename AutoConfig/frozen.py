@@ -0,0 +1,265 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import sys
+import weakref
+
+from .arrays import is_array
+from .autoconfig import _node_items, args_from_YAML
+
+
+class _EmptySection:
+    """Stands in for a section without any keys, which has no dotted paths of its own"""
+
+    def __repr__(self):
+        return "{}"
+
+    def __reduce__(self):
+        return "_EMPTY"
+
+
+_EMPTY = _EmptySection()
+
+
+class _FrozenMap(tuple):
+    """A dict stored inside a frozen value (e.g. in a list), as (key, value) pairs"""
+
+    __slots__ = ()
+
+
+def _freeze_value(val):
+    """Return an immutable, hashable equivalent of a parsed value"""
+    t = type(val)
+    if t is list:
+        return tuple(map(_freeze_value, val))
+    elif t is dict:
+        return _FrozenMap((k, _freeze_value(v)) for k, v in val.items())
+    elif t is set:
+        return frozenset(val)
+    elif is_array(val):
+        return _freeze_value(val.tolist())
+    return val
+
+
+def _thaw_value(val):
+    """Reverse _freeze_value"""
+    t = type(val)
+    if t is tuple:
+        return list(map(_thaw_value, val))
+    elif t is _FrozenMap:
+        return {k: _thaw_value(v) for k, v in val}
+    elif t is frozenset:
+        return set(val)
+    return val
+
+
+class _Layout:
+    """The ordered dotted keys shared by every snapshot of the same structure"""
+
+    __slots__ = ("keys", "index", "_sections", "__weakref__")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = {k: i for i, k in enumerate(keys)}
+        self._sections = None
+
+    def section(self, prefix):
+        """Return the (start, stop) slice of the keys below a section, or None"""
+        if self._sections is None:
+            # Keys are stored depth-first, so every section covers a contiguous slice
+            sections = {}
+            for i, k in enumerate(self.keys):
+                parts = k.split(".")
+                for n in range(1, len(parts)):
+                    p = ".".join(parts[:n])
+                    start, _ = sections.get(p, (i, i))
+                    sections[p] = (start, i + 1)
+            self._sections = sections
+        return self._sections.get(prefix)
+
+
+# Snapshots with the same keys share one layout (and its interned key strings)
+_LAYOUTS = weakref.WeakValueDictionary()
+
+
+def _get_layout(keys):
+    layout = _LAYOUTS.get(keys)
+    if layout is None:
+        layout = _LAYOUTS[keys] = _Layout(tuple(map(sys.intern, keys)))
+    return layout
+
+
+def _flatten(obj, exclude, keys, values, prefix=""):
+    for k, v in _node_items(obj):
+        if k in exclude:
+            continue
+        if isinstance(v, args_from_YAML):
+            n = len(keys)
+            _flatten(v, exclude, keys, values, f"{prefix}{k}.")
+            if len(keys) == n:
+                keys.append(f"{prefix}{k}")
+                values.append(_EMPTY)
+        else:
+            keys.append(f"{prefix}{k}")
+            values.append(_freeze_value(v))
+
+
+class FrozenConfig:
+    """An immutable, compact snapshot of an args_from_YAML instance
+
+    The tree is stored as a tuple of values in the order of its dotted keys
+    (e.g. "DAAC_cfg.lr"). The keys are interned and shared by every snapshot with the
+    same structure, so each snapshot only costs the values tuple. Snapshots are hashable
+    and compare equal when their keys and values match. Lists (and arrays) are stored as
+    tuples and dicts inside values as (key, value) pairs, both converted back by to_args()
+    """
+
+    __slots__ = ("_layout", "_values", "_hash")
+
+    def __init__(self, args, exclude=("subset",)):
+        """
+        Parameters
+        ----------
+        args : args_from_YAML
+            The parser to take a snapshot of
+        exclude : list
+            The names of attributes to leave out
+        """
+        keys, values = [], []
+        _flatten(args, exclude, keys, values)
+        self._layout = _get_layout(tuple(keys))
+        self._values = tuple(values)
+        self._hash = None
+
+    @classmethod
+    def _from_layout(cls, layout, values):
+        out = cls.__new__(cls)
+        out._layout = layout
+        out._values = values
+        out._hash = None
+        return out
+
+    @classmethod
+    def _from_keys(cls, keys, values):
+        return cls._from_layout(_get_layout(keys), values)
+
+    def __reduce__(self):
+        return (FrozenConfig._from_keys, (self._layout.keys, self._values))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_hash"):
+            raise AttributeError("FrozenConfig is immutable")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError("FrozenConfig is immutable")
+
+    def keys(self):
+        """Return the dotted keys, in order"""
+        return self._layout.keys
+
+    def values(self):
+        """Return the values, in the order of keys()"""
+        return self._values
+
+    def items(self):
+        """Yield (dotted key, value) pairs"""
+        return zip(self._layout.keys, self._values)
+
+    def __iter__(self):
+        """Yield the dotted keys"""
+        return iter(self._layout.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def _find(self, key):
+        """Return the value index or the section slice for a key, or None"""
+        if not isinstance(key, str):
+            key = ".".join(map(str, key))
+        i = self._layout.index.get(key)
+        if i is not None:
+            return i
+        return self._layout.section(key)
+
+    def get(self, key):
+        """Return the value at a dotted key ("A.B.C") or list of nested keys
+
+        Sections are returned as a FrozenConfig of the keys below them
+        """
+        i = self._find(key)
+        if i is None:
+            raise KeyError(key)
+        if type(i) is int:
+            val = self._values[i]
+            return FrozenConfig._from_keys((), ()) if val is _EMPTY else val
+        start, stop = i
+        n = len(key if isinstance(key, str) else ".".join(map(str, key))) + 1
+        return FrozenConfig._from_keys(
+            tuple(k[n:] for k in self._layout.keys[start:stop]),
+            self._values[start:stop],
+        )
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __hash__(self):
+        h = self._hash
+        if h is None:
+            h = hash((self._layout.keys, self._values))
+            object.__setattr__(self, "_hash", h)
+        return h
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenConfig):
+            return NotImplemented
+        if self is other:
+            return True
+        if (
+            self._hash is not None
+            and other._hash is not None
+            and self._hash != other._hash
+        ):
+            return False
+        # Equal structures share a layout, so the keys only need comparing otherwise
+        return (
+            self._layout is other._layout or self._layout.keys == other._layout.keys
+        ) and self._values == other._values
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __repr__(self):
+        return f"FrozenConfig({len(self)} keys)"
+
+    def to_dict(self):
+        """Return the snapshot as nested dictionaries"""
+        out = {}
+        for key, val in self.items():
+            node = out
+            parts = key.split(".")
+            for p in parts[:-1]:
+                node = node.setdefault(p, {})
+            node[parts[-1]] = {} if val is _EMPTY else _thaw_value(val)
+        return out
+
+    def to_args(self, coerce=None):
+        """Return a new, mutable args_from_YAML instance with the snapshot's values
+
+        Parameters
+        ----------
+        coerce : str | callable | None
+            The type coercion policy applied to the values (see args_from_YAML)
+        """
+        info = self.to_dict()
+        out = args_from_YAML(info.get("config_path"), _info=info, coerce=coerce)
+        if "subset" not in info:
+            del out.subset
+        return out
@@ -0,0 +1,533 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import io
+import os
+import re
+
+import yaml
+
+from .arrays import NPY_TAG, construct_npy, sidecar_dir
+from .cache import (
+    _BASE_CACHE,
+    _CACHE,
+    _copy_tree,
+    content_hash,
+    disk_cache_load,
+    disk_cache_path,
+    disk_cache_store,
+)
+from .stats import _STATS, _phase
+
+# The libyaml bindings are optional, so fall back to the pure-python loader if missing
+HAS_LIBYAML = getattr(yaml, "__with_libyaml__", False) and hasattr(yaml, "CSafeLoader")
+
+LOADERS = ("auto", "c", "python")
+
+
+# AutoConfig's own loader classes, so its tags aren't registered on PyYAML's globally
+class _SafeLoader(yaml.SafeLoader):
+    pass
+
+
+_SafeLoader.add_constructor(NPY_TAG, construct_npy)
+
+if HAS_LIBYAML:
+
+    class _CSafeLoader(yaml.CSafeLoader):
+        pass
+
+    _CSafeLoader.add_constructor(NPY_TAG, construct_npy)
+
+# Directive naming the file(s) a config is layered on top of, relative to that config
+BASE_KEY = "_base_"
+
+
+def get_loader(loader="auto"):
+    """Return the YAML loader class for the requested backend
+
+    Both backends use the same safe constructor and resolver, so the typed
+    results (null, ints vs floats, booleans, etc.) are identical. Both also read
+    "!npy" sidecar references (see AutoConfig.arrays)
+
+    Parameters
+    ----------
+    loader : str
+        "auto" uses libyaml (yaml.CSafeLoader) when available, otherwise pure-python
+        "c" requires libyaml
+        "python" always uses the pure-python yaml.SafeLoader
+    """
+    if loader == "auto":
+        return _CSafeLoader if HAS_LIBYAML else _SafeLoader
+    elif loader == "c":
+        if not HAS_LIBYAML:
+            raise ImportError(
+                'AutoConfig loader "c" requires PyYAML built with libyaml, use loader="auto" to fall back'
+            )
+        return _CSafeLoader
+    elif loader == "python":
+        return _SafeLoader
+    raise ValueError(f'Unknown loader "{loader}", expected one of {LOADERS}')
+
+
+def get_dumper(dumper="auto"):
+    """Return the YAML dumper class for the requested backend ("auto", "c" or "python")"""
+    if dumper == "auto":
+        return yaml.CSafeDumper if HAS_LIBYAML else yaml.SafeDumper
+    elif dumper == "c":
+        if not HAS_LIBYAML:
+            raise ImportError(
+                'AutoConfig dumper "c" requires PyYAML built with libyaml, use dumper="auto" to fall back'
+            )
+        return yaml.CSafeDumper
+    elif dumper == "python":
+        return yaml.SafeDumper
+    raise ValueError(f'Unknown dumper "{dumper}", expected one of {LOADERS}')
+
+
+def load_yaml(stream, loader="auto"):
+    """Parse a YAML stream (str or open file) using the requested loader backend"""
+    return yaml.load(stream, Loader=get_loader(loader))
+
+
+# Lines starting a top-level key, i.e. not indented, blank, comments or "- " list items
+_TOP_LINE = re.compile(r"\n(?=[^ \t#\r\n])(?!-(?:[ \t\r\n]|$))")
+# A top-level "key:" with a plain or quoted key
+_TOP_KEY = re.compile(
+    r"""([\w.\-/]+|"[^"\\\n]*"|'[^'\n]*')[ \t]*:(?:[ \t]|\r?$)""", re.M
+)
+# An indented "key:" line of a block mapping (plain scalars can't contain ": ")
+_MAPPING_LINE = re.compile(
+    r"""[ \t]+(?:[^\s#'"?\[{|>!&*%@`-][^\n#]*?|"[^"\n]*"|'[^'\n]*')[ \t]*:(?:[ \t]|\r?$)""",
+    re.M,
+)
+# Top-level content the text split can't handle: directives, document markers, complex
+# keys and flow collections
+_NO_SPLIT_LINE = ("%", "---", "...", "?", "[", "{")
+# A possible anchor or alias, checked further in _has_anchors
+_ANCHOR = re.compile(r"[&*][^\s\]},]")
+_BLANK = re.compile(r"[ \t]*(?:#[^\n]*)?(?:\r?\n|$)")
+_RESOLVER = yaml.resolver.Resolver()
+
+
+def _has_anchors(text):
+    """Check if a document may contain anchors or aliases"""
+    for m in _ANCHOR.finditer(text):
+        a = m.start()
+        if a == 0 or text[a - 1] in " \t\r\n[{,":
+            return True
+    return False
+
+
+# Characters that may start a scalar or collection spanning lines, or end a line early
+_SCAN_CHARS = re.compile(r"[\"'\[\]{}#|>\t]")
+
+
+def _close_quote(text, i, end):
+    """Return the index of the quote closing the quoted scalar starting at i, or -1"""
+    quote = text[i]
+    pos = i + 1
+    while True:
+        j = text.find(quote, pos, end)
+        if j < 0:
+            return -1
+        if quote == "'":
+            if text.startswith("'", j + 1, end):
+                # An escaped '' inside single quotes
+                pos = j + 2
+                continue
+        else:
+            # Odd number of backslashes before the quote escape it
+            k = j
+            while text[k - 1] == "\\":
+                k -= 1
+            if (j - k) % 2:
+                pos = j + 1
+                continue
+        return j
+
+
+def _is_closed(text, start, end):
+    """Check that no scalar or collection in text[start:end] continues past end
+
+    A line at column 0 inside a multi-line quoted scalar or flow collection would
+    otherwise be taken for a top-level key. Block scalars and tabs are refused as well,
+    leaving them to the parser
+    """
+    depth = 0
+    pos = start
+    while True:
+        m = _SCAN_CHARS.search(text, pos, end)
+        if m is None:
+            return depth == 0
+        i = m.start()
+        c = text[i]
+        prev = text[i - 1] if i > start else "\n"
+        pos = i + 1
+        if c == "\t":
+            return False
+        elif c == "#":
+            if prev in " \n":
+                # A comment, skip to the end of the line
+                pos = text.find("\n", i, end)
+                if pos < 0:
+                    return depth == 0
+        elif c in "\"'":
+            if depth or prev in " \n:-[{,":
+                pos = _close_quote(text, i, end) + 1
+                if pos == 0:
+                    return False
+        elif c in "[{":
+            if depth or prev in " \n:-,":
+                depth += 1
+        elif c in "]}":
+            if depth:
+                depth -= 1
+        elif prev in " \n":
+            # "|" or ">", possibly a block scalar
+            return False
+
+
+class _Fallback(Exception):
+    """Raised when a document can't be loaded selectively"""
+
+
+def _split_top_level(text, subset):
+    """Return the text of a document without the top-level sections other than subset
+
+    Top-level keys are found from the lines starting at column 0. Only sections that are
+    clearly block mappings (an empty value followed by an indented "key:" line) and whose
+    key is a plain string are removed. Returns None if the document isn't a plain block
+    mapping this can be sure about, or a section may continue past the next line at
+    column 0 (multi-line quoted scalars and flow collections, block scalars, tabs)
+    """
+    if _has_anchors(text):
+        return None
+    # Searching for the newlines is much faster than matching each line start with re.M
+    starts = [m.start() for m in _TOP_LINE.finditer("\n" + text)]
+    if any(text.startswith(_NO_SPLIT_LINE, a) for a in starts):
+        return None
+    if not starts or any(
+        line.strip() and not line.lstrip().startswith("#")
+        for line in text[: starts[0]].splitlines()
+    ):
+        # Empty, or the top-level mapping is indented
+        return None
+    kept = []
+    for a, b in zip(starts, starts[1:] + [len(text)]):
+        m = _TOP_KEY.match(text, a)
+        if m is None or not _is_closed(text, m.end(), b):
+            return None
+        key = m.group(1)
+        if (
+            key != subset
+            and key[0] not in "'\""
+            and _RESOLVER.resolve(yaml.ScalarNode, key, (True, False))
+            == "tag:yaml.org,2002:str"
+        ):
+            # Skip it if the value is empty on the key's line and continues as a mapping
+            blank = _BLANK.match(text, m.end())
+            if blank is not None:
+                pos = blank.end()
+                while pos < b:
+                    blank = _BLANK.match(text, pos)
+                    if blank is None or blank.end() == pos:
+                        break
+                    pos = blank.end()
+                if pos < b and _MAPPING_LINE.match(text, pos):
+                    continue
+        kept.append(text[a:b])
+    return "".join(kept)
+
+
+def _compose_node(parser, anchors):
+    """Compose the next node from the event stream, mirroring yaml.composer.Composer"""
+    if parser.check_event(yaml.AliasEvent):
+        event = parser.get_event()
+        if event.anchor not in anchors:
+            # Defined in a skipped section
+            raise _Fallback()
+        return anchors[event.anchor]
+    event = parser.get_event()
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = parser.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(
+            tag, event.value, event.start_mark, event.end_mark, style=event.style
+        )
+    else:
+        is_seq = isinstance(event, yaml.SequenceStartEvent)
+        kind = yaml.SequenceNode if is_seq else yaml.MappingNode
+        end = yaml.SequenceEndEvent if is_seq else yaml.MappingEndEvent
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = parser.resolve(kind, None, event.implicit)
+        node = kind(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        while not parser.check_event(end):
+            if is_seq:
+                node.value.append(_compose_node(parser, anchors))
+            else:
+                key = _compose_node(parser, anchors)
+                node.value.append((key, _compose_node(parser, anchors)))
+        node.end_mark = parser.get_event().end_mark
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+
+def _skip_node(parser):
+    """Consume the events of the next node without composing it"""
+    depth = 0
+    while True:
+        event = parser.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _load_events(text, subset, loader):
+    """Parse a document, composing only the top-level keys other than unselected sections"""
+    parser = get_loader(loader)(text)
+    try:
+        parser.get_event()
+        if not parser.check_event(yaml.DocumentStartEvent):
+            return None
+        parser.get_event()
+        if not parser.check_event(yaml.MappingStartEvent):
+            raise _Fallback()
+        start = parser.get_event()
+        tag = start.tag
+        if tag is None or tag == "!":
+            tag = parser.resolve(yaml.MappingNode, None, start.implicit)
+        root = yaml.MappingNode(tag, [], start.start_mark, None)
+        anchors = {}
+        while not parser.check_event(yaml.MappingEndEvent):
+            key = _compose_node(parser, anchors)
+            if (
+                key.tag == "tag:yaml.org,2002:str"
+                and key.value != subset
+                and key.value != "<<"
+                and parser.check_event(yaml.MappingStartEvent)
+            ):
+                _skip_node(parser)
+            else:
+                root.value.append((key, _compose_node(parser, anchors)))
+        root.end_mark = parser.get_event().end_mark
+        parser.get_event()
+        if not parser.check_event(yaml.StreamEndEvent):
+            # Multiple documents, let the full parse raise the usual error
+            raise _Fallback()
+        # Construct everything at once so anchors and merge keys behave as in a full load
+        return parser.construct_document(root)
+    finally:
+        parser.dispose()
+
+
+def load_yaml_subset(text, subset, loader="auto"):
+    """Parse a YAML document, skipping the top-level sections other than subset
+
+    Top-level values that aren't sections are always kept, like _configure does. The
+    unselected sections are cut from the text before parsing when the top-level keys can
+    be found from the lines, otherwise they are skipped in the parser's event stream
+    without being composed or constructed. Documents using features that prevent that
+    (e.g. aliases of anchors in skipped sections) are parsed in full
+
+    Parameters
+    ----------
+    text : str
+        The YAML document
+    subset : str
+        The top-level section to keep
+    loader : str
+        The YAML loader backend: "auto", "c" or "python"
+    """
+    kept = _split_top_level(text, subset)
+    if kept is not None:
+        return load_yaml(kept, loader) or {}
+    try:
+        return _load_events(text, subset, loader)
+    except _Fallback:
+        return load_yaml(text, loader)
+
+
+def read_config(path, subset=None, loader="auto", cache=False, cache_dir=None):
+    """Read and parse a YAML config file
+
+    Parameters
+    ----------
+    path : str
+        The YAML file path
+    subset : str | None
+        The requested subset. If given, only the top-level values and this section are
+        parsed (see load_yaml_subset). Also part of the cache key
+    loader : str
+        The YAML loader backend: "auto", "c" or "python"
+    cache : bool
+        Whether to use the process-wide parsed-config cache. Entries are keyed on the
+        resolved path, file size, modification time and subset
+    cache_dir : str | bool | None
+        If given, also use the persistent on-disk cache in this directory
+        (True for a directory next to the YAML file)
+    """
+    stats = _STATS.current()
+    with open(path, "rb" if cache_dir else "r") as f:
+        if cache:
+            st = os.fstat(f.fileno())
+            key = (os.path.realpath(path), st.st_size, st.st_mtime_ns, subset)
+            info = _CACHE.get(key)
+            if info is not None:
+                if stats is not None:
+                    stats.add("cache_hits")
+                return info
+        if stats is not None:
+            stats.add("files")
+            stats.add("bytes_read", os.fstat(f.fileno()).st_size)
+
+        # "!npy" sidecar paths are relative to the YAML file
+        with sidecar_dir(os.path.dirname(os.path.abspath(path))):
+            if cache_dir:
+                info = _load_disk_cached(f, path, subset, loader, cache_dir, stats)
+            elif subset is None and stats is None:
+                # Stream the file into the parser
+                info = load_yaml(f, loader)
+            else:
+                # Read the whole file first, which also times reading and parsing apart
+                with _phase(stats, "read"):
+                    text = f.read()
+                with _phase(stats, "parse"):
+                    if subset is None:
+                        info = load_yaml(text, loader)
+                    else:
+                        info = load_yaml_subset(text, subset, loader)
+
+        if cache:
+            _CACHE.put(key, info, st.st_size)
+        return info
+
+
+def _load_disk_cached(f, path, subset, loader, cache_dir, stats=None):
+    """Load the parsed tree from the on-disk cache, parsing and storing it on a miss"""
+    with _phase(stats, "read"):
+        data = f.read()
+        digest = content_hash(data)
+        cache_file = disk_cache_path(cache_dir, path, subset)
+        info = disk_cache_load(cache_file, digest)
+
+    if info is None:
+        with _phase(stats, "parse"):
+            # Decode the same way as reading the file in text mode
+            stream = io.TextIOWrapper(io.BytesIO(data))
+            if subset is None:
+                info = load_yaml(stream, loader)
+            else:
+                info = load_yaml_subset(stream.read(), subset, loader)
+        with _phase(stats, "write"):
+            disk_cache_store(cache_file, digest, info)
+    elif stats is not None:
+        stats.add("cache_hits")
+    return info
+
+
+def _merge(base, overlay):
+    """Deep-merge overlay into base without modifying either
+
+    Sections that the overlay doesn't change are shared with base by reference, only the
+    sections along changed keys are copied
+    """
+    out = dict(base)
+    for k, v in overlay.items():
+        b = out.get(k)
+        if v is b:
+            # Already shared, e.g. the same base reached through two paths
+            continue
+        if isinstance(v, dict) and isinstance(b, dict):
+            out[k] = _merge(b, v)
+        else:
+            out[k] = v
+    return out
+
+
+def compose_config(
+    paths,
+    subset=None,
+    loader="auto",
+    cache=False,
+    cache_dir=None,
+    _files=None,
+    _shared=False,
+):
+    """Read one config file, or deep-merge an ordered list of them, resolving _base_ files
+
+    A file may name the file(s) it is layered on with a top-level "_base_: base.yaml" (or a
+    list), relative to its own directory. Later files and the file containing "_base_" take
+    precedence. Base files are parsed once per process (until modified) and shared by every
+    config composed from them, so loading many overlays of one base only parses the
+    overlays. The returned data is a copy that can be modified freely
+
+    Parameters
+    ----------
+    paths : str | list
+        The YAML file path, or the paths to merge in order
+    subset : str | None
+        The requested subset, part of the cache key of the last file
+    loader : str
+        The YAML loader backend: "auto", "c" or "python"
+    cache : bool
+        Whether to use the process-wide parsed-config cache for the last file
+    cache_dir : str | bool | None
+        The on-disk cache directory, if any
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    info = None
+    for i, path in enumerate(paths):
+        layer = _read_layer(
+            path, subset, loader, cache, cache_dir, i < len(paths) - 1, (), _files
+        )
+        info = layer if info is None else _merge(info, layer)
+    # Internal callers build new objects from the data and copy mutable leaves themselves
+    return info if _shared else _copy_tree(info)
+
+
+def _read_layer(path, subset, loader, cache, cache_dir, shared, stack, files):
+    """Read one file and merge it over its _base_ files"""
+    real = os.path.realpath(path)
+    if real in stack:
+        raise ValueError(
+            "AutoConfig found circular _base_ files: " + " -> ".join(stack + (real,))
+        )
+    if files is not None:
+        files.append(real)
+
+    if shared:
+        st = os.stat(real)
+        key = (real, st.st_size, st.st_mtime_ns, loader)
+        info = _BASE_CACHE.get(key)
+        if info is None:
+            info = read_config(path, loader=loader, cache_dir=cache_dir) or {}
+            _BASE_CACHE.put(key, info, st.st_size)
+        elif _STATS.current() is not None:
+            _STATS.current().add("cache_hits")
+    else:
+        info = read_config(path, subset, loader, cache, cache_dir)
+
+    bases = info.get(BASE_KEY) if isinstance(info, dict) else None
+    if bases is None:
+        return info
+    if isinstance(bases, str):
+        bases = [bases]
+    merged = {}
+    for base in bases:
+        base = os.path.join(os.path.dirname(path), base)
+        layer = _read_layer(
+            base, None, loader, cache, cache_dir, True, stack + (real,), files
+        )
+        merged = _merge(merged, layer)
+    return _merge(merged, {k: v for k, v in info.items() if k != BASE_KEY})
@@ -0,0 +1,618 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import collections.abc
+import dataclasses
+import enum
+import numbers
+import pathlib
+import threading
+import types
+import typing
+
+from .arrays import is_array
+from .autoconfig import (
+    _coerce_numeric,
+    _freeze,
+    _get_dict_exclude,
+    _node_items,
+    args_from_YAML,
+)
+
+# Keys added by args_from_YAML itself, never reported as unknown by strict binding
+SCHEMA_IGNORED_KEYS = frozenset(("subset", "config_path"))
+
+_MISSING = object()
+# Unparameterized containers hold any values
+_BARE_CONTAINERS = {
+    list: typing.List[typing.Any],
+    tuple: typing.Tuple[typing.Any, ...],
+    set: typing.Set[typing.Any],
+    frozenset: typing.FrozenSet[typing.Any],
+    dict: typing.Dict[typing.Any, typing.Any],
+}
+_UNION_TYPES = (typing.Union,) + (
+    (types.UnionType,) if hasattr(types, "UnionType") else ()
+)
+
+
+class SchemaError(ValueError):
+    """A config value that doesn't match its schema
+
+    Attributes
+    ----------
+    path : str
+        The dotted path of the value, e.g. "DAAC_cfg.gamma" or "layers[2].size"
+    message : str
+        What was wrong with it
+    """
+
+    def __init__(self, message, path=""):
+        super().__init__(f"{path}: {message}" if path else message)
+        self.message = message
+        self.path = path
+
+    def prefixed(self, name):
+        """Return the error with its path inside the given key or "[index]" """
+        if not self.path:
+            path = name
+        elif self.path.startswith("["):
+            path = f"{name}{self.path}"
+        else:
+            path = f"{name}.{self.path}"
+        return SchemaError(self.message, path)
+
+
+class BoundConfig:
+    """Base class of the immutable, slotted objects created by binding a config to a schema
+
+    Each schema gets its own subclass (see compile_schema) with one slot per field.
+    Sections of the schema are BoundConfig objects as well
+    """
+
+    __slots__ = ()
+
+    # The CompiledSchema of the subclass
+    _schema = None
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self):
+        return tuple(getter(self) for getter in self._schema.getters)
+
+    def __reduce__(self):
+        return (_rebuild, (self._schema.schema, self._values()))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        # list, dict and set fields are hashed in their frozen forms
+        return hash((type(self), tuple(map(_freeze, self._values()))))
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._values())
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self):
+        """Return the fields as nested dictionaries"""
+        return {
+            name: value.to_dict() if isinstance(value, BoundConfig) else value
+            for name, value in zip(self.__slots__, self._values())
+        }
+
+
+def _rebuild(schema, values):
+    """Recreate a pickled BoundConfig without validating it again"""
+    compiled = compile_schema(schema)
+    obj = object.__new__(compiled.cls)
+    for setter, value in zip(compiled.setters, values):
+        setter(obj, value)
+    return obj
+
+
+def _type_name(tp):
+    return getattr(tp, "__name__", None) or str(tp).replace("typing.", "")
+
+
+def _describe(value):
+    return f"{type(value).__name__} {value!r}"
+
+
+# Converters take a value and return it as the annotated type, or raise SchemaError.
+# Values that already have the exact type are passed through without calling them
+
+
+def _to_int(value):
+    t = type(value)
+    if t is float and value.is_integer():
+        return int(value)
+    if t is str:
+        out = _coerce_numeric(value.strip())
+        if type(out) is int:
+            return out
+    elif t is not bool and isinstance(value, numbers.Integral):
+        # e.g. numpy integers
+        return int(value)
+    raise SchemaError(f"expected int, got {_describe(value)}")
+
+
+def _to_float(value):
+    t = type(value)
+    if t is int or (t is not bool and isinstance(value, numbers.Real)):
+        return float(value)
+    if t is str:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise SchemaError(f"expected float, got {_describe(value)}")
+
+
+def _to_none(value):
+    # Configs commonly spell null as "None" (see example.yaml)
+    if value == "None":
+        return None
+    raise SchemaError(f"expected None, got {_describe(value)}")
+
+
+def _exact_only(tp):
+    def convert(value):
+        raise SchemaError(f"expected {tp.__name__}, got {_describe(value)}")
+
+    return convert
+
+
+def _section_items(value):
+    """Return the keys and values of a section as a dict, or None if it isn't one"""
+    if type(value) is args_from_YAML:
+        return value.__dict__
+    elif isinstance(value, args_from_YAML):
+        # Build any lazy sections
+        return dict(_node_items(value))
+    elif isinstance(value, collections.abc.Mapping):
+        return value
+    return None
+
+
+def _items_converter(exact, convert, index):
+    """Convert the items of a container, with the index of a bad item in the error"""
+
+    def convert_items(values):
+        out = []
+        for i, v in enumerate(values):
+            if type(v) is not exact:
+                try:
+                    v = convert(v)
+                except SchemaError as e:
+                    raise e.prefixed(f"[{i}]" if index else "[]") from None
+            out.append(v)
+        return out
+
+    return convert_items
+
+
+def _sequence_values(value, name):
+    if type(value) in (list, tuple):
+        return value
+    if is_array(value):
+        return value.tolist()
+    raise SchemaError(f"expected {name}, got {_describe(value)}")
+
+
+def _list_converter(item, strict):
+    exact, convert = _converter(item, strict)
+    items = _items_converter(exact, convert, True)
+
+    def to_list(value):
+        return items(_sequence_values(value, "list"))
+
+    return to_list
+
+
+def _set_converter(tp, item, strict):
+    exact, convert = _converter(item, strict)
+    items = _items_converter(exact, convert, False)
+
+    def to_set(value):
+        if not isinstance(value, (set, frozenset)):
+            value = _sequence_values(value, tp.__name__)
+        return tp(items(value))
+
+    return to_set
+
+
+def _tuple_converter(args, strict):
+    if len(args) == 2 and args[1] is Ellipsis:
+        items = _items_converter(*_converter(args[0], strict), True)
+
+        def to_tuple(value):
+            return tuple(items(_sequence_values(value, "tuple")))
+
+        return to_tuple
+
+    converters = [_converter(a, strict) for a in args]
+
+    def to_fixed_tuple(value):
+        value = _sequence_values(value, "tuple")
+        if len(value) != len(converters):
+            raise SchemaError(
+                f"expected a tuple of {len(converters)} items, got {len(value)}"
+            )
+        out = []
+        for i, (v, (exact, convert)) in enumerate(zip(value, converters)):
+            if type(v) is not exact:
+                try:
+                    v = convert(v)
+                except SchemaError as e:
+                    raise e.prefixed(f"[{i}]") from None
+            out.append(v)
+        return tuple(out)
+
+    return to_fixed_tuple
+
+
+def _dict_converter(key, val, strict):
+    key_exact, key_convert = _converter(key, strict)
+    val_exact, val_convert = _converter(val, strict)
+
+    def to_dict(value):
+        items = _section_items(value)
+        if items is None:
+            raise SchemaError(f"expected dict, got {_describe(value)}")
+        out = {}
+        for k, v in items.items():
+            if k in SCHEMA_IGNORED_KEYS and isinstance(value, args_from_YAML):
+                continue
+            if type(k) is not key_exact:
+                try:
+                    k = key_convert(k)
+                except SchemaError as e:
+                    raise e.prefixed(str(k)) from None
+            if isinstance(v, args_from_YAML):
+                v = _get_dict_exclude(v, exclude=SCHEMA_IGNORED_KEYS)
+            if type(v) is not val_exact:
+                try:
+                    v = val_convert(v)
+                except SchemaError as e:
+                    raise e.prefixed(str(k)) from None
+            out[k] = v
+        return out
+
+    return to_dict
+
+
+def _union_converter(args, strict):
+    converters = [_converter(a, strict) for a in args]
+    exact = frozenset(e for e, _ in converters)
+    name = " | ".join(map(_type_name, args))
+
+    def to_union(value):
+        if type(value) in exact:
+            return value
+        # The first type that accepts the value wins
+        for _, convert in converters:
+            try:
+                return convert(value)
+            except SchemaError:
+                pass
+        raise SchemaError(f"expected {name}, got {_describe(value)}")
+
+    return to_union
+
+
+def _literal_converter(args):
+    def to_literal(value):
+        for a in args:
+            # 1 == True, so the types must match as well
+            if value == a and type(value) is type(a):
+                return a
+        raise SchemaError(f"expected one of {list(args)}, got {_describe(value)}")
+
+    return to_literal
+
+
+def _class_converter(tp):
+    # Enums and paths are created from their value, other classes are only checked
+    construct = issubclass(tp, (enum.Enum, pathlib.PurePath))
+
+    def to_class(value):
+        if isinstance(value, tp):
+            return value
+        if construct:
+            try:
+                return tp(value)
+            except (TypeError, ValueError):
+                pass
+        raise SchemaError(f"expected {tp.__name__}, got {_describe(value)}")
+
+    return to_class
+
+
+def _is_schema(tp):
+    """Whether a type is a schema, i.e. a dataclass or a plain class with annotations"""
+    if not isinstance(tp, type):
+        return False
+    if dataclasses.is_dataclass(tp):
+        return True
+    if tp.__module__ == "builtins" or issubclass(
+        tp, (tuple, dict, enum.Enum, pathlib.PurePath)
+    ):
+        return False
+    return bool(_schema_hints(tp))
+
+
+def _schema_hints(tp):
+    return {
+        name: hint
+        for name, hint in typing.get_type_hints(tp).items()
+        if typing.get_origin(hint) is not typing.ClassVar
+        and hint is not typing.ClassVar
+    }
+
+
+def _converter(tp, strict=False):
+    """Return (exact type, converter) for an annotation
+
+    Values whose type is the exact type are used as they are, others are passed to the
+    converter. The exact type is None when every value is converted
+    """
+    if tp is typing.Any or tp is object:
+        return object, lambda v: v
+    if tp is None or tp is type(None):
+        return type(None), _to_none
+    if hasattr(tp, "__supertype__"):
+        # typing.NewType
+        return _converter(tp.__supertype__, strict)
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is typing.Annotated:
+        return _converter(args[0], strict)
+    if origin in _UNION_TYPES:
+        return None, _union_converter(args, strict)
+    if origin is typing.Literal:
+        return None, _literal_converter(args)
+    if origin in (list, collections.abc.Sequence, collections.abc.MutableSequence):
+        return None, _list_converter(args[0] if args else typing.Any, strict)
+    if origin is tuple:
+        return None, _tuple_converter(args or (typing.Any, Ellipsis), strict)
+    if origin in (set, frozenset, collections.abc.Set, collections.abc.MutableSet):
+        cls = frozenset if origin is frozenset else set
+        return None, _set_converter(cls, args[0] if args else typing.Any, strict)
+    if origin in (dict, collections.abc.Mapping, collections.abc.MutableMapping):
+        key, val = args if args else (typing.Any, typing.Any)
+        return None, _dict_converter(key, val, strict)
+    if origin is not None:
+        raise TypeError(f"AutoConfig schemas don't support the annotation {tp}")
+
+    if tp is int:
+        return int, _to_int
+    if tp is float:
+        return float, _to_float
+    if tp is bool or tp is str or tp is bytes:
+        return tp, _exact_only(tp)
+    if tp in _BARE_CONTAINERS:
+        return _converter(_BARE_CONTAINERS[tp], strict)
+    if _is_schema(tp):
+        compiled = compile_schema(tp, strict)
+        return compiled.cls, compiled.bind
+    if isinstance(tp, type):
+        return tp, _class_converter(tp)
+    raise TypeError(f"AutoConfig schemas don't support the annotation {tp!r}")
+
+
+class _Field:
+    __slots__ = ("name", "exact", "convert", "setter", "default", "factory")
+
+    def __init__(self, name, exact, convert, setter, default, factory):
+        self.name = name
+        self.exact = exact
+        self.convert = convert
+        self.setter = setter
+        self.default = default
+        self.factory = factory
+
+
+class CompiledSchema:
+    """The validator and slotted class of a schema, built once by compile_schema
+
+    Attributes
+    ----------
+    schema : type
+        The dataclass or annotated class
+    strict : bool
+        Whether keys missing from the schema are errors, in sections as well
+    cls : type
+        The BoundConfig subclass created for the schema, with one slot per field
+    names : tuple
+        The field names, in order
+    """
+
+    def __init__(self, schema, strict=False):
+        self.schema = schema
+        self.strict = strict
+        self.names = ()
+        self.cls = None
+        self.fields = ()
+        self.setters = ()
+        self.getters = ()
+        # Field names and ignored keys, for strict binding
+        self.index = frozenset()
+
+    def _compile(self):
+        schema = self.schema
+        hints = _schema_hints(schema)
+        if dataclasses.is_dataclass(schema):
+            missing = lambda v: _MISSING if v is dataclasses.MISSING else v
+            specs = [
+                (
+                    f.name,
+                    hints.get(f.name, f.type),
+                    missing(f.default),
+                    missing(f.default_factory),
+                )
+                for f in dataclasses.fields(schema)
+            ]
+        else:
+            # Class attributes are the defaults
+            specs = [
+                (name, hint, getattr(schema, name, _MISSING), _MISSING)
+                for name, hint in hints.items()
+            ]
+        self.names = tuple(name for name, _, _, _ in specs)
+        if self.strict:
+            # Strict and lenient binding create the same class
+            base = compile_schema(schema)
+            self.cls, self.setters, self.getters = base.cls, base.setters, base.getters
+        else:
+            self.cls = type(
+                schema.__name__,
+                (BoundConfig,),
+                {
+                    "__slots__": self.names,
+                    "__module__": schema.__module__,
+                    "__qualname__": schema.__qualname__,
+                    "__doc__": schema.__doc__,
+                    "_schema": self,
+                },
+            )
+            descriptors = [self.cls.__dict__[name] for name in self.names]
+            self.setters = tuple(d.__set__ for d in descriptors)
+            self.getters = tuple(d.__get__ for d in descriptors)
+
+        fields = []
+        for (name, hint, default, factory), setter in zip(specs, self.setters):
+            exact, convert = _converter(hint, self.strict)
+            if default is not _MISSING and type(default) is not exact:
+                # Defaults are converted once, here
+                try:
+                    default = convert(default)
+                except SchemaError as e:
+                    raise TypeError(
+                        f"Bad default in schema {schema.__qualname__}: {e.prefixed(name)}"
+                    ) from None
+            fields.append(_Field(name, exact, convert, setter, default, factory))
+        self.fields = tuple(fields)
+        self.index = frozenset(self.names) | SCHEMA_IGNORED_KEYS
+
+    def bind(self, config):
+        """Validate a config (args_from_YAML or mapping) and return it as a self.cls object"""
+        data = _section_items(config)
+        if data is None:
+            raise SchemaError(
+                f"expected a section for {self.schema.__qualname__}, got {_describe(config)}"
+            )
+        obj = object.__new__(self.cls)
+        for field in self.fields:
+            v = data.get(field.name, _MISSING)
+            if v is _MISSING:
+                if field.default is not _MISSING:
+                    v = field.default
+                elif field.factory is not _MISSING:
+                    v = field.factory()
+                else:
+                    raise SchemaError("missing required key", field.name)
+            elif type(v) is not field.exact:
+                try:
+                    v = field.convert(v)
+                except SchemaError as e:
+                    raise e.prefixed(field.name) from None
+            field.setter(obj, v)
+        if self.strict and len(data) > len(self.fields):
+            for k in data:
+                if k not in self.index:
+                    raise SchemaError("key not in the schema", str(k))
+        return obj
+
+    def __repr__(self):
+        return f"CompiledSchema({self.schema.__qualname__}, {len(self.names)} fields)"
+
+
+# Compiled schemas by (schema class, strict). Schemas are usually module-level classes,
+# so they're kept for the life of the process
+_SCHEMAS = {}
+# Schemas being compiled by the thread holding _LOCK
+_COMPILING = {}
+_LOCK = threading.RLock()
+
+
+def compile_schema(schema, strict=False):
+    """Return the CompiledSchema of a dataclass or annotated class, compiling it once
+
+    Supported annotations: int, float, bool, str, None, Any, Optional/Union (also
+    "int | None"), Literal, list/tuple/set/frozenset/dict and their typing equivalents
+    (with item types), Enum and pathlib classes (created from the value), nested schemas
+    for sections, and other classes (checked with isinstance)
+
+    Parameters
+    ----------
+    schema : type
+        A dataclass, or a class whose annotated attributes are the fields (class
+        attribute values are the defaults)
+    strict : bool
+        Whether keys missing from the schema raise a SchemaError instead of being
+        ignored ("subset" and "config_path" are always ignored)
+    """
+    key = (schema, strict)
+    compiled = _SCHEMAS.get(key)
+    if compiled is not None:
+        return compiled
+    if not _is_schema(schema):
+        raise TypeError(
+            f"{schema!r} isn't a schema, expected a dataclass or a class with annotations"
+        )
+    with _LOCK:
+        compiled = _SCHEMAS.get(key) or _COMPILING.get(key)
+        if compiled is None:
+            outermost = not _COMPILING
+            compiled = CompiledSchema(schema, strict)
+            # Visible to this compile only, so schemas can refer to themselves
+            _COMPILING[key] = compiled
+            try:
+                compiled._compile()
+            except BaseException:
+                del _COMPILING[key]
+                if outermost:
+                    _COMPILING.clear()
+                raise
+            if outermost:
+                # Published together once complete, as nested schemas may refer to
+                # schemas still being compiled (other threads read _SCHEMAS unlocked)
+                _SCHEMAS.update(_COMPILING)
+                _COMPILING.clear()
+    return compiled
+
+
+def bind_config(config, schema, strict=False):
+    """Validate a config against a schema and return it as an immutable, slotted object
+
+    Values are converted to the annotated types (e.g. an int for a float field becomes a
+    float, "1e-05" becomes 1e-05) and nested schemas bind sections. The first bad value
+    raises a SchemaError with its dotted path
+
+    Parameters
+    ----------
+    config : args_from_YAML | dict
+        The loaded config (resolve placeholders with update_reuse first)
+    schema : type
+        A dataclass or a class with type annotations, see compile_schema
+    strict : bool
+        Whether keys missing from the schema raise a SchemaError instead of being ignored
+    """
+    return compile_schema(schema, strict).bind(config)
@@ -0,0 +1,182 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import marshal
+import pickle
+import struct
+from array import array
+from multiprocessing import shared_memory
+
+from .arrays import is_array
+from .autoconfig import args_from_YAML
+from .sweep import flatten_args
+
+_MAGIC = b"ACSM"
+# magic, number of keys, size of the marshalled keys
+_HEADER = struct.Struct("<4sII")
+
+
+def _encode_value(val):
+    if not is_array(val):
+        # marshal would silently store arrays as bytes
+        try:
+            return b"M" + marshal.dumps(val)
+        except ValueError:
+            pass
+    return b"P" + pickle.dumps(val, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_value(data):
+    if data[:1] == b"M":
+        return marshal.loads(data[1:])
+    return pickle.loads(data[1:])
+
+
+def _attach_shared(name):
+    """Open a SharedConfig created by another process, used when unpickling"""
+    try:
+        # Only the creating process should remove the block (Python 3.13+)
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    return SharedConfig(_shm=shm)
+
+
+class SharedConfig:
+    """A read-only view of a config stored in a shared memory block
+
+    Pickling a SharedConfig only sends the block's name, so a config can be handed to
+    any number of worker processes without copying or re-parsing it per worker. Each
+    value is stored separately and only decoded when it is first accessed
+
+    The creating process owns the block: keep the SharedConfig alive while workers use
+    it, then call unlink() (or use it as a context manager)
+    """
+
+    def __init__(self, args=None, exclude=("subset",), _shm=None):
+        """
+        Parameters
+        ----------
+        args : args_from_YAML
+            The config to share
+        exclude : list
+            The names of attributes to leave out
+        """
+        if _shm is None:
+            flat = flatten_args(args, exclude)
+            keys = marshal.dumps(tuple(flat))
+            values = list(map(_encode_value, flat.values()))
+            offsets = array("Q", [0])
+            for v in values:
+                offsets.append(offsets[-1] + len(v))
+            header = _HEADER.pack(_MAGIC, len(values), len(keys))
+            data = b"".join([header, keys, offsets.tobytes()] + values)
+            _shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+            _shm.buf[: len(data)] = data
+            self._owner = True
+        else:
+            self._owner = False
+        self._shm = _shm
+        self._read_layout()
+
+    def _read_layout(self):
+        buf = self._shm.buf
+        magic, n, key_size = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            raise ValueError("Not an AutoConfig shared config")
+        start = _HEADER.size
+        self._keys = marshal.loads(bytes(buf[start : start + key_size]))
+        self._index = {k: i for i, k in enumerate(self._keys)}
+        start += key_size
+        self._offsets = array("Q")
+        self._offsets.frombytes(bytes(buf[start : start + 8 * (n + 1)]))
+        self._start = start + 8 * (n + 1)
+        self._cache = {}
+
+    @property
+    def name(self):
+        """The name of the shared memory block"""
+        return self._shm.name
+
+    def __reduce__(self):
+        return (_attach_shared, (self._shm.name,))
+
+    def keys(self):
+        """Return the dotted keys, in order"""
+        return self._keys
+
+    def __iter__(self):
+        """Yield the dotted keys"""
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        if not isinstance(key, str):
+            key = ".".join(map(str, key))
+        return key in self._index
+
+    def get(self, key):
+        """Return the value at a dotted key ("A.B.C") or list of nested keys"""
+        if not isinstance(key, str):
+            key = ".".join(map(str, key))
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        i = self._index[key]
+        a = self._start + self._offsets[i]
+        b = self._start + self._offsets[i + 1]
+        val = self._cache[key] = _decode_value(bytes(self._shm.buf[a:b]))
+        return val
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def items(self):
+        """Yield (dotted key, value) pairs"""
+        for k in self._keys:
+            yield k, self.get(k)
+
+    def to_dict(self):
+        """Return the config as nested dictionaries"""
+        out = {}
+        for key, val in self.items():
+            node = out
+            parts = key.split(".")
+            for p in parts[:-1]:
+                node = node.setdefault(p, {})
+            node[parts[-1]] = val
+        return out
+
+    def to_args(self, coerce=None):
+        """Return a new, mutable args_from_YAML instance with the shared values"""
+        info = self.to_dict()
+        out = args_from_YAML(info.get("config_path"), _info=info, coerce=coerce)
+        if "subset" not in info:
+            del out.subset
+        return out
+
+    def __repr__(self):
+        return f"SharedConfig({self._shm.name!r}, {len(self)} keys)"
+
+    def close(self):
+        """Detach from the shared memory block"""
+        self._cache = {}
+        self._shm.close()
+
+    def unlink(self):
+        """Free the shared memory block (creating process only), after workers are done"""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
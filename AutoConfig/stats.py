@@ -0,0 +1,237 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import threading
+import time
+
+# Phases timed by the instrumentation, in the order they happen
+STATS_PHASES = (
+    "read",  # reading config files (and the on-disk cache)
+    "parse",  # the YAML parse
+    "build",  # creating the args_from_YAML sections, excluding coercion
+    "coerce",  # converting values with the coerce policy
+    "reuse",  # indexing and resolving update_reuse placeholders
+    "diff",  # comparing configs in compare_args
+    "render",  # formatting the compare_args report
+    "write",  # serializing and writing save_to_yaml files (and sidecars)
+)
+
+
+class ConfigStats:
+    """Wall time per phase and counters of an instrumented operation (see enable_stats)
+
+    Attributes
+    ----------
+    operation : str
+        "load", "update_reuse", "save_to_yaml" or "compare_args"
+    path : str | list | None
+        The config file path(s) involved, if any
+    total : float
+        The wall time of the whole operation in seconds
+    times : dict
+        {phase: seconds}, see STATS_PHASES. Time spent outside of these phases (e.g.
+        merging _base_ files) only counts towards total
+    counts : dict
+        {counter: count} of "files" read, "bytes_read", "bytes_written", "cache_hits",
+        "nodes" (sections built), "keys" (values assigned), "coerced" (values changed by
+        the coerce policy), "placeholders" (indexed by update_reuse), "resolved"
+        (placeholders rendered) and "differences" (found by compare_args)
+    """
+
+    __slots__ = ("operation", "path", "total", "times", "counts")
+
+    def __init__(self, operation, path=None):
+        self.operation = operation
+        self.path = path
+        self.total = 0.0
+        self.times = {}
+        self.counts = {}
+
+    def add_time(self, phase, seconds):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+
+    def add(self, counter, n=1):
+        self.counts[counter] = self.counts.get(counter, 0) + n
+
+    def phase(self, name):
+        """Return a context manager adding the time spent within it to a phase"""
+        return _Timer(self, name)
+
+    def merge(self, other):
+        """Add the times and counters of another ConfigStats to this one"""
+        self.total += other.total
+        for k, v in other.times.items():
+            self.add_time(k, v)
+        for k, v in other.counts.items():
+            self.add(k, v)
+        return self
+
+    def as_dict(self):
+        """Return the stats as a JSON-serializable dict, e.g. for a metrics backend"""
+        return {
+            "operation": self.operation,
+            "path": self.path,
+            "total": self.total,
+            "times": dict(self.times),
+            "counts": dict(self.counts),
+        }
+
+    def __repr__(self):
+        times = ", ".join(f"{k}={v * 1e3:.3f}ms" for k, v in self.times.items())
+        counts = ", ".join(f"{k}={v}" for k, v in self.counts.items())
+        return (
+            f"ConfigStats({self.operation}, total={self.total * 1e3:.3f}ms, "
+            f"times=({times}), counts=({counts}))"
+        )
+
+
+class _Timer:
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.stats
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """Stand-in for _Timer when stats are off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _phase(stats, name):
+    """Time a phase if stats is a ConfigStats, otherwise do nothing"""
+    return _NULL_TIMER if stats is None else _Timer(stats, name)
+
+
+class _StatsSettings:
+    """The process-wide switch and hooks, and the stats being collected by each thread"""
+
+    def __init__(self):
+        # Checked before anything else, so disabled stats cost one attribute lookup
+        self.enabled = False
+        self.hooks = ()
+        self._local = threading.local()
+
+    def current(self):
+        """Return the stats of the operation running in this thread, if any"""
+        return getattr(self._local, "stats", None) if self.enabled else None
+
+    def start(self, operation, path=None):
+        """Begin collecting an operation, returning (stats, start time)
+
+        An operation started within another (e.g. the loads of compare_yaml) adds to the
+        outer stats and the start time is None, so only the outermost one is finished
+        """
+        outer = getattr(self._local, "stats", None)
+        if outer is not None:
+            return outer, None
+        stats = self._local.stats = ConfigStats(operation, path)
+        return stats, time.perf_counter()
+
+    def finish(self, stats, start, error=False):
+        """Stop collecting, passing the stats to the hooks unless the operation failed"""
+        if start is None:
+            return
+        stats.total = time.perf_counter() - start
+        self._local.stats = None
+        if not error:
+            for hook in self.hooks:
+                hook(stats)
+
+
+# Process-wide stats settings, see enable_stats
+_STATS = _StatsSettings()
+
+
+class _Collector:
+    """Context manager collecting the stats of one operation, see _collect"""
+
+    __slots__ = ("operation", "path", "target", "stats", "start")
+
+    def __init__(self, operation, path, target):
+        self.operation = operation
+        self.path = path
+        self.target = target
+
+    def __enter__(self):
+        self.stats, self.start = _STATS.start(self.operation, self.path)
+        return self.stats
+
+    def __exit__(self, exc_type, exc, tb):
+        failed = exc_type is not None
+        if self.target is not None and self.start is not None and not failed:
+            # Add up the operations on the target, without changing the hooks' copy
+            total = self.target._stats
+            if total is None:
+                total = ConfigStats(self.operation, self.path)
+            object.__setattr__(self.target, "_stats", total)
+            _STATS.finish(self.stats, self.start)
+            total.merge(self.stats)
+        else:
+            _STATS.finish(self.stats, self.start, error=failed)
+
+
+def _collect(operation, path=None, target=None):
+    """Return a context manager collecting the stats of an operation, which are added to
+    target._stats. It yields the ConfigStats, or None when stats are disabled"""
+    if not _STATS.enabled:
+        return _NULL_TIMER
+    return _Collector(operation, path, target)
+
+
+def enable_stats(hook=None):
+    """Start recording per-phase timings and counters of loads, update_reuse, save_to_yaml
+    and compare_args
+
+    Each operation's ConfigStats is passed to the hooks. The stats of a loaded config, and
+    of later update_reuse and save_to_yaml calls on it, are added up in args.get_stats()
+
+    Parameters
+    ----------
+    hook : callable | None
+        Also call hook(stats) after every operation, see add_stats_hook
+    """
+    if hook is not None:
+        add_stats_hook(hook)
+    _STATS.enabled = True
+
+
+def disable_stats():
+    """Stop recording stats and remove every hook"""
+    _STATS.enabled = False
+    _STATS.hooks = ()
+
+
+def stats_enabled():
+    """Return whether stats are being recorded"""
+    return _STATS.enabled
+
+
+def add_stats_hook(hook):
+    """Call hook(stats) with the ConfigStats of every operation while stats are enabled"""
+    _STATS.hooks = _STATS.hooks + (hook,)
+
+
+def remove_stats_hook(hook):
+    """Remove a hook added with add_stats_hook or enable_stats"""
+    _STATS.hooks = tuple(h for h in _STATS.hooks if h is not hook)
@@ -0,0 +1,347 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import glob
+import math
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .autoconfig import (
+    _add_parent,
+    _init_slots,
+    _lazy_args_from_YAML,
+    _node_items,
+    _update_lazy_class,
+    _values_differ,
+    args_from_YAML,
+)
+from .dict_print import dict_print
+
+
+class _Missing:
+    """Marks a key that doesn't exist in one of the compared configs"""
+
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+class ConfigTable:
+    """The keys that vary across a set of configs, with the value in every file
+
+    Attributes
+    ----------
+    files : list
+        The compared files, in order
+    values : dict
+        {dotted path: [value per file]}, where MISSING marks files without that key
+    """
+
+    def __init__(self, files, values):
+        self.files = files
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"ConfigTable({len(self.files)} files, {len(self.values)} varying keys)"
+
+    def print(self):
+        """Pretty print each varying key with its value in every file"""
+        if len(self.values) == 0:
+            print("No differences found.")
+            return
+        dict_print({k: " | ".join(map(str, v)) for k, v in self.values.items()})
+
+
+def _expand_paths(files):
+    """Return the YAML paths for a glob pattern, a directory or a list of either"""
+    if isinstance(files, str):
+        files = [files]
+    out = []
+    for f in files:
+        if os.path.isdir(f):
+            out.extend(
+                sorted(
+                    glob.glob(os.path.join(f, "*.yaml"))
+                    + glob.glob(os.path.join(f, "*.yml"))
+                )
+            )
+        elif glob.has_magic(f):
+            out.extend(sorted(glob.glob(f, recursive=True)))
+        else:
+            out.append(f)
+    return out
+
+
+def _map_pool(func, items, workers=None, executor="thread"):
+    """Yield func(item) for each item, in order, optionally using a pool of workers
+
+    Parameters
+    ----------
+    func : callable
+        The function to apply, must be a module-level function for "process"
+    items : iterable
+        The inputs
+    workers : int | None
+        The number of workers, None or 1 runs serially in this thread
+    executor : str | concurrent.futures.Executor
+        "thread" or "process", or an existing pool to use (workers is then ignored)
+    """
+    if isinstance(executor, Executor):
+        # The caller owns the pool, so it isn't shut down
+        yield from executor.map(func, items)
+        return
+    if workers is None or workers <= 1:
+        yield from map(func, items)
+        return
+    if executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=workers)
+    elif executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError(
+            f'Unknown executor "{executor}", expected "thread" or "process"'
+        )
+    with pool:
+        yield from pool.map(func, items)
+
+
+def flatten_args(obj, exclude=("subset",), _prefix=""):
+    """Return {dotted path: value} for every non-section value of a parser"""
+    out = {}
+    for k, v in _node_items(obj):
+        if k in exclude:
+            continue
+        if isinstance(v, args_from_YAML):
+            out.update(flatten_args(v, exclude, f"{_prefix}{k}."))
+        else:
+            out[f"{_prefix}{k}"] = v
+    return out
+
+
+def _load_flat(args):
+    """Load one config and flatten it (module-level so process pools can pickle it)"""
+    path, kwargs, exclude = args
+    return flatten_args(args_from_YAML(path, **kwargs), exclude)
+
+
+def compare_sweep(
+    files, workers=None, executor="thread", exclude=("subset", "config_path"), **kwargs
+):
+    """Compare any number of YAML configs, returning the keys whose values vary
+
+    Each file is loaded once (optionally in parallel) and merged into a single table,
+    so the cost grows linearly with the number of files rather than with every pair
+
+    Parameters
+    ----------
+    files : str | list
+        A glob pattern, a directory of YAML files, or a list of paths/patterns
+    workers : int | None
+        The number of parallel loaders
+    executor : str | concurrent.futures.Executor
+        "thread" or "process", or an existing pool
+    exclude : list
+        The names of attributes to ignore
+    **kwargs
+        Passed to args_from_YAML, e.g. loader, cache_dir or subset
+
+    Returns
+    -------
+    ConfigTable
+        The varying keys with their value in every file
+    """
+    files = _expand_paths(files)
+    n = len(files)
+    table = {}
+    # Whether each key has differed so far, compared against the first file having it
+    varies = {}
+    jobs = ((f, kwargs, exclude) for f in files)
+    for i, flat in enumerate(_map_pool(_load_flat, jobs, workers, executor)):
+        for k, v in flat.items():
+            row = table.get(k)
+            if row is None:
+                row = table[k] = [MISSING] * n
+                # Missing from an earlier file
+                varies[k] = i > 0
+            elif not varies[k]:
+                varies[k] = _values_differ(row[0], v)
+            row[i] = v
+        if len(flat) < len(table):
+            # Keys missing from this file
+            for k, row in table.items():
+                if row[i] is MISSING:
+                    varies[k] = True
+
+    return ConfigTable(files, {k: row for k, row in table.items() if varies[k]})
+
+
+class Uniform:
+    """A uniform distribution for random sweeps"""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def __call__(self, rng):
+        return rng.uniform(self.low, self.high)
+
+    def __repr__(self):
+        return f"Uniform({self.low}, {self.high})"
+
+
+class LogUniform(Uniform):
+    """A log-uniform distribution for random sweeps, e.g. for learning rates"""
+
+    def __call__(self, rng):
+        return math.exp(rng.uniform(math.log(self.low), math.log(self.high)))
+
+    def __repr__(self):
+        return f"LogUniform({self.low}, {self.high})"
+
+
+def _copy_node(node):
+    """Return a new parser sharing the values and sections of node"""
+    new = object.__new__(type(node))
+    _init_slots(new)
+    object.__setattr__(new, "_options", node._options)
+    new.__dict__.update(node.__dict__)
+    return new
+
+
+def _make_variant(base, assignments):
+    """Return a copy of base with the values at the given key paths replaced
+
+    Only the parsers along the assigned paths are copied, every other section is shared
+    with base by reference, so a write to one of them is seen by base and every variant
+    (see sweep_configs)
+    """
+    root = _copy_node(base)
+    copies = {(): root}
+    for path, value in assignments:
+        node = root
+        for i in range(len(path) - 1):
+            child = copies.get(path[: i + 1])
+            if child is None:
+                # getattr builds lazy sections, which are then owned by the copy
+                child = getattr(node, path[i])
+                if not isinstance(child, args_from_YAML):
+                    raise AttributeError(
+                        f"AutoConfig can't sweep {'.'.join(path)}, {'.'.join(path[: i + 1])} is not a section"
+                    )
+                child = _copy_node(child)
+                node.__dict__[path[i]] = child
+                _add_parent(child, node)
+                copies[path[: i + 1]] = child
+            node = child
+        node.__dict__[path[-1]] = value
+        if type(node) is _lazy_args_from_YAML:
+            _update_lazy_class(node)
+    return root
+
+
+def _sweep_assignments(spec, mode, n, seed, shard, num_shards):
+    """Yield (index, [(key path, value), ...]) for this shard's variants"""
+    paths = [tuple(k.split(".")) for k in spec]
+    choices = list(spec.values())
+    for k, v in spec.items():
+        if not callable(v) and not isinstance(v, (list, tuple, range)):
+            raise TypeError(
+                f'Sweep values for "{k}" must be a list, tuple, range or distribution'
+            )
+
+    if mode == "grid":
+        if any(callable(v) for v in choices):
+            raise ValueError('Distributions can only be used with mode="random"')
+        total = math.prod(map(len, choices))
+        if n is not None:
+            total = min(n, total)
+        for i in range(shard, total, num_shards):
+            # Decode the variant's position in the grid, the last key varies fastest
+            values, rem = [], i
+            for v in reversed(choices):
+                rem, j = divmod(rem, len(v))
+                values.append(v[j])
+            yield i, list(zip(paths, reversed(values)))
+    elif mode == "random":
+        if n is None:
+            raise ValueError('The number of variants "n" is required for mode="random"')
+        for i in range(shard, n, num_shards):
+            # Seeded per variant, so every shard draws the same values for the same index
+            rng = random.Random(f"{seed}:{i}")
+            values = [v(rng) if callable(v) else rng.choice(v) for v in choices]
+            yield i, list(zip(paths, values))
+    else:
+        raise ValueError(f'Unknown sweep mode "{mode}", expected "grid" or "random"')
+
+
+def sweep_configs(
+    base,
+    spec,
+    mode="grid",
+    n=None,
+    seed=0,
+    shard=0,
+    num_shards=1,
+    save_to=None,
+    exclude=["subset"],
+):
+    """Lazily generate variants of a config, one per combination of the swept values
+
+    Variants are generated one at a time, so the full grid is never held in memory.
+    Each variant only copies the sections along the swept keys and shares every other
+    section with the base by reference. Variants are therefore read-only beyond the
+    swept keys, which is not enforced: writing to a shared section, e.g.
+    variant.optim.momentum = 0.5 when nothing under "optim" is swept, changes the base
+    and every other variant. Use copy.deepcopy() on a variant to modify it freely
+
+    Parameters
+    ----------
+    base : args_from_YAML
+        The config to vary. Resolve any "${}" placeholders with .update_reuse() first
+    spec : dict
+        {dotted key: values}, where values is a list (or tuple/range) of values, or for
+        mode="random" a distribution, i.e. a callable taking a random.Random instance,
+        such as Uniform(0, 1) or LogUniform(1e-5, 1e-2)
+    mode : str
+        "grid" for every combination (in order, the last key varying fastest), or
+        "random" for n random combinations
+    n : int | None
+        The number of variants, required for "random", or a limit for "grid"
+    seed : int | str
+        The seed of the random sweep, the same seed always gives the same variants
+    shard : int
+        Which shard of the sweep to generate, in [0, num_shards)
+    num_shards : int
+        The number of shards, variant i belongs to shard i % num_shards. Each shard skips
+        directly to its own variants, so workers can split a sweep without coordination
+    save_to : str | None
+        If given, each variant is written with save_to_yaml before it is yielded, to this
+        path formatted with the variant's index, e.g. "sweep/run_{index}.yaml"
+    exclude : list
+        The names of attributes excluded when saving
+
+    Yields
+    ------
+    args_from_YAML
+        The variants
+    """
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be in [0, {num_shards}), got {shard}")
+    for i, assignments in _sweep_assignments(spec, mode, n, seed, shard, num_shards):
+        variant = _make_variant(base, assignments)
+        if save_to is not None:
+            path = save_to.format(index=i)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            variant.save_to_yaml(path, exclude=exclude)
+        yield variant
@@ -0,0 +1,263 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import threading
+
+from .arrays import NpyRef
+from .autoconfig import (
+    _AS_LOADED,
+    _get_coercer,
+    _unshared,
+    args_from_YAML,
+    get_nested_attribute,
+)
+from .loader import compose_config
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+def _shape_info(info, subset=None, _top=True, _local_subsets=False, _out=None):
+    """Arrange parsed YAML data the way _configure lays out the attributes (subset, _local_)"""
+    out = {} if _out is None else _out
+    for k, v in info.items():
+        if k == "_local_":
+            _local_subsets = v
+        if isinstance(v, dict):
+            if (k == subset and _top) or not _top or subset is None:
+                if _local_subsets:
+                    _shape_info(v, None, False, _local_subsets, out)
+                else:
+                    out[k] = _shape_info(v, k, False)
+        else:
+            out[k] = v
+    return out
+
+
+def _changed_paths(old, new, _prefix=()):
+    """Return the key path tuples that differ between two shaped trees, as shallow as possible"""
+    out = []
+    for k, v in new.items():
+        path = _prefix + (k,)
+        if k not in old:
+            out.append(path)
+        elif isinstance(v, dict) and isinstance(old[k], dict):
+            out.extend(_changed_paths(old[k], v, path))
+        elif type(v) is not type(old[k]) or v != old[k]:
+            out.append(path)
+    out.extend(_prefix + (k,) for k in old if k not in new)
+    return out
+
+
+class ConfigWatcher:
+    """Watch the YAML file behind an args_from_YAML instance and apply edits in place
+
+    Only the attributes whose values changed in the file are updated, so values changed
+    with .set() and resolved "${}" placeholders elsewhere are kept. If .update_reuse() has
+    been used, placeholders depending on changed values are re-resolved. Use
+    args_from_YAML.watch() to create one.
+    """
+
+    def __init__(
+        self,
+        args,
+        path=None,
+        callback=None,
+        interval=1.0,
+        backend="poll",
+        subset=_AS_LOADED,
+        loader=_AS_LOADED,
+        coerce=_AS_LOADED,
+    ):
+        """
+        Parameters
+        ----------
+        args : args_from_YAML
+            The parser to keep up to date
+        path : str | list | None
+            The YAML file (or list of files), by default the parser's config_path.
+            Any "_base_" files they are composed from are watched as well
+        callback : callable | None
+            Called with the list of changed dotted paths after each update
+        interval : float
+            Seconds between checks when polling (or the inotify read timeout)
+        backend : str
+            "poll" checks the file's modification time and size, "inotify" waits for
+            file system events (Linux, requires the inotify_simple package)
+        subset : str | None
+            The subset the parser was loaded with
+        loader : str
+            The YAML loader backend
+        coerce : str | callable | None
+            The type coercion policy the parser was loaded with
+
+        subset, loader and coerce default to the options the parser was loaded with
+        (None, "auto" and "numeric" for parsers that weren't loaded from a file, e.g.
+        unpickled ones)
+        """
+        if backend not in ("poll", "inotify"):
+            raise ValueError(
+                f'Unknown backend "{backend}", expected "poll" or "inotify"'
+            )
+        if backend == "inotify" and inotify_simple is None:
+            raise ImportError(
+                'The "inotify" backend requires the inotify_simple package'
+            )
+
+        self.args = args
+        self.path = path if path is not None else args.config_path
+        self.interval = interval
+        self.backend = backend
+        options = args._options or {}
+        self.subset = options.get("subset") if subset is _AS_LOADED else subset
+        self.loader = options.get("loader", "auto") if loader is _AS_LOADED else loader
+        self.coerce = (
+            options.get("coerce", "numeric") if coerce is _AS_LOADED else coerce
+        )
+        self.callbacks = [] if callback is None else [callback]
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._shaped, self._files = self._read()
+        self._stat = self._file_stat()
+
+    def add_callback(self, callback):
+        """Register a function to be called with the list of changed dotted paths"""
+        self.callbacks.append(callback)
+
+    def _read(self):
+        """Return the shaped parsed data and the files it was composed from"""
+        files = []
+        info = compose_config(self.path, loader=self.loader, _files=files, _shared=True)
+        return _shape_info(info, self.subset), files
+
+    def _file_stat(self):
+        try:
+            return [
+                (st.st_mtime_ns, st.st_size, st.st_ino)
+                for st in map(os.stat, self._files)
+            ]
+        except OSError:
+            return None
+
+    def check(self):
+        """Apply any changes made to the file since the last check
+
+        Returns
+        -------
+        list
+            The changed dotted paths (empty if the file is unchanged)
+        """
+        with self._lock:
+            stat = self._file_stat()
+            if stat is None or stat == self._stat:
+                return []
+            try:
+                shaped, files = self._read()
+            except Exception:
+                # Likely caught mid-write, try again on the next check
+                return []
+            if files != self._files:
+                # The _base_ files changed
+                self._files = files
+                stat = self._file_stat()
+            self._stat = stat
+            changed = _changed_paths(self._shaped, shaped)
+            self._shaped = shaped
+            if changed:
+                self._apply(changed, shaped)
+
+        paths = [".".join(map(str, p)) for p in changed]
+        if paths:
+            for callback in self.callbacks:
+                callback(paths)
+        return paths
+
+    def _apply(self, changed, shaped):
+        """Update only the changed attributes of the parser"""
+        args = self.args
+        coercer = _get_coercer(self.coerce)
+        for path in changed:
+            parent = (
+                get_nested_attribute(args, list(path[:-1])) if len(path) > 1 else args
+            )
+            data = shaped
+            for k in path[:-1]:
+                data = data[k]
+            key = path[-1]
+            # Coercers receive the dotted path of the value, as when loading
+            dotted = ".".join(map(str, path))
+
+            if key not in data:
+                if key in parent.__dict__:
+                    delattr(parent, key)
+            elif isinstance(data[key], dict):
+                section = args_from_YAML(
+                    self.path,
+                    _info=data[key],
+                    subset=key,
+                    coerce=self.coerce,
+                    _prefix=f"{dotted}.",
+                )
+                setattr(parent, key, section)
+            else:
+                value = _unshared(data[key])
+                if type(value) is NpyRef:
+                    value = value.load()
+                elif coercer is not None:
+                    value = coercer(dotted, value)
+                setattr(parent, key, value)
+
+        index = args._reuse
+        if index is not None:
+            # Index any new placeholders, then re-resolve those depending on changed values
+            for path in changed:
+                index.track(args, path)
+            index.resolve(args, verbose=False)
+
+    def start(self):
+        """Start checking for changes in a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            target = self._run_inotify if self.backend == "inotify" else self._run_poll
+            self._thread = threading.Thread(target=target, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run_poll(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def _run_inotify(self):
+        flags = inotify_simple.flags
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+        with inotify_simple.INotify() as inotify:
+            watched = {}
+            while not self._stop.is_set():
+                names = set(map(os.path.split, self._files))
+                # Watch the directories, since editors often replace files rather than write to them
+                for directory in {d for d, _ in names} - set(watched.values()):
+                    watched[inotify.add_watch(directory, mask)] = directory
+                events = inotify.read(timeout=int(self.interval * 1000))
+                if any((watched.get(e.wd), e.name) in names for e in events):
+                    self.check()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
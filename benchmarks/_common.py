@@ -0,0 +1,99 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Shared helpers for the AutoConfig benchmark scripts"""
+
+import os
+import sys
+import time
+
+# Allow running the scripts from a source checkout without installing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXAMPLE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example.yaml"
+)
+
+
+def best_time(func, repeat=5, number=1):
+    """Return the best average seconds per call of func() over several repeats"""
+    best = float("inf")
+    for _ in range(repeat):
+        st = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - st) / number)
+    return best
+
+
+def fmt_time(seconds):
+    """Format a duration using a readable unit"""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def synth_lines(width=10, depth=1, list_size=0, ref_density=0.0, _tab=""):
+    """Generate the lines of a synthetic YAML config
+
+    Parameters
+    ----------
+    width : int
+        Number of keys per section (half scalars, half nested sections while depth remains)
+    depth : int
+        Number of nested section levels
+    list_size : int
+        If > 0, every fifth scalar is a list of this many floats
+    ref_density : float
+        Fraction of scalars (below the top level) written as "${seed}" placeholders
+    """
+    lines = []
+    if not _tab:
+        lines.append("seed: 0")
+    for i in range(width):
+        if depth > 0 and i % 2 == 1:
+            lines.append(f"{_tab}sec_{i}:")
+            lines.extend(
+                synth_lines(width, depth - 1, list_size, ref_density, _tab + "    ")
+            )
+        elif _tab and ref_density > 0 and (i * ref_density) % 1 + ref_density >= 1:
+            lines.append(f"{_tab}ref_{i}: ${{seed}}")
+        elif list_size > 0 and i % 5 == 0:
+            vals = ", ".join(f"{j * 0.5}" for j in range(list_size))
+            lines.append(f"{_tab}list_{i}: [{vals}]")
+        elif i % 4 == 0:
+            lines.append(f"{_tab}float_{i}: {i}.5e-05")
+        elif i % 4 == 1:
+            lines.append(f"{_tab}int_{i}: {i}")
+        elif i % 4 == 2:
+            lines.append(f"{_tab}flag_{i}: {'True' if i % 3 else 'null'}")
+        else:
+            lines.append(f"{_tab}name_{i}: value_{i}")
+    return lines
+
+
+def write_synth(path, **kwargs):
+    """Write a synthetic YAML config (see synth_lines) to path and return the path"""
+    with open(path, "w") as f:
+        f.write("\n".join(synth_lines(**kwargs)) + "\n")
+    return path
+
+
+def scaled_example(path, copies=10):
+    """Write example.yaml with its sections repeated `copies` times under new names"""
+    with open(EXAMPLE_PATH, "r") as f:
+        text = f.read()
+    head, _, body = text.partition("ENV_info:")
+    body = "ENV_info:" + body
+    with open(path, "w") as f:
+        f.write(head)
+        for c in range(copies):
+            f.write(
+                body.replace("_info:", f"_info_{c}:").replace("_cfg:", f"_cfg_{c}:")
+            )
+            f.write("\n")
+    return path
@@ -0,0 +1,68 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Loading and saving a large numeric table as a YAML list, as an array and as a sidecar
+
+Usage: python benchmarks/bench_arrays.py [number of values]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from _common import best_time, fmt_time
+
+from AutoConfig import HAS_NUMPY, args_from_YAML
+
+
+def load_memory(func):
+    """Return the memory held by the result of func()"""
+    tracemalloc.start()
+    result = func()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        inline = os.path.join(tmp, "inline.yaml")
+        with open(inline, "w") as f:
+            f.write("seed: 0\nmodel:\n    class_weights:\n")
+            f.writelines(f"      - {i * 0.001!r}\n" for i in range(n))
+
+        rows = {
+            "list": lambda: args_from_YAML(inline),
+            'coerce="arrays"': lambda: args_from_YAML(inline, coerce="arrays"),
+        }
+        sidecar = os.path.join(tmp, "sidecar.yaml")
+        if HAS_NUMPY:
+            args_from_YAML(inline, coerce="arrays").save_to_yaml(sidecar)
+            rows["!npy sidecar"] = lambda: args_from_YAML(sidecar)
+        else:
+            print("numpy isn't installed, skipping sidecars")
+
+        print(f"{n} values, {os.path.getsize(inline) / 2**20:.1f} MiB of YAML")
+        print(f"{'load':<18}{'time':>14}{'memory':>14}")
+        for name, func in rows.items():
+            t = best_time(func, repeat=3)
+            print(f"{name:<18}{fmt_time(t):>14}{load_memory(func) / 2**20:>10.2f} MiB")
+
+        args = args_from_YAML(inline, coerce="arrays")
+        out = os.path.join(tmp, "out.yaml")
+        print(f"\n{'save':<18}{'time':>14}")
+        saves = {"inline": lambda: args.save_to_yaml(out, sidecars=False)}
+        if HAS_NUMPY:
+            saves["sidecar"] = lambda: args.save_to_yaml(out)
+        for name, func in saves.items():
+            print(f"{name:<18}{fmt_time(best_time(func, repeat=3)):>14}")
+
+
+if __name__ == "__main__":
+    main()
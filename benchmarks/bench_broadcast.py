@@ -0,0 +1,109 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Serialized size and worker hand-off latency of a config sent to a process pool
+
+Compares pickling the parser object graph (the previous format), the compact format
+of dumps_args (now used by pickle), re-parsing the YAML file in each worker and a
+SharedConfig view
+
+Usage: python benchmarks/bench_broadcast.py [number of tasks]
+"""
+
+import copyreg
+import io
+import multiprocessing as mp
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from _common import best_time, fmt_time, scaled_example
+
+from AutoConfig import args_from_YAML, dumps_args, loads_args
+
+
+class _GraphPickler(pickle.Pickler):
+    """Pickles parsers node by node with their plain __dict__, as before the compact format"""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, args_from_YAML):
+            return copyreg.__newobj__, (args_from_YAML,), obj.__dict__
+        return NotImplemented
+
+
+def graph_dumps(obj):
+    f = io.BytesIO()
+    _GraphPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return f.getvalue()
+
+
+def task_graph(data):
+    return pickle.loads(data).DAAC_cfg_0.lr
+
+
+def task_compact(data):
+    return loads_args(data).DAAC_cfg_0.lr
+
+
+def task_path(path):
+    return args_from_YAML(path).DAAC_cfg_0.lr
+
+
+def task_shared(view):
+    return view["DAAC_cfg_0.lr"]
+
+
+def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    with tempfile.TemporaryDirectory() as tmp:
+        path = scaled_example(os.path.join(tmp, "config.yaml"), copies=20)
+        args = args_from_YAML(path)
+        graph = graph_dumps(args)
+        compact = pickle.dumps(args, protocol=pickle.HIGHEST_PROTOCOL)
+
+        print(f"{'format':<22}{'size':>12}{'dumps':>14}{'loads':>14}")
+        rows = {
+            "YAML file": (os.path.getsize(path), None, lambda: args_from_YAML(path)),
+            "object graph pickle": (
+                len(graph),
+                lambda: graph_dumps(args),
+                lambda: pickle.loads(graph),
+            ),
+            "compact (pickle)": (
+                len(compact),
+                lambda: pickle.dumps(args),
+                lambda: pickle.loads(compact),
+            ),
+        }
+        for name, (size, dumps, loads) in rows.items():
+            t_dumps = fmt_time(best_time(dumps, number=10)) if dumps else "-"
+            t_loads = fmt_time(best_time(loads, number=10))
+            print(f"{name:<22}{size:>10} B{t_dumps:>14}{t_loads:>14}")
+
+        with args.share() as view:
+            print(f"{'SharedConfig pickle':<22}{len(pickle.dumps(view)):>10} B")
+            print(f"\n{tasks} tasks on a pool of 4 workers")
+            with mp.Pool(4) as pool:
+                pool.map(task_path, [path] * 4)
+                cases = {
+                    "object graph pickle": (task_graph, graph),
+                    "compact": (task_compact, dumps_args(args)),
+                    "re-parse YAML": (task_path, path),
+                    "SharedConfig": (task_shared, view),
+                }
+                for name, (func, payload) in cases.items():
+                    st = time.perf_counter()
+                    pool.map(func, [payload] * tasks)
+                    elapsed = time.perf_counter() - st
+                    print(
+                        f"{name:<22}{fmt_time(elapsed):>14}{fmt_time(elapsed / tasks):>14} per task"
+                    )
+
+
+if __name__ == "__main__":
+    main()
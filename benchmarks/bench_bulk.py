@@ -0,0 +1,48 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Loading many configs one by one, with load_many on thread and process pools, and
+with aload_many
+
+Usage: python benchmarks/bench_bulk.py [number of files] [workers]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from _common import best_time, fmt_time, scaled_example
+
+from AutoConfig import aload_many, args_from_YAML, load_many
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [
+            scaled_example(os.path.join(tmp, f"config_{i}.yaml"), copies=5)
+            for i in range(n)
+        ]
+        rows = {
+            "loop over args_from_YAML": lambda: [args_from_YAML(p) for p in paths],
+            "load_many (serial)": lambda: load_many(paths),
+            f"load_many threads={workers}": lambda: load_many(paths, workers=workers),
+            f"load_many processes={workers}": lambda: load_many(
+                paths, workers=workers, executor="process"
+            ),
+            f"aload_many threads={workers}": lambda: asyncio.run(
+                aload_many(paths, workers=workers)
+            ),
+        }
+        print(f"{n} files, {workers} workers")
+        for name, func in rows.items():
+            print(f"{name:<32}{fmt_time(best_time(func, repeat=3)):>14}")
+
+
+if __name__ == "__main__":
+    main()
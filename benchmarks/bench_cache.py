@@ -0,0 +1,51 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Reload time of args_from_YAML with and without the in-memory and on-disk caches
+
+Usage: python benchmarks/bench_cache.py
+"""
+
+import os
+import tempfile
+
+from _common import EXAMPLE_PATH, best_time, fmt_time, scaled_example
+
+from AutoConfig import args_from_YAML, cache_info, clear_cache
+from AutoConfig.cache import _copy_tree
+from AutoConfig.loader import read_config
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "example.yaml": EXAMPLE_PATH,
+            "example x20": scaled_example(os.path.join(tmp, "ex20.yaml"), copies=20),
+        }
+        cache_dir = os.path.join(tmp, "cache")
+        print(
+            f"{'file':<14}{'no cache':>14}{'memory hit':>14}{'tree copy':>14}{'disk hit':>14}"
+        )
+        for name, path in files.items():
+            clear_cache()
+            args_from_YAML(path, cache=True)
+            parsed = read_config(path)
+            t_miss = best_time(lambda: args_from_YAML(path), repeat=5)
+            t_hit = best_time(lambda: args_from_YAML(path, cache=True), repeat=5)
+            t_copy = best_time(lambda: _copy_tree(parsed), repeat=5)
+            args_from_YAML(path, cache_dir=cache_dir)
+            t_disk = best_time(
+                lambda: args_from_YAML(path, cache_dir=cache_dir), repeat=5
+            )
+            print(
+                f"{name:<14}{fmt_time(t_miss):>14}{fmt_time(t_hit):>14}"
+                f"{fmt_time(t_copy):>14}{fmt_time(t_disk):>14}"
+            )
+        print(cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Cost of building args_from_YAML (including type coercion) per node for deep and wide configs
+
+The time per node should stay roughly constant as the configs grow, since each
+value is coerced exactly once
+
+Usage: python benchmarks/bench_coerce.py
+"""
+
+import os
+import tempfile
+
+from _common import best_time, write_synth
+
+from AutoConfig import args_from_YAML
+from AutoConfig.loader import read_config
+
+
+def count_nodes(info):
+    return sum(1 + count_nodes(v) if isinstance(v, dict) else 1 for v in info.values())
+
+
+def main():
+    # width=3 gives two scalars and one section per level, so "deep" is a chain
+    shapes = [("deep", dict(width=3, depth=d)) for d in (4, 8, 16, 32, 64)]
+    shapes += [("wide", dict(width=w, depth=0)) for w in (500, 2000, 8000, 32000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(
+            f"{'shape':<8}{'nodes':>8}{'numeric':>14}{'off':>14}{'custom':>14}  (ns/node)"
+        )
+        for name, kwargs in shapes:
+            path = write_synth(os.path.join(tmp, "cfg.yaml"), **kwargs)
+            parsed = read_config(path)
+            nodes = count_nodes(parsed)
+
+            row = f"{name:<8}{nodes:>8}"
+            for coerce in ("numeric", None, lambda k, v: v):
+                t = best_time(
+                    lambda: args_from_YAML(path, _info=parsed, coerce=coerce), repeat=5
+                )
+                row += f"{t / nodes * 1e9:>14.0f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""compare_sweep over a directory of run configs, serially and with thread/process pools
+
+Usage: python benchmarks/bench_compare_sweep.py [n_files]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from _common import EXAMPLE_PATH, fmt_time
+
+from AutoConfig import args_from_YAML, compare_sweep
+
+
+def main(n_files=1000):
+    with tempfile.TemporaryDirectory() as tmp:
+        base = args_from_YAML(EXAMPLE_PATH)
+        for i in range(n_files):
+            base.set(["DAAC_cfg", "lr"], 10 ** -(i % 5))
+            base.set(["DAAC_cfg", "seed"], i)
+            base.save_to_yaml(os.path.join(tmp, f"run_{i:05d}.yaml"))
+
+        workers = max(os.cpu_count() or 1, 4)
+        for name, kwargs in (
+            ("serial", {}),
+            (f"{workers} threads", dict(workers=workers)),
+            (f"{workers} processes", dict(workers=workers, executor="process")),
+        ):
+            st = time.perf_counter()
+            table = compare_sweep(tmp, **kwargs)
+            elapsed = time.perf_counter() - st
+            print(
+                f"{n_files} files, {name:<14}: {fmt_time(elapsed):>12}"
+                f"  ({fmt_time(elapsed / n_files)}/file, {len(table)} varying keys)"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
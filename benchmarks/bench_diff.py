@@ -0,0 +1,64 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""diff_args cost for two large configs that differ in a few leaves
+
+The first diff hashes both trees, later diffs reuse the cached section hashes and
+only walk the sections that changed
+
+Usage: python benchmarks/bench_diff.py
+"""
+
+import os
+import tempfile
+import time
+
+from _common import fmt_time, write_synth
+
+from AutoConfig import args_from_YAML, diff_args
+
+
+def count_keys(data):
+    return sum(count_keys(v) if isinstance(v, dict) else 1 for v in data.values())
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # 10 keys per section, 4 levels deep: ~5k keys
+        path = write_synth(os.path.join(tmp, "cfg.yaml"), width=10, depth=4)
+        A = args_from_YAML(path)
+        B = args_from_YAML(path)
+        changes = [
+            ["sec_1", "sec_3", "flag_2"],
+            ["sec_5", "sec_5", "sec_7", "float_4"],
+            ["sec_9", "float_0"],
+        ]
+        for key in changes:
+            B.set(key, "changed")
+        n_keys = count_keys(A.get_kwargs())
+
+        st = time.perf_counter()
+        diff = diff_args(A, B)
+        first = time.perf_counter() - st
+        assert len(diff.changed) == len(changes), diff
+
+        st = time.perf_counter()
+        diff_args(A, B)
+        repeat = time.perf_counter() - st
+
+        B.set(changes[0], "changed again")
+        st = time.perf_counter()
+        diff_args(A, B)
+        after_set = time.perf_counter() - st
+
+        print(f"keys: {n_keys}, changed leaves: {len(changes)}")
+        print(f"first diff (hashes both trees): {fmt_time(first)}")
+        print(f"repeated diff (cached hashes):  {fmt_time(repeat)}")
+        print(f"diff after one more .set():     {fmt_time(after_set)}")
+
+
+if __name__ == "__main__":
+    main()
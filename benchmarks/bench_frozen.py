@@ -0,0 +1,65 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Memory held by many resident configs as args_from_YAML instances vs FrozenConfig snapshots
+
+Usage: python benchmarks/bench_frozen.py [number of configs]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from _common import EXAMPLE_PATH, best_time, fmt_time
+
+from AutoConfig import args_from_YAML
+from AutoConfig.loader import read_config
+
+
+def measure(build, n):
+    """Return (bytes per config, the built configs) for n configs"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(i) for i in range(n)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / n, items
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    info = read_config(EXAMPLE_PATH)
+
+    def load(i):
+        # Parse from the already loaded tree so only the resident configs are measured
+        args = args_from_YAML(EXAMPLE_PATH, _info=info, coerce="numeric")
+        args.seed = i
+        return args
+
+    per_args, configs = measure(load, n)
+    sample = configs[0]
+    del configs
+    # Each snapshot is taken from a freshly loaded config that is then dropped
+    per_frozen, frozen = measure(lambda i: load(i).freeze(), n)
+    print(f"{n} configs of example.yaml ({len(frozen[0])} keys each)")
+    print(f"{'representation':<18}{'bytes/config':>14}{'total':>12}")
+    print(f"{'args_from_YAML':<18}{per_args:>14.0f}{per_args * n / 2**20:>9.2f} MiB")
+    print(f"{'FrozenConfig':<18}{per_frozen:>14.0f}{per_frozen * n / 2**20:>9.2f} MiB")
+    print(f"{'ratio':<18}{per_args / per_frozen:>13.1f}x")
+
+    a, b = frozen[0], load(0).freeze()
+    t_freeze = best_time(lambda: sample.freeze(), repeat=5, number=100)
+    t_thaw = best_time(lambda: a.to_args(coerce=None), repeat=5, number=100)
+    t_eq = best_time(lambda: a == b, repeat=5, number=10000)
+    t_hash = best_time(lambda: len({f for f in frozen}), repeat=5)
+    print(f"freeze: {fmt_time(t_freeze)}, to_args: {fmt_time(t_thaw)}")
+    print(f"equality: {fmt_time(t_eq)}, set of {n}: {fmt_time(t_hash)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Construction time and memory of eager vs lazy args_from_YAML when only a few sections are read
+
+Usage: python benchmarks/bench_lazy.py
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+from _common import best_time, fmt_time, scaled_example
+
+from AutoConfig import args_from_YAML
+from AutoConfig.loader import read_config
+
+
+def load_and_touch(path, lazy, parsed=None):
+    # Pass pre-parsed data so the timings only include building the parser
+    cfg = args_from_YAML(path, lazy=lazy, _info=parsed)
+    return cfg.DAAC_cfg_0.lr, cfg.STE_cfg_1.seed, cfg.ENV_info_2.obs_shape
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(
+            f"{'sections':>9}{'eager':>14}{'lazy':>14}{'eager mem':>12}{'lazy mem':>12}"
+        )
+        for copies in (10, 100, 1000):
+            path = scaled_example(os.path.join(tmp, f"ex{copies}.yaml"), copies=copies)
+            parsed = read_config(path)
+            times = [
+                best_time(lambda: load_and_touch(path, lazy, parsed), repeat=3)
+                for lazy in (False, True)
+            ]
+            mems = [
+                peak_memory(lambda: load_and_touch(path, lazy, parsed))
+                for lazy in (False, True)
+            ]
+            print(
+                f"{copies * 3:>9}"
+                + "".join(f"{fmt_time(t):>14}" for t in times)
+                + "".join(f"{m / 1024:>9.0f} KB" for m in mems)
+            )
+
+
+if __name__ == "__main__":
+    main()
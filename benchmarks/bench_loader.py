@@ -0,0 +1,58 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Per-file load time of args_from_YAML for each YAML loader backend
+
+Usage: python benchmarks/bench_loader.py
+"""
+
+import os
+import tempfile
+
+from _common import EXAMPLE_PATH, best_time, fmt_time, scaled_example, write_synth
+
+from AutoConfig import args_from_YAML
+from AutoConfig.loader import HAS_LIBYAML
+
+
+def main():
+    backends = ["python"] + (["c"] if HAS_LIBYAML else [])
+    if not HAS_LIBYAML:
+        print("libyaml not available, only the pure-python backend is timed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "example.yaml": EXAMPLE_PATH,
+            "example x20": scaled_example(os.path.join(tmp, "ex20.yaml"), copies=20),
+            "wide 2000": write_synth(
+                os.path.join(tmp, "wide.yaml"), width=2000, depth=0
+            ),
+            "deep 10x3": write_synth(os.path.join(tmp, "deep.yaml"), width=10, depth=3),
+        }
+
+        print(
+            f"{'file':<14}" + "".join(f"{b:>14}" for b in backends) + f"{'speedup':>10}"
+        )
+        for name, path in files.items():
+            # The typed results must not depend on the backend
+            ref = args_from_YAML(path, loader="python").get_kwargs()
+            for b in backends[1:]:
+                assert args_from_YAML(path, loader=b).get_kwargs() == ref, name
+
+            times = [
+                best_time(lambda: args_from_YAML(path, loader=b), repeat=5)
+                for b in backends
+            ]
+            speedup = f"{times[0] / times[-1]:.1f}x" if len(times) > 1 else "-"
+            print(
+                f"{name:<14}"
+                + "".join(f"{fmt_time(t):>14}" for t in times)
+                + f"{speedup:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Loading many small overlays of one large base config vs parsing full merged files
+
+Usage: python benchmarks/bench_overlay.py [number of overlays]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from _common import fmt_time, scaled_example
+
+from AutoConfig import args_from_YAML, clear_cache
+
+
+def write_overlays(tmp, base, n):
+    """Write n overlay files of base (with and without _base_) and the equivalent merged files"""
+    with open(base, "r") as f:
+        text = f.read()
+    overlays, plain, merged = [], [], []
+    for i in range(n):
+        body = f"seed: {i}\nDAAC_cfg_0:\n    lr: {i * 1e-4}\n"
+        overlays.append(os.path.join(tmp, f"overlay_{i}.yaml"))
+        with open(overlays[-1], "w") as f:
+            f.write(f"_base_: {os.path.basename(base)}\n" + body)
+        plain.append(os.path.join(tmp, f"plain_{i}.yaml"))
+        with open(plain[-1], "w") as f:
+            f.write(body)
+        merged.append(os.path.join(tmp, f"merged_{i}.yaml"))
+        with open(merged[-1], "w") as f:
+            f.write(
+                text.replace("seed: 0\n", f"seed: {i}\n", 1).replace(
+                    "lr: 0.0005", f"lr: {i * 1e-4}", 1
+                )
+            )
+    return overlays, plain, merged
+
+
+def timed(func, files):
+    st = time.perf_counter()
+    for f in files:
+        func(f)
+    return time.perf_counter() - st
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        base = scaled_example(os.path.join(tmp, "base.yaml"), copies=20)
+        overlays, plain, merged = write_overlays(tmp, base, n)
+        clear_cache()
+
+        rows = {
+            "full merged files": (lambda f: args_from_YAML(f), merged),
+            "base + overlay": (lambda f: args_from_YAML(f), overlays),
+            "base + overlay, lazy": (lambda f: args_from_YAML(f, lazy=True), overlays),
+            "list [base, overlay]": (lambda f: args_from_YAML([base, f]), plain),
+        }
+
+        print(f"{n} configs over a {os.path.getsize(base) / 1024:.1f} KiB base")
+        for name, (func, files) in rows.items():
+            t = timed(func, files)
+            print(f"{name:<24}{fmt_time(t):>14}{fmt_time(t / n):>14} per config")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Dotted-path lookups (get/set/find) vs chained attribute lookups
+
+Usage: python benchmarks/bench_paths.py
+"""
+
+import fnmatch
+import os
+import tempfile
+
+from _common import EXAMPLE_PATH, best_time, fmt_time, write_synth
+
+from AutoConfig import args_from_YAML, get_nested_attribute
+from AutoConfig.sweep import flatten_args
+
+N = 100000
+
+
+def bench_key(name, args, keys):
+    dotted = ".".join(keys)
+    args.get(dotted)  # build the index
+
+    def chain():
+        out = args
+        for k in keys:
+            out = getattr(out, k)
+        return out
+
+    print(f"{name} ({dotted})")
+    rows = {
+        "attribute chain": chain,
+        "get([keys])": lambda: args.get(keys),
+        "get_nested_attribute": lambda: get_nested_attribute(args, keys),
+        'get("dotted")': lambda: args.get(dotted),
+        "set([keys])": lambda: args.set(keys, 1),
+        'set("dotted")': lambda: args.set(dotted, 1),
+    }
+    for label, func in rows.items():
+        t = best_time(func, repeat=5, number=N)
+        print(f"  {label:<24}{fmt_time(t):>12}")
+
+
+def bench_find(name, args, pattern):
+    args.find(pattern)
+
+    def scan():
+        flat = flatten_args(args)
+        return {k: v for k, v in flat.items() if fnmatch.fnmatchcase(k, pattern)}
+
+    t_find = best_time(lambda: args.find(pattern), repeat=5, number=100)
+    t_scan = best_time(scan, repeat=5, number=10)
+    print(
+        f"{name} find({pattern!r}): {fmt_time(t_find)} "
+        f"vs flatten + fnmatch {fmt_time(t_scan)}"
+    )
+
+
+def main():
+    example = args_from_YAML(EXAMPLE_PATH)
+    bench_key("example.yaml", example, ["DAAC_cfg", "clip_param"])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synth(os.path.join(tmp, "deep.yaml"), width=10, depth=4)
+        deep = args_from_YAML(path)
+        bench_key("deep 10x4", deep, ["sec_1", "sec_3", "sec_5", "sec_7", "int_1"])
+        bench_find("example.yaml", example, "*.seed")
+        bench_find("example.yaml", example, "DAAC_cfg.*")
+        bench_find("deep 10x4", deep, "sec_1.*")
+        bench_find("deep 10x4", deep, "*.int_1")
+        bench_find("deep 10x4", deep, "**.int_1")
+
+
+if __name__ == "__main__":
+    main()
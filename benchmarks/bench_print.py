@@ -0,0 +1,49 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Rendering a large config with .print()/.render() and str(), with and without limits
+
+Usage: python benchmarks/bench_print.py
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+
+from _common import best_time, fmt_time, synth_lines
+
+from AutoConfig import args_from_YAML
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.yaml")
+        with open(path, "w") as f:
+            f.write("\n".join(synth_lines(width=12, depth=3, list_size=200)) + "\n")
+        args = args_from_YAML(path)
+
+        def print_to_buffer():
+            with contextlib.redirect_stdout(io.StringIO()):
+                args.print()
+
+        rows = {
+            ".print() to stdout": print_to_buffer,
+            ".render()": lambda: args.render(),
+            ".render(max_items=8, max_width=120)": lambda: args.render(
+                max_items=8, max_width=120
+            ),
+            ".render(max_depth=2)": lambda: args.render(max_depth=2),
+            "str(args)": lambda: str(args),
+            "str(args.get_kwargs())": lambda: str(args.get_kwargs()),
+        }
+        print(f"{len(args.render()) / 1024:.0f} KiB of text")
+        for name, func in rows.items():
+            print(f"{name:<38}{fmt_time(best_time(func, repeat=5)):>14}")
+
+
+if __name__ == "__main__":
+    main()
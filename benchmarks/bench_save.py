@@ -0,0 +1,42 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""save_to_yaml time for the built-in writer and the PyYAML dumper backends
+
+Usage: python benchmarks/bench_save.py
+"""
+
+import os
+import tempfile
+
+from _common import best_time, fmt_time, scaled_example, write_synth
+
+from AutoConfig import args_from_YAML
+from AutoConfig.loader import HAS_LIBYAML
+
+
+def main():
+    dumpers = [None, "python"] + (["c"] if HAS_LIBYAML else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "example x100": scaled_example(os.path.join(tmp, "ex.yaml"), copies=100),
+            "deep 10x3": write_synth(
+                os.path.join(tmp, "deep.yaml"), width=10, depth=3, list_size=20
+            ),
+        }
+        out = os.path.join(tmp, "out.yaml")
+        print(f"{'file':<14}" + "".join(f"{str(d):>14}" for d in dumpers))
+        for name, path in files.items():
+            cfg = args_from_YAML(path)
+            times = [
+                best_time(lambda: cfg.save_to_yaml(out, dumper=d), repeat=5)
+                for d in dumpers
+            ]
+            print(f"{name:<14}" + "".join(f"{fmt_time(t):>14}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Binding configs to a compiled schema, and attribute access on the bound objects
+
+Usage: python benchmarks/bench_schema.py [number of configs]
+"""
+
+import copy
+import sys
+import timeit
+from dataclasses import dataclass
+
+from _common import EXAMPLE_PATH, best_time, fmt_time
+
+from AutoConfig import args_from_YAML
+
+
+@dataclass
+class DAAC:
+    seed: int
+    device: str
+    env_name: str
+    lr: float
+    eps: float
+    alpha: float
+    gamma: float
+    gae_lambda: float
+    entropy_coef: float
+    value_loss_coef: float
+    max_grad_norm: float
+    num_processes: int
+    num_steps: int
+    ppo_epoch: int
+    num_mini_batch: int
+    clip_param: float
+    log_interval: int
+    num_env_steps: int
+    algo: str
+    hidden_size: int
+    log_dir: str
+    save_path: str
+    value_epoch: int
+    value_freq: int
+    adv_loss_coef: float
+    use_nonlinear_clf: bool
+    clf_hidden_size: int
+
+
+@dataclass
+class Config:
+    seed: int
+    save_path: str
+    device: str
+    window_size: int
+    mode: str
+    DAAC_cfg: DAAC
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    base = args_from_YAML(EXAMPLE_PATH)
+    base.update_reuse(verbose=False)
+    configs = []
+    for i in range(n):
+        cfg = copy.deepcopy(base)
+        cfg.set("DAAC_cfg.lr", 1e-4 * (i + 1))
+        configs.append(cfg)
+
+    def bind_all():
+        for cfg in configs:
+            cfg.bind(Config)
+
+    print(f"{f'bind {n} configs':<30}{fmt_time(best_time(bind_all, repeat=5)):>14}")
+
+    bound = base.bind(Config)
+    number = 1_000_000
+    for name, obj in (("args_from_YAML", base), ("bound", bound)):
+        t = min(
+            timeit.repeat(
+                "obj.DAAC_cfg.gamma", globals={"obj": obj}, number=number, repeat=5
+            )
+        )
+        print(f"{name + '.DAAC_cfg.gamma':<30}{fmt_time(t / number):>14}")
+
+
+if __name__ == "__main__":
+    main()
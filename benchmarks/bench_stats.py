@@ -0,0 +1,48 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""The cost of the per-phase stats, disabled and enabled, with the stats of one load
+
+Usage: python benchmarks/bench_stats.py
+"""
+
+import os
+import tempfile
+
+from _common import best_time, fmt_time, write_synth
+
+from AutoConfig import args_from_YAML, disable_stats, enable_stats
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.yaml")
+        out = os.path.join(tmp, "out.yaml")
+        write_synth(path, width=12, depth=3, ref_density=0.2)
+
+        rows = {
+            "load": lambda: args_from_YAML(path),
+            "load + update_reuse": lambda: args_from_YAML(path).update_reuse(
+                verbose=False
+            ),
+            "save_to_yaml": lambda args=args_from_YAML(path): args.save_to_yaml(out),
+        }
+        print(f"{'':<22}{'disabled':>14}{'enabled':>14}")
+        for name, func in rows.items():
+            disable_stats()
+            off = best_time(func, repeat=7)
+            enable_stats()
+            on = best_time(func, repeat=7)
+            print(f"{name:<22}{fmt_time(off):>14}{fmt_time(on):>14}")
+
+        args = args_from_YAML(path)
+        args.update_reuse(verbose=False)
+        print(f"\n{args.get_stats()}")
+        disable_stats()
+
+
+if __name__ == "__main__":
+    main()
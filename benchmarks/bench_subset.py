@@ -0,0 +1,55 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Load time of one subset as the number of unrelated sections in the file grows
+
+Usage: python benchmarks/bench_subset.py
+"""
+
+import os
+import tempfile
+
+from _common import EXAMPLE_PATH, best_time, fmt_time, synth_lines
+
+from AutoConfig import args_from_YAML
+from AutoConfig.loader import _load_events
+
+
+def write_combined(path, sections):
+    """Write example.yaml followed by `sections` unrelated sections of ~200 keys each"""
+    with open(EXAMPLE_PATH, "r") as f:
+        text = f.read()
+    body = "\n".join("    " + line for line in synth_lines(width=20, depth=1))
+    with open(path, "w") as f:
+        f.write(text)
+        for i in range(sections):
+            f.write(f"\nunrelated_{i}:\n{body}\n")
+    return path
+
+
+def main():
+    print(
+        f"{'sections':>9}{'size':>10}{'full load':>14}{'subset':>14}{'event skip':>14}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (0, 10, 50, 200):
+            path = write_combined(os.path.join(tmp, f"combined_{n}.yaml"), n)
+            with open(path, "r") as f:
+                text = f.read()
+            t_full = best_time(lambda: args_from_YAML(path), repeat=3)
+            t_subset = best_time(
+                lambda: args_from_YAML(path, subset="DAAC_cfg"), repeat=3
+            )
+            # The fallback used when the top-level keys can't be split from the text
+            t_events = best_time(lambda: _load_events(text, "DAAC_cfg", "auto"), 3)
+            print(
+                f"{n:>9}{os.path.getsize(path) / 1024:>7.0f} KiB{fmt_time(t_full):>14}"
+                f"{fmt_time(t_subset):>14}{fmt_time(t_events):>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Generating sweep variants with .sweep() vs deep copies and .set()
+
+Usage: python benchmarks/bench_sweep.py
+"""
+
+import copy
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+
+from _common import fmt_time, scaled_example
+
+from AutoConfig import args_from_YAML
+
+SPEC = {
+    "DAAC_cfg_0.lr": [1e-4, 3e-4, 1e-3, 3e-3],
+    "DAAC_cfg_0.clip_param": [0.1, 0.2, 0.3],
+    "STE_cfg_3.noise_penalty": [0.0, 0.001, 0.01],
+    "seed": list(range(10)),
+}
+
+
+def deepcopy_sweep(base):
+    keys = [k.split(".") for k in SPEC]
+    for values in itertools.product(*SPEC.values()):
+        variant = copy.deepcopy(base)
+        for k, v in zip(keys, values):
+            variant.set(k, v)
+        yield variant
+
+
+def measure(name, gen):
+    """Time a full pass over the variants and the memory of keeping all of them"""
+    tracemalloc.start()
+    st = time.perf_counter()
+    variants = list(gen)
+    elapsed = time.perf_counter() - st
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    n = len(variants)
+    print(
+        f"{name:<18}{n:>6}{fmt_time(elapsed):>14}{fmt_time(elapsed / n):>14}"
+        f"{used / n / 1024:>12.1f} KiB"
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        base = args_from_YAML(scaled_example(os.path.join(tmp, "base.yaml"), 20))
+        print(
+            f"{'method':<18}{'n':>6}{'total':>14}{'per variant':>14}{'memory/variant':>16}"
+        )
+        measure("deepcopy + set", deepcopy_sweep(base))
+        measure(".sweep()", base.sweep(SPEC))
+
+        out = os.path.join(tmp, "sweep", "run_{index}.yaml")
+        st = time.perf_counter()
+        n = sum(1 for _ in base.sweep(SPEC, save_to=out))
+        print(f"streamed {n} variants to YAML in {fmt_time(time.perf_counter() - st)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Benchmark suite for the core AutoConfig paths, with JSON results and regression checks
+
+Each case is timed on a set of synthetic configs of controlled width, depth, list sizes
+and ${} density, plus scaled-up copies of example.yaml. The time is the best of several
+repeats, and the peak memory is measured separately with tracemalloc.
+
+Usage: python benchmarks/suite.py [--out results.json] [--baseline baseline.json]
+                                  [--threshold 0.25] [--rounds 1] [--quick]
+                                  [--filter PATTERN]
+
+Save a results file as the baseline before upgrading, then compare against it. Cases
+slower (or using more memory) than the baseline by more than the threshold are flagged
+and the exit code is 1. On a noisy machine, use several --rounds for both runs.
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+from _common import EXAMPLE_PATH, fmt_time, scaled_example, write_synth
+
+from AutoConfig import args_from_YAML, compare_args, dict_print
+from AutoConfig.loader import HAS_LIBYAML
+
+# name: (synth_lines kwargs or example copies, the subset loaded by the subset case)
+# The "wide" config has no sections, so its subset case loads only the top level
+CONFIGS = {
+    "example": (None, "DAAC_cfg"),
+    "example_x20": (20, "DAAC_cfg_0"),
+    "example_x200": (200, "DAAC_cfg_0"),
+    "wide": ({"width": 4000, "depth": 0}, None),
+    "deep": ({"width": 6, "depth": 6}, "sec_1"),
+    "lists": ({"width": 10, "depth": 2, "list_size": 200}, "sec_1"),
+    "refs": ({"width": 12, "depth": 3, "ref_density": 0.3}, "sec_1"),
+}
+
+# Smaller configs used with --quick
+QUICK = ("example", "example_x20", "deep", "refs")
+
+
+def deepest_key(args):
+    """Return the dotted path of a leaf in the most deeply nested section"""
+    best = ()
+    stack = [((), args)]
+    while stack:
+        prefix, node = stack.pop()
+        for k, v in node.__dict__.items():
+            path = prefix + (k,)
+            if isinstance(v, args_from_YAML):
+                stack.append((path, v))
+            elif len(path) > len(best):
+                best = path
+    return ".".join(map(str, best))
+
+
+def changed_copy(path, key):
+    """Load a second copy of a config with one value changed, for compare_args"""
+    other = args_from_YAML(path)
+    other.set(key, "changed")
+    return other
+
+
+def make_cases(path, subset, out_path):
+    """Return {case name: (setup, func, fresh)}, where func(setup()) is timed
+
+    With fresh=True, setup() is called (untimed) before every call, for cases that change
+    the state they run on
+    """
+    loaded = lambda: args_from_YAML(path)
+    key = deepest_key(args_from_YAML(path))
+    null = io.StringIO()
+
+    def print_args(args):
+        null.seek(0)
+        null.truncate()
+        with contextlib.redirect_stdout(null):
+            dict_print(args.get_kwargs())
+
+    def compare(pair):
+        null.seek(0)
+        null.truncate()
+        compare_args(*pair, write=null.write)
+
+    return {
+        "load": (None, lambda _: args_from_YAML(path), False),
+        "load_subset": (None, lambda _: args_from_YAML(path, subset=subset), False),
+        "load_lazy": (None, lambda _: args_from_YAML(path, lazy=True), False),
+        "update_reuse": (loaded, lambda args: args.update_reuse(verbose=False), True),
+        "get": (loaded, lambda args: args.get(key), False),
+        "set": (loaded, lambda args: args.set(key, 1), False),
+        "save_to_yaml": (loaded, lambda args: args.save_to_yaml(out_path), False),
+        "compare_args": (
+            lambda: (args_from_YAML(path), changed_copy(path, key)),
+            compare,
+            True,
+        ),
+        "dict_print": (loaded, print_args, False),
+    }
+
+
+def measure(setup, func, fresh, min_time):
+    """Return (best seconds per call, peak bytes) of func(setup())
+
+    Calls are repeated until min_time has been spent timing them (at least 3 times), or
+    5 * min_time including the setup of fresh cases. Cheap calls are timed in growing
+    batches
+    """
+    arg = setup() if setup is not None else None
+    best = float("inf")
+    total = 0.0
+    runs = 0
+    batch = 1
+    deadline = time.perf_counter() + 5 * min_time
+    while runs < 3 or (total < min_time and time.perf_counter() < deadline):
+        if fresh and runs:
+            arg = setup()
+        gc.disable()
+        st = time.perf_counter()
+        for _ in range(batch):
+            func(arg)
+        elapsed = time.perf_counter() - st
+        gc.enable()
+        best = min(best, elapsed / batch)
+        total += elapsed
+        runs += 1
+        if not fresh and elapsed < min_time / 20:
+            batch *= 2
+
+    arg = setup() if setup is not None else None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "pyyaml": yaml.__version__,
+        "libyaml": bool(HAS_LIBYAML),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(configs, pattern, min_time, tmp, results):
+    """Run one round of the cases, keeping the best time of each in results"""
+    for name in configs:
+        spec, subset = CONFIGS[name]
+        path = os.path.join(tmp, f"{name}.yaml")
+        if spec is None:
+            path = EXAMPLE_PATH
+        elif isinstance(spec, int):
+            scaled_example(path, copies=spec)
+        else:
+            write_synth(path, **spec)
+        out_path = os.path.join(tmp, f"{name}_out.yaml")
+        for case, (setup, func, fresh) in make_cases(path, subset, out_path).items():
+            full = f"{case}/{name}"
+            if pattern and not fnmatch.fnmatchcase(full, pattern):
+                continue
+            t, peak = measure(setup, func, fresh, min_time)
+            print(f"{full:<32}{fmt_time(t):>14}{peak / 1024:>12.1f} KiB", flush=True)
+            if full in results:
+                t = min(t, results[full]["time"])
+            results[full] = {"time": t, "peak_bytes": peak}
+
+
+def compare(results, baseline, threshold):
+    """Print the changes against the baseline, returning the regressed cases"""
+    regressions = []
+    print(f"\n{'case':<32}{'time':>10}{'memory':>10}")
+    for case, res in results.items():
+        base = baseline.get(case)
+        if base is None:
+            print(f"{case:<32}{'new':>10}")
+            continue
+        t_ratio = res["time"] / base["time"] if base["time"] else 1.0
+        m_ratio = res["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] else 1.0
+        flag = ""
+        if t_ratio > 1 + threshold or m_ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(case)
+        print(f"{case:<32}{t_ratio:>9.2f}x{m_ratio:>9.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative slowdown/memory increase flagged as a regression",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1,
+        help="run the suite this many times, keeping the best time of each case",
+    )
+    parser.add_argument("--quick", action="store_true", help="fewer, smaller configs")
+    parser.add_argument("--filter", help='only run cases matching a glob, e.g. "load*"')
+    args = parser.parse_args(argv)
+
+    configs = QUICK if args.quick else tuple(CONFIGS)
+    min_time = 0.1 if args.quick else 0.5
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.rounds):
+            if args.rounds > 1:
+                print(f"Round {i + 1}/{args.rounds}")
+            print(f"{'case':<32}{'time':>14}{'peak memory':>16}")
+            run(configs, args.filter, min_time, tmp, results)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nSaved results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
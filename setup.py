@@ -16,6 +16,7 @@ setup(
     license="BSD 3-clause",
     packages=["AutoConfig"],
     install_requires=["pyyaml"],
+    entry_points={"console_scripts": ["autoconfig=AutoConfig.cli:main"]},
     classifiers=[
         "Development Status :: 1 - Planning",
         "Intended Audience :: Science/Research",
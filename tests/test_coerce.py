@@ -0,0 +1,56 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+
+import pytest
+
+from AutoConfig import args_from_YAML
+
+CONFIG = "lr: 1\nmodel:\n  lr: 2\n  head:\n    lr: 3\noptim:\n  lr: 4\n"
+
+
+def _scale(key, value):
+    # Only the model's learning rates are scaled
+    return value * 10 if key.startswith("model.") else value
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_custom_coercer_receives_dotted_paths(tmp_path, lazy):
+    path = tmp_path / "cfg.yaml"
+    path.write_text(CONFIG)
+    seen = []
+
+    def coerce(key, value):
+        seen.append(key)
+        return _scale(key, value)
+
+    args = args_from_YAML(str(path), lazy=lazy, coerce=coerce)
+    assert (args.lr, args.model.lr, args.model.head.lr, args.optim.lr) == (1, 20, 30, 4)
+    assert sorted(seen) == ["lr", "model.head.lr", "model.lr", "optim.lr"]
+
+
+def test_subset_paths_start_at_the_top_level(tmp_path):
+    path = tmp_path / "cfg.yaml"
+    path.write_text(CONFIG)
+    seen = []
+    args_from_YAML(str(path), subset="model", coerce=lambda k, v: seen.append(k) or v)
+    # Top-level values are kept, other sections are skipped
+    assert sorted(seen) == ["lr", "model.head.lr", "model.lr"]
+
+
+def test_watch_reload_receives_dotted_paths(tmp_path):
+    path = tmp_path / "cfg.yaml"
+    path.write_text(CONFIG)
+    args = args_from_YAML(str(path), coerce=_scale)
+    watcher = args.watch(start=False)
+
+    path.write_text(CONFIG.replace("2", "5").replace("3", "6").replace("4", "7"))
+    # Make sure the change is seen even within the file system's time resolution
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert sorted(watcher.check()) == ["model.head.lr", "model.lr", "optim.lr"]
+    assert (args.model.lr, args.model.head.lr, args.optim.lr) == (50, 60, 7)
@@ -0,0 +1,46 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import pytest
+
+from AutoConfig import args_from_YAML, clear_cache, compose_config
+
+
+@pytest.fixture
+def layered(tmp_path):
+    clear_cache()
+    (tmp_path / "base.yaml").write_text(
+        "sec:\n  lst: [1, 2]\n  items: [{a: 1}]\n  tags: !!set {x: null}\n"
+    )
+    for name in ("o1", "o2"):
+        (tmp_path / f"{name}.yaml").write_text("_base_: base.yaml\nx: 1\n")
+    yield tmp_path
+    clear_cache()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_overlays_of_a_cached_base_are_independent(layered, lazy):
+    first = args_from_YAML(str(layered / "o1.yaml"), lazy=lazy)
+    first.sec.lst.append(42)
+    first.sec.items[0]["a"] = 2
+    first.sec.tags.add("y")
+
+    for paths in (
+        str(layered / "o2.yaml"),
+        [str(layered / "base.yaml"), str(layered / "o2.yaml")],
+    ):
+        other = args_from_YAML(paths, lazy=lazy)
+        assert other.sec.lst == [1, 2]
+        assert other.sec.items == [{"a": 1}]
+        assert other.sec.tags == {"x"}
+
+
+def test_compose_config_returns_a_copy(layered):
+    data = compose_config(str(layered / "o1.yaml"))
+    data["sec"]["lst"].append(42)
+    data["sec"]["new"] = 1
+    again = compose_config(str(layered / "o2.yaml"))
+    assert again["sec"]["lst"] == [1, 2] and "new" not in again["sec"]
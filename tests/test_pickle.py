@@ -0,0 +1,53 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import base64
+import copy
+import pickle
+
+from AutoConfig import args_from_YAML, diff_args
+
+# pickle.dumps(args_from_YAML(...), protocol=2) from the first release, which stored the
+# plain __dict__ of each parser, for:
+#   seed: 0
+#   sec: {lr: 0.5, lst: [1, 2], inner: {x: 0}}
+RELEASED_PICKLE = base64.b64decode(
+    "gAJjQXV0b0NvbmZpZy5hdXRvY29uZmlnCmFyZ3NfZnJvbV9ZQU1MCnEAKYFxAX1xAihYCwAAAGNvbmZpZ19w"
+    "YXRocQNYCwAAAGNvbmZpZy55YW1scQRYBAAAAHNlZWRxBUsAWAMAAABzZWNxBmgAKYFxB31xCChYBgAAAHN1"
+    "YnNldHEJaAZYAgAAAGxycQpHP+AAAAAAAABYAwAAAGxzdHELXXEMKEsBSwJlWAUAAABpbm5lcnENaAApgXEO"
+    "fXEPKGgJaA1YAQAAAHhxEEsAdWJ1YnViLg=="
+)
+
+
+def test_load_released_pickle():
+    args = pickle.loads(RELEASED_PICKLE)
+    assert args.config_path == "config.yaml"
+    assert args.seed == 0
+    assert args.get("sec.lr") == 0.5
+    assert args.sec.lst == [1, 2]
+    assert args.sec.inner.x == 0
+
+    # The restored parsers are fully usable, e.g. modifying a section is seen by diffs
+    other = pickle.loads(pickle.dumps(args))
+    assert not diff_args(args, other)
+    args.sec.inner.x = 1
+    assert diff_args(args, other).changed == {"sec.inner.x": (1, 0)}
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("seed: 0\nsec:\n  lr: 0.5\n  lst: [1, 2]\n")
+    args = args_from_YAML(str(path))
+    assert not diff_args(args, pickle.loads(pickle.dumps(args)))
+
+
+def test_copy_lazy(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("seed: 0\nsec:\n  lr: 0.5\n")
+    args = args_from_YAML(str(path), lazy=True)
+    shallow = copy.copy(args)
+    assert shallow.get(["sec", "lr"]) == 0.5
+    assert isinstance(shallow.sec, args_from_YAML)
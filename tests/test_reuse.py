@@ -0,0 +1,40 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import pytest
+
+from AutoConfig import args_from_YAML
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("seed: 0\ndevice: cpu\nsec:\n  seed: ${seed}\n  inner:\n    a: 1\n")
+    args = args_from_YAML(str(path))
+    args.update_reuse(verbose=False)
+    return args
+
+
+def test_assigned_placeholders_are_resolved(config):
+    config.x = "${seed}"
+    config["bar"] = "${device}"
+    config.sec.inner.b = "${device}/logs"
+    config.update_reuse(verbose=False)
+    assert (config.x, config.bar, config.sec.inner.b) == (0, "cpu", "cpu/logs")
+
+
+def test_assigned_section_is_indexed(config):
+    config.sec.new = args_from_YAML(None, _info={"d": "${device}"}, subset="new")
+    config.update_reuse(verbose=False)
+    assert config.sec.new.d == "cpu"
+
+
+def test_source_changes_still_propagate(config):
+    config.x = "${seed}"
+    config.update_reuse(verbose=False)
+    config.seed = 5
+    config.update_reuse(verbose=False)
+    assert (config.x, config.sec.seed) == (5, 5)
@@ -0,0 +1,53 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import stat
+import sys
+
+import pytest
+
+from AutoConfig import args_from_YAML
+
+
+def test_empty_section_round_trip(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("j: {}\nk: []\n")
+    args_from_YAML(str(path)).save_to_yaml(str(path))
+    args = args_from_YAML(str(path))
+    assert isinstance(args.j, args_from_YAML) and args.k == []
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions and symlinks")
+def test_save_keeps_symlink_and_mode(tmp_path):
+    target = tmp_path / "real.yaml"
+    target.write_text("seed: 0\n")
+    os.chmod(target, 0o600)
+    link = tmp_path / "link.yaml"
+    link.symlink_to(target)
+
+    args = args_from_YAML(str(link))
+    args.seed = 1
+    args.save_to_yaml(str(link))
+
+    assert link.is_symlink()
+    assert args_from_YAML(str(target)).seed == 1
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o600
+    assert not [p for p in os.listdir(tmp_path) if p.startswith(".tmp_")]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+def test_new_file_uses_umask(tmp_path):
+    umask = os.umask(0o027)
+    try:
+        path = tmp_path / "new.yaml"
+        path.write_text("seed: 0\n")
+        args = args_from_YAML(str(path))
+        os.remove(path)
+        args.save_to_yaml(str(path))
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
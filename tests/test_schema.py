@@ -0,0 +1,41 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import dataclasses
+import typing
+
+from AutoConfig import args_from_YAML, bind_config
+
+
+@dataclasses.dataclass
+class Model:
+    layers: typing.List[int]
+    tags: typing.Set[str]
+    extra: typing.Dict[str, typing.List[float]]
+
+
+@dataclasses.dataclass
+class Config:
+    model: Model
+    seed: int = 0
+
+
+def _bind(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return bind_config(args_from_YAML(str(path)), Config)
+
+
+def test_hash_with_container_fields(tmp_path):
+    text = "model:\n  layers: [1, 2]\n  tags: [a]\n  extra: {w: [0.5]}\n"
+    a = _bind(tmp_path, "a.yaml", text)
+    b = _bind(tmp_path, "b.yaml", text)
+    c = _bind(tmp_path, "c.yaml", text.replace("[1, 2]", "[1, 3]"))
+
+    assert a == b and hash(a) == hash(b)
+    assert a != c
+    assert len({a, b, c}) == 2
+    assert hash(a.model) == hash(b.model)
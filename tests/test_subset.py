@@ -0,0 +1,40 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import pytest
+import yaml
+
+from AutoConfig import args_from_YAML
+
+# Skipped sections holding a column-0 line that isn't a top-level key
+CONTINUED = {
+    "double_quoted": 'seed: 1\nnotes:\n  msg: "first line\nseed: 999"\ntrain:\n  lr: 0.1\n',
+    "single_quoted": "seed: 1\nnotes:\n  msg: 'first line\nseed: 999'\ntrain:\n  lr: 0.1\n",
+    "escaped_quote": 'seed: 1\nnotes:\n  msg: "a \\" b\nseed: 9"\ntrain:\n  lr: 0.1\n',
+    "flow": "seed: 1\nnotes:\n  msg: [1,\nseed: 999]\ntrain:\n  lr: 0.1\n",
+    "top_level_quote": 'msg: "x\nnotes:\n  a: 1"\ntrain:\n  lr: 0.1\n',
+    "block_scalar": "seed: 1\nnotes:\n  msg: |\n    text\ntrain:\n  lr: 0.1\n",
+}
+
+
+@pytest.mark.parametrize("text", CONTINUED.values(), ids=CONTINUED.keys())
+def test_subset_matches_full_load(tmp_path, text):
+    path = tmp_path / "config.yaml"
+    path.write_text(text)
+    full = args_from_YAML(str(path))
+    sub = args_from_YAML(str(path), subset="train")
+    for key in ("seed", "msg"):
+        assert getattr(sub, key, None) == getattr(full, key, None)
+    assert sub.train.lr == full.train.lr
+
+
+def test_subset_rejects_tabs(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("seed: 1\nnotes:\n\ta: 1\ntrain:\n  lr: 0.1\n")
+    with pytest.raises(yaml.YAMLError):
+        args_from_YAML(str(path))
+    with pytest.raises(yaml.YAMLError):
+        args_from_YAML(str(path), subset="train")
@@ -0,0 +1,45 @@
+# Copyright (c) 2024, Nathan Hansen
+# All rights reserved.
+
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+
+from AutoConfig import args_from_YAML
+
+
+def _base(tmp_path):
+    path = tmp_path / "cfg.yaml"
+    path.write_text("model:\n  lr: 0.1\n  depth: 2\noptim:\n  momentum: 0.9\n")
+    return args_from_YAML(str(path))
+
+
+def test_swept_sections_are_copied(tmp_path):
+    base = _base(tmp_path)
+    variants = list(base.sweep({"model.lr": [1, 2]}))
+    assert [v.model.lr for v in variants] == [1, 2]
+    assert base.model.lr == 0.1
+    assert variants[0].model is not base.model
+
+    variants[0].model.depth = 5
+    assert base.model.depth == 2
+    assert variants[1].model.depth == 2
+
+
+def test_unswept_sections_are_shared(tmp_path):
+    # Documented behavior: writing to an unswept section of a variant writes to the
+    # base (and every other variant), deepcopy a variant before modifying it
+    base = _base(tmp_path)
+    first, second = base.sweep({"model.lr": [1, 2]})
+    assert first.optim is base.optim
+
+    first.optim.momentum = 0.5
+    assert base.optim.momentum == 0.5
+    assert second.optim.momentum == 0.5
+
+    base.optim.momentum = 0.9
+    private = copy.deepcopy(second)
+    private.optim.momentum = 0.1
+    assert base.optim.momentum == 0.9
+    assert first.optim.momentum == 0.9